@@ -0,0 +1,89 @@
+"""
+Repository authorizations of the user of a request. Permissions, filters,
+validators and serializers ask for the same repositories many times in a
+request, get_authorization loads each one once and
+prefetch_authorizations loads the ones of a list of repositories in one
+query. A user without a row gets an unsaved authorization, the row is
+only created by get_saved_authorization, when its uuid is needed as the
+NLP token, or when a role is set.
+"""
+
+from django.db import IntegrityError
+from django.db import transaction
+
+from bothub.common.models import RepositoryAuthorization
+
+
+class AuthorizationResolver(object):
+    def __init__(self, user):
+        self.user = user
+        self.authorizations = {}
+
+    def remember(self, repository, authorization):
+        # Levels are computed from this repository and user, no FK loads
+        authorization.repository = repository
+        if self.user.is_authenticated:
+            authorization.user = self.user
+        self.authorizations[repository.pk] = authorization
+        return authorization
+
+    def prefetch(self, repositories):
+        repositories = [
+            repository
+            for repository in repositories
+            if repository.pk not in self.authorizations]
+        if not repositories:
+            return
+        found = {}
+        if self.user.is_authenticated:
+            found = {
+                authorization.repository_id: authorization
+                for authorization in RepositoryAuthorization.objects.filter(
+                    user=self.user,
+                    repository__in=repositories)
+            }
+        for repository in repositories:
+            self.remember(
+                repository,
+                found.get(repository.pk) or RepositoryAuthorization())
+
+    def get(self, repository):
+        authorization = self.authorizations.get(repository.pk)
+        if authorization is None:
+            self.prefetch([repository])
+            authorization = self.authorizations.get(repository.pk)
+        return authorization
+
+    def get_saved(self, repository):
+        authorization = self.get(repository)
+        if authorization._state.adding and self.user.is_authenticated:
+            # prefetch didn't find it, insert without another select
+            try:
+                with transaction.atomic():
+                    authorization.save(force_insert=True)
+            except IntegrityError:
+                # Created by a concurrent request meanwhile
+                authorization = self.remember(
+                    repository,
+                    repository.get_user_authorization(self.user))
+        return authorization
+
+
+def get_resolver(request):
+    resolver = getattr(request, '_authorization_resolver', None)
+    if resolver is None or resolver.user is not request.user:
+        resolver = AuthorizationResolver(request.user)
+        request._authorization_resolver = resolver
+    return resolver
+
+
+def get_authorization(request, repository):
+    return get_resolver(request).get(repository)
+
+
+def get_saved_authorization(request, repository):
+    return get_resolver(request).get_saved(repository)
+
+
+def prefetch_authorizations(request, repositories):
+    get_resolver(request).prefetch(repositories)
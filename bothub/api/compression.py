@@ -0,0 +1,111 @@
+"""
+gzip or brotli compression of API responses, chosen by Accept-Encoding.
+Brotli needs the brotli package, without it the responses are gzipped.
+Responses smaller than COMPRESSION_MIN_SIZE aren't worth the CPU time,
+static files are compressed ahead of time by whitenoise.
+"""
+
+import gzip
+
+from io import BytesIO
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from bothub.health.metrics import response_compressed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = [
+    'application/json',
+    'application/coreapi+json',
+    'text/html',
+]
+
+
+def accepted_encodings(request):
+    encodings = set()
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for item in header.split(','):
+        encoding, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(encoding.lower())
+    return encodings
+
+
+def get_encoding(request):
+    encodings = accepted_encodings(request)
+    if brotli is not None and 'br' in encodings:
+        return 'br'
+    if 'gzip' in encodings:
+        return 'gzip'
+    return None
+
+
+def compress(content, encoding, level=None):
+    """
+    level is the brotli quality or gzip level, default from the settings.
+    """
+    if encoding == 'br':
+        return brotli.compress(
+            content,
+            mode=brotli.MODE_TEXT,
+            quality=settings.COMPRESSION_BROTLI_QUALITY
+            if level is None else level)
+    buffer = BytesIO()
+    # mtime fixed, the same content always compresses to the same bytes
+    with gzip.GzipFile(
+            mode='wb',
+            compresslevel=settings.COMPRESSION_GZIP_LEVEL
+            if level is None else level,
+            fileobj=buffer,
+            mtime=0) as gzip_file:
+        gzip_file.write(content)
+    return buffer.getvalue()
+
+
+class CompressionMiddleware(object):
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.min_size or response.streaming or \
+                response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if content_type not in COMPRESSIBLE_TYPES:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.min_size:
+            return response
+        encoding = get_encoding(request)
+        if encoding is None:
+            return response
+
+        size = len(response.content)
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= size:
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # Weak ETag, still matches If-None-Match (RFC 7232 section 2.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+
+        response_compressed(encoding, size, len(compressed))
+        return response
@@ -0,0 +1,129 @@
+"""
+Conditional GET of the resources of a repository. The ETag and
+Last-Modified come from Repository.changed_at, set when anything in the
+repository changes, so polling clients get 304 Not Modified before any
+serializer or aggregate query runs. The owner nickname and the
+categories are part of the responses too, so their changes also set
+changed_at.
+"""
+
+import calendar
+import hashlib
+
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date
+from django.utils.http import quote_etag
+from django.utils import timezone
+from django.utils.translation import get_language
+from rest_framework.response import Response
+
+from bothub.common.models import Repository
+
+
+def get_validators(request, changed_at):
+    """
+    The ETag also changes with the user (the authorization fields), the
+    URL, the format and the language of the response. Last-Modified has
+    1 second precision, it's None while changed_at is in the last second
+    because another change in the same second would have the same value.
+    """
+    etag = hashlib.sha1('|'.join([
+        changed_at.isoformat(),
+        str(request.user.pk),
+        request.get_full_path(),
+        request.accepted_renderer.format,
+        get_language() or '',
+    ]).encode()).hexdigest()
+    if timezone.now() - changed_at < timedelta(seconds=1):
+        return quote_etag(etag), None
+    return quote_etag(etag), calendar.timegm(changed_at.utctimetuple())
+
+
+def not_modified_response(request, changed_at):
+    """
+    The 304 Not Modified (or 412 Precondition Failed) response, None when
+    the request has no matching condition.
+    """
+    etag, last_modified = get_validators(request, changed_at)
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified)
+    if response is None:
+        return None
+    return set_validators(
+        request,
+        Response(status=response.status_code),
+        changed_at)
+
+
+def set_validators(request, response, changed_at):
+    if response.status_code not in [200, 304]:
+        return response
+    etag, last_modified = get_validators(request, changed_at)
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Cached by the client, but always revalidated
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalRetrieveMixin(object):
+    """
+    retrieve with ETag and Last-Modified of the repository in
+    conditional_repository_field, a dotted path from the object ('' when
+    the object is the repository).
+    """
+
+    conditional_repository_field = ''
+
+    def get_object_changed_at(self, instance):
+        repository = instance
+        if self.conditional_repository_field:
+            for field in self.conditional_repository_field.split('.'):
+                repository = getattr(repository, field)
+        return repository.changed_at
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        changed_at = self.get_object_changed_at(instance)
+        response = not_modified_response(request, changed_at)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(instance)
+        return set_validators(
+            request,
+            Response(serializer.data),
+            changed_at)
+
+
+class ConditionalListMixin(object):
+    """
+    list with ETag and Last-Modified of the repository in the
+    repository_uuid query param. The filters still check the permission
+    to read the repository before a 304.
+    """
+
+    def get_list_changed_at(self, request):
+        try:
+            return Repository.objects.filter(
+                uuid=request.query_params.get('repository_uuid'),
+            ).values_list('changed_at', flat=True).first()
+        except DjangoValidationError:
+            return None
+
+    def list(self, request, *args, **kwargs):
+        changed_at = self.get_list_changed_at(request)
+        if changed_at is None:
+            return super().list(request, *args, **kwargs)
+        response = not_modified_response(request, changed_at)
+        if response is not None:
+            self.filter_queryset(self.get_queryset())
+            return response
+        response = super().list(request, *args, **kwargs)
+        return set_validators(request, response, changed_at)
@@ -0,0 +1,111 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.urls import resolve
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from rest_framework.test import force_authenticate
+
+from bothub.common.models import Repository
+
+from ...renderers import FastJSONRenderer
+from ...renderers import orjson
+from ...compression import brotli
+from ...compression import compress
+
+
+PAYLOADS = [
+    ('v1-repository', lambda r: '/api/repository/{}/{}/'.format(
+        r.owner.nickname,
+        r.slug)),
+    ('v2-repository', lambda r: '/v2/repository/{}/'.format(r.uuid)),
+    ('v1-examples', lambda r: '/api/examples/?repository_uuid={}'.format(
+        r.uuid)),
+    ('v2-examples', lambda r: '/v2/examples/?repository_uuid={}'.format(
+        r.uuid)),
+]
+
+GZIP_LEVELS = [1, 6, 9]
+
+BROTLI_QUALITIES = [1, 4, 11]
+
+
+def mean_time(func, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+class Command(BaseCommand):
+    help = 'Time the JSON rendering and compression of typical payloads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repository',
+            dest='repository',
+            help='Repository UUID, default is the one with most examples')
+        parser.add_argument(
+            '--repeat',
+            dest='repeat',
+            type=int,
+            default=20)
+
+    def get_data(self, repository, path):
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, user=repository.owner)
+        match = resolve(path.split('?')[0])
+        response = match.func(request, *match.args, **match.kwargs)
+        if response.status_code != 200:
+            return None
+        return response.data
+
+    def handle(self, *args, **options):
+        if options.get('repository'):
+            repository = Repository.objects.get(uuid=options['repository'])
+        else:
+            repository = Repository.objects.annotate(
+                examples_count=Count('updates__added')).order_by(
+                    '-examples_count').first()
+        if not repository:
+            self.stderr.write('No repository found.')
+            return
+        repeat = options.get('repeat')
+
+        self.stdout.write('{} ({} repeats, orjson {}, brotli {})'.format(
+            repository,
+            repeat,
+            'installed' if orjson else 'missing',
+            'installed' if brotli else 'missing'))
+        for name, path in PAYLOADS:
+            data = self.get_data(repository, path(repository))
+            if data is None:
+                self.stderr.write('{:<16} not rendered'.format(name))
+                continue
+            stock, content = mean_time(
+                lambda: JSONRenderer().render(data),
+                repeat)
+            fast, content = mean_time(
+                lambda: FastJSONRenderer().render(data),
+                repeat)
+            self.stdout.write(
+                '{:<16} {:>9} bytes  json {:8.3f}ms  fast {:8.3f}ms'.format(
+                    name,
+                    len(content),
+                    stock * 1000,
+                    fast * 1000))
+            encodings = [('gzip', level) for level in GZIP_LEVELS]
+            if brotli:
+                encodings += [('br', quality) for quality in BROTLI_QUALITIES]
+            for encoding, level in encodings:
+                elapsed, compressed = mean_time(
+                    lambda: compress(content, encoding, level),
+                    repeat)
+                self.stdout.write(
+                    '  {:<4} {:>2} {:>9} bytes {:6.1f}%  {:8.3f}ms'.format(
+                        encoding,
+                        level,
+                        len(compressed),
+                        len(compressed) / len(content) * 100,
+                        elapsed * 1000))
@@ -0,0 +1,345 @@
+import time
+import random
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import requests
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+
+DEFAULT_MIX = 'list=40,detail=30,example-write=20,analyze=10'
+
+
+def percentile(timings, p):
+    """
+    timings must be sorted.
+    """
+    return timings[int((len(timings) - 1) * p)]
+
+
+class Stats(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = OrderedDict()
+        self.errors = OrderedDict()
+        self.exceptions = OrderedDict()
+
+    def add(self, name, elapsed, error):
+        with self.lock:
+            self.timings.setdefault(name, []).append(elapsed)
+            self.errors.setdefault(name, 0)
+            if error:
+                self.errors[name] += 1
+
+    def add_exception(self, name, exception, error):
+        """
+        Count a scenario that raised after a request of the endpoint name
+        as an error of this request (error if it already was one) and keep
+        the last exception to report.
+        """
+        with self.lock:
+            if not error:
+                self.errors[name] += 1
+            self.exceptions[name] = exception
+
+    def report(self, duration):
+        yield '{:<16} {:>7} {:>8} {:>8} {:>9} {:>9} {:>9}'.format(
+            'endpoint',
+            'count',
+            'req/s',
+            'errors',
+            'p50 ms',
+            'p95 ms',
+            'p99 ms')
+        for name, timings in self.timings.items():
+            timings = sorted(timings)
+            yield '{:<16} {:>7} {:>8.1f} {:>7.1f}% {:>9.1f} {:>9.1f} ' \
+                '{:>9.1f}'.format(
+                    name,
+                    len(timings),
+                    len(timings) / duration,
+                    self.errors[name] / len(timings) * 100,
+                    percentile(timings, .5) * 1000,
+                    percentile(timings, .95) * 1000,
+                    percentile(timings, .99) * 1000)
+        for name, exception in self.exceptions.items():
+            yield '{} raised {}: {}'.format(
+                name,
+                type(exception).__name__,
+                exception)
+
+
+class Client(object):
+    def __init__(self, base_url, token, stats):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = 'Token {}'.format(token)
+        self.stats = stats
+        # Endpoint name and error of the last request, by scenario
+        self.last_request = None
+
+    def request(self, name, method, path, expected=None, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method,
+                urljoin(self.base_url, path),
+                **kwargs)
+        except requests.RequestException:
+            self.stats.add(name, time.perf_counter() - start, True)
+            self.last_request = (name, True)
+            return None
+        error = response.status_code != (expected or 200)
+        self.stats.add(name, time.perf_counter() - start, error)
+        self.last_request = (name, error)
+        return response
+
+
+# Scenarios, each one runs a user action against a repository
+
+def scenario_list(client, repository, rand):
+    client.request(
+        'list',
+        'get',
+        '/api/examples/',
+        params={
+            'repository_uuid': repository.get('uuid'),
+            'page': rand.randint(1, 5),
+        })
+
+
+def scenario_detail(client, repository, rand):
+    client.request(
+        'detail',
+        'get',
+        '/api/repository/{}/{}/'.format(
+            repository.get('owner__nickname'),
+            repository.get('slug')))
+
+
+def scenario_example_write(client, repository, rand):
+    response = client.request(
+        'example-new',
+        'post',
+        '/api/example/new/',
+        expected=201,
+        json={
+            'repository': repository.get('uuid'),
+            'text': 'load test {}'.format(rand.getrandbits(64)),
+            'intent': 'load_test',
+            'entities': [],
+        })
+    if response is None or response.status_code != 201:
+        return
+    client.request(
+        'example-delete',
+        'delete',
+        '/api/example/{}/'.format(response.json().get('id')),
+        expected=204)
+
+
+def scenario_analyze(client, repository, rand):
+    client.request(
+        'analyze',
+        'post',
+        '/api/repository/{}/{}/analyze/'.format(
+            repository.get('owner__nickname'),
+            repository.get('slug')),
+        data={
+            'language': repository.get('language'),
+            'text': 'hello, i want to buy a pizza',
+        })
+
+
+def scenario_train(client, repository, rand):
+    client.request(
+        'train',
+        'get',
+        '/api/repository/{}/{}/train/'.format(
+            repository.get('owner__nickname'),
+            repository.get('slug')))
+
+
+def scenario_evaluate(client, repository, rand):
+    client.request(
+        'evaluate',
+        'post',
+        '/api/repository/{}/{}/evaluate/'.format(
+            repository.get('owner__nickname'),
+            repository.get('slug')),
+        data={
+            'language': repository.get('language'),
+        })
+
+
+SCENARIOS = OrderedDict([
+    ('list', scenario_list),
+    ('detail', scenario_detail),
+    ('example-write', scenario_example_write),
+    ('analyze', scenario_analyze),
+    ('train', scenario_train),
+    ('evaluate', scenario_evaluate),
+])
+
+
+def run_scenario(name, client, repository, rand, stats):
+    """
+    Run a scenario, an unexpected exception (a response that isn't JSON,
+    a missing key) is an error of the last request of the scenario, not
+    the end of the run.
+    """
+    client.last_request = None
+    start = time.perf_counter()
+    try:
+        SCENARIOS[name](client, repository, rand)
+    except Exception as e:
+        if client.last_request is None:
+            # Raised before any request
+            stats.add(name, time.perf_counter() - start, True)
+            stats.add_exception(name, e, True)
+        else:
+            endpoint, error = client.last_request
+            stats.add_exception(endpoint, e, error)
+
+
+def parse_mix(value):
+    mix = OrderedDict()
+    for item in value.split(','):
+        try:
+            name, weight = item.split('=')
+            weight = float(weight)
+        except ValueError:
+            raise CommandError(
+                '{} is not a scenario=weight item of --mix.'.format(item))
+        if name not in SCENARIOS:
+            raise CommandError('{} is not a scenario, use one of {}.'.format(
+                name,
+                ', '.join(SCENARIOS.keys())))
+        mix[name] = weight
+    return mix
+
+
+class Command(BaseCommand):
+    help = 'Replay a mix of list, detail, example write and analyze ' + \
+        'requests against a running server and report latency ' + \
+        'percentiles, throughput and error rates by endpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'repository',
+            help='Repository as owner_nickname/slug')
+        parser.add_argument(
+            '--url',
+            dest='url',
+            default='http://localhost:8000/')
+        parser.add_argument(
+            '--token',
+            dest='token',
+            help='Token of a user that can write in the repository')
+        parser.add_argument(
+            '--email',
+            dest='email',
+            help='Login with email and --password instead of --token')
+        parser.add_argument(
+            '--password',
+            dest='password')
+        parser.add_argument(
+            '--mix',
+            dest='mix',
+            default=DEFAULT_MIX,
+            help='Scenario weights, one of {}, default is {}'.format(
+                ', '.join(SCENARIOS.keys()),
+                DEFAULT_MIX))
+        parser.add_argument(
+            '--requests',
+            dest='requests',
+            type=int,
+            default=1000,
+            help='Number of scenarios to run')
+        parser.add_argument(
+            '--duration',
+            dest='duration',
+            type=float,
+            help='Stop after these seconds even if --requests not reached')
+        parser.add_argument(
+            '--concurrency',
+            dest='concurrency',
+            type=int,
+            default=10)
+        parser.add_argument(
+            '--seed',
+            dest='seed',
+            type=int,
+            default=0)
+
+    def handle(self, *args, **options):
+        base_url = options.get('url')
+        token = options.get('token')
+        if not token:
+            if not options.get('email'):
+                raise CommandError('Use --token or --email and --password.')
+            response = requests.post(urljoin(base_url, '/api/login/'), data={
+                'username': options.get('email'),
+                'password': options.get('password'),
+            })
+            if not response.ok:
+                raise CommandError('Login failed: {}'.format(response.text))
+            token = response.json().get('token')
+
+        try:
+            owner_nickname, slug = options.get('repository').split('/')
+        except ValueError:
+            raise CommandError('Use repository as owner_nickname/slug.')
+        response = requests.get(
+            urljoin(base_url, '/api/repository/{}/{}/'.format(
+                owner_nickname,
+                slug)),
+            headers={'Authorization': 'Token {}'.format(token)})
+        if response.status_code != 200:
+            raise CommandError('Repository not found: {}'.format(
+                response.status_code))
+        repository = response.json()
+        repository['owner__nickname'] = owner_nickname
+
+        mix = parse_mix(options.get('mix'))
+        rand = random.Random(options.get('seed'))
+        scenarios = rand.choices(
+            list(mix.keys()),
+            weights=list(mix.values()),
+            k=options.get('requests'))
+        stats = Stats()
+        local = threading.local()
+        deadline = None
+        if options.get('duration'):
+            deadline = time.perf_counter() + options.get('duration')
+
+        def run(i):
+            if deadline and time.perf_counter() > deadline:
+                return
+            if not hasattr(local, 'client'):
+                local.client = Client(base_url, token, stats)
+                local.random = random.Random(
+                    '{}-{}'.format(options.get('seed'), i))
+            run_scenario(
+                scenarios[i],
+                local.client,
+                repository,
+                local.random,
+                stats)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options.get('concurrency')) as executor:
+            list(executor.map(run, range(len(scenarios))))
+        duration = time.perf_counter() - start
+
+        for line in stats.report(duration):
+            self.stdout.write(line)
+        self.stdout.write('{} requests in {:.1f}s, {:.1f} req/s'.format(
+            sum(map(len, stats.timings.values())),
+            duration,
+            sum(map(len, stats.timings.values())) / duration))
@@ -0,0 +1,205 @@
+import json
+import time
+import random
+
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+
+ENDPOINTS = ['train', 'parse', 'evaluate']
+
+
+def parse_per_endpoint(values, cast, default):
+    """
+    Parse ['50', 'train=2000'] to {'train': 2000.0, 'parse': 50.0, ...}, a
+    value without an endpoint is used for all the others.
+    """
+    r = dict.fromkeys(ENDPOINTS, default)
+    overrides = {}
+    for value in values or []:
+        if '=' in value:
+            endpoint, value = value.split('=', 1)
+            if endpoint not in ENDPOINTS:
+                raise CommandError('{} is not a NLP endpoint.'.format(
+                    endpoint))
+            overrides[endpoint] = cast(value)
+        else:
+            r = dict.fromkeys(ENDPOINTS, cast(value))
+    r.update(overrides)
+    return r
+
+
+def train_response(data):
+    return {
+        'SUPPORTED_LANGUAGES': [],
+        'languages_report': {},
+        'stub': True,
+    }
+
+
+def parse_response(data):
+    text = data.get('text', '')
+    return {
+        'text': text,
+        'language': data.get('language'),
+        'update_id': 0,
+        'intent': {
+            'name': 'stub',
+            'confidence': 1.0,
+        },
+        'intent_ranking': [
+            {
+                'name': 'stub',
+                'confidence': 1.0,
+            },
+        ],
+        'labels_list': [],
+        'entities_list': [],
+        'entities': {},
+    }
+
+
+def evaluate_response(data):
+    return {
+        'language': data.get('language'),
+        'status': 'Evaluation created successfully',
+        'update_id': 0,
+        'evaluate_id': 0,
+        'evaluate_version': 0,
+    }
+
+
+RESPONSES = {
+    'train': train_response,
+    'parse': parse_response,
+    'evaluate': evaluate_response,
+}
+
+
+class NLPStubHandler(BaseHTTPRequestHandler):
+    # Set by make_server
+    latency = None
+    jitter = None
+    failure_rate = None
+    random = None
+    verbose = False
+
+    def do_POST(self):
+        endpoint = self.path.strip('/').split('/')[-1]
+        if endpoint not in RESPONSES:
+            return self.respond(404, {'error': {'message': 'Not found'}})
+
+        length = int(self.headers.get('Content-Length') or 0)
+        data = {
+            key: values[-1]
+            for key, values in parse_qs(
+                self.rfile.read(length).decode()).items()}
+
+        delay = self.latency[endpoint] + self.random.uniform(
+            -self.jitter[endpoint],
+            self.jitter[endpoint])
+        time.sleep(max(delay, 0) / 1000)
+
+        if not self.headers.get('Authorization'):
+            return self.respond(401, {
+                'error': {'message': 'Missing Authorization header'}})
+        if self.random.random() < self.failure_rate[endpoint]:
+            return self.respond(500, {
+                'error': {'message': 'Stub failure'}})
+        self.respond(200, RESPONSES[endpoint](data))
+
+    def respond(self, status_code, data):
+        body = json.dumps(data).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        if self.verbose:
+            super().log_message(*args)
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def make_server(host='localhost', port=2657, latency=None, jitter=None,
+                failure_rate=None, seed=None, verbose=False):
+    handler = type('NLPStubHandler', (NLPStubHandler,), {
+        'latency': latency or dict.fromkeys(ENDPOINTS, 0),
+        'jitter': jitter or dict.fromkeys(ENDPOINTS, 0),
+        'failure_rate': failure_rate or dict.fromkeys(ENDPOINTS, 0),
+        'random': random.Random(seed),
+        'verbose': verbose,
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+class Command(BaseCommand):
+    help = 'Run a stub of bothub-nlp (train/, parse/ and evaluate/) ' + \
+        'with configurable latency and failure rates, for load tests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--host',
+            dest='host',
+            default='localhost')
+        parser.add_argument(
+            '--port',
+            dest='port',
+            type=int,
+            default=2657)
+        parser.add_argument(
+            '--latency',
+            dest='latency',
+            action='append',
+            help='Latency in milliseconds, to all endpoints or to one ' +
+                 'like train=2000, can be used many times')
+        parser.add_argument(
+            '--jitter',
+            dest='jitter',
+            action='append',
+            help='Random variation of latency in milliseconds, same ' +
+                 'format of --latency')
+        parser.add_argument(
+            '--failure-rate',
+            dest='failure_rate',
+            action='append',
+            help='Share of requests that fail with status 500, from 0 to ' +
+                 '1, same format of --latency')
+        parser.add_argument(
+            '--seed',
+            dest='seed',
+            type=int)
+        parser.add_argument(
+            '--verbose',
+            dest='verbose',
+            action='store_true')
+
+    def handle(self, *args, **options):
+        server = make_server(
+            host=options.get('host'),
+            port=options.get('port'),
+            latency=parse_per_endpoint(options.get('latency'), float, 0),
+            jitter=parse_per_endpoint(options.get('jitter'), float, 0),
+            failure_rate=parse_per_endpoint(
+                options.get('failure_rate'),
+                float,
+                0),
+            seed=options.get('seed'),
+            verbose=options.get('verbose'))
+        self.stdout.write('NLP stub listening on http://{}:{}/'.format(
+            *server.server_address))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from bothub.api.query_budget import ENDPOINTS
+from bothub.api.query_budget import create_context
+from bothub.api.query_budget import run_endpoint
+from bothub.api.query_budget import format_report
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Seed a repository, request every API endpoint and report ' + \
+        'the queries of each one by serializer field. All changes are ' + \
+        'rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--examples',
+            dest='examples',
+            type=int,
+            default=2000)
+        parser.add_argument(
+            '--origins',
+            dest='origins',
+            type=int,
+            default=5,
+            help='How many query origins show by endpoint')
+        parser.add_argument(
+            '--endpoint',
+            dest='endpoints',
+            action='append',
+            help='Endpoint name, can be used many times')
+
+    def handle(self, *args, **options):
+        endpoints = ENDPOINTS
+        if options.get('endpoints'):
+            endpoints = [
+                endpoint for endpoint in ENDPOINTS
+                if endpoint.name in options.get('endpoints')]
+        try:
+            with transaction.atomic(), override_settings(
+                    EMAIL_BACKEND='django.core.mail.backends.locmem.' +
+                    'EmailBackend'):
+                context = create_context(examples=options.get('examples'))
+                for endpoint in endpoints:
+                    response, profiler = run_endpoint(endpoint, context)
+                    over_budget = \
+                        response.status_code != endpoint.status or \
+                        profiler.count > endpoint.max_queries or \
+                        endpoint.max_time is not None and \
+                        profiler.time > endpoint.max_time
+                    report = format_report(
+                        endpoint,
+                        response,
+                        profiler,
+                        origins=options.get('origins'))
+                    if over_budget and endpoint.known_issue:
+                        report += '\n    known issue: {}'.format(
+                            endpoint.known_issue)
+                    if over_budget:
+                        self.stdout.write(self.style.ERROR(report))
+                    else:
+                        self.stdout.write(report)
+                raise Rollback()
+        except Rollback:
+            pass
@@ -0,0 +1,46 @@
+"""
+Querysets loading, in a fixed number of queries, everything the example
+and translation serializers of v1 and v2 render: the update of the
+example (language), the entities and their labels, the translations with
+their entities and, for from_language, the original example.
+"""
+
+from django.db.models import Prefetch
+
+from bothub.common.models import RepositoryExampleEntity
+from bothub.common.models import RepositoryTranslatedExample
+from bothub.common.models import RepositoryTranslatedExampleEntity
+
+
+def example_entities():
+    return RepositoryExampleEntity.objects.select_related(
+        'entity__label')
+
+
+def translated_example_entities():
+    return RepositoryTranslatedExampleEntity.objects.select_related(
+        'entity')
+
+
+def prefetch_examples(queryset, nested_translations=True):
+    """
+    For RepositoryExampleSerializer, nested_translations when it renders
+    the translations (v1) instead of their ids (v2).
+    """
+    translations = RepositoryTranslatedExample.objects.all()
+    if nested_translations:
+        translations = translations.prefetch_related(
+            Prefetch('entities', queryset=translated_example_entities()))
+    return queryset.select_related(
+        'repository_update__repository').prefetch_related(
+            Prefetch('entities', queryset=example_entities()),
+            Prefetch('translations', queryset=translations))
+
+
+def prefetch_translations(queryset):
+    """
+    For RepositoryTranslatedExampleSerializer.
+    """
+    return queryset.select_related(
+        'original_example__repository_update__repository').prefetch_related(
+            Prefetch('entities', queryset=translated_example_entities()))
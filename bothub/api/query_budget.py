@@ -0,0 +1,829 @@
+import sys
+import time
+import random
+
+from collections import namedtuple
+from collections import OrderedDict
+from contextlib import contextmanager
+from unittest import mock
+
+from django.db import connection
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from bothub.authentication.models import User
+from bothub.authentication.authentication import token_cache
+from bothub.common.models import Repository
+from bothub.common.models import RepositoryCategory
+from bothub.common.models import RepositoryUpdate
+from bothub.common.models import RepositoryExample
+from bothub.common.models import RepositoryExampleEntity
+from bothub.common.models import RepositoryTranslatedExample
+from bothub.common.models import RepositoryTranslatedExampleEntity
+from bothub.common.models import RepositoryEntity
+from bothub.common.models import RepositoryEntityLabel
+from bothub.common.models import RepositoryEvaluate
+from bothub.common.models import RepositoryEvaluateEntity
+from bothub.common.models import RepositoryEvaluateResult
+from bothub.common.models import RepositoryEvaluateResultScore
+from bothub.common.models import RepositoryEvaluateResultIntent
+from bothub.common.models import RepositoryEvaluateResultEntity
+from bothub.common.models import RequestRepositoryAuthorization
+from bothub.common.models import RepositoryJob
+from bothub.common.models import RepositoryTrainingJob
+from bothub.common.models import RepositoryEvaluateJob
+from bothub.common.models import RepositoryCloneJob
+from bothub.common import languages
+
+
+# Profiler
+
+# Middlewares wrap every request, they are never the origin
+MIDDLEWARE_MODULES = (
+    'bothub.health.',
+    'bothub.common.replicas',
+    'bothub.api.compression',
+)
+
+
+class QueryProfiler(object):
+    """
+    Count and time every SQL query executed while active and attribute
+    each one to the serializer field (or bothub function) that ran it.
+    """
+
+    def __init__(self, using=connection):
+        self.connection = using
+        self.queries = []
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def time(self):
+        return sum(map(lambda q: q.get('time'), self.queries))
+
+    @property
+    def origins(self):
+        r = OrderedDict()
+        for query in self.queries:
+            origin = r.setdefault(query.get('origin'), {
+                'count': 0,
+                'time': 0,
+                'sql': query.get('sql'),
+            })
+            origin['count'] += 1
+            origin['time'] += query.get('time')
+        return OrderedDict(sorted(
+            r.items(),
+            key=lambda x: x[1].get('count'),
+            reverse=True))
+
+    def __enter__(self):
+        self.queries = []
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self._wrapper.__exit__(*args)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'time': time.perf_counter() - start,
+                'origin': self.get_origin(sys._getframe(1)),
+            })
+
+    @classmethod
+    def get_origin(cls, frame):
+        bothub_origin = None
+        library_origin = None
+        while frame and frame.f_code.co_filename != __file__:
+            f_locals = frame.f_locals
+            instance = f_locals.get('self')
+            field = f_locals.get('field')
+            if frame.f_code.co_name == 'to_representation' and \
+               isinstance(instance, serializers.Serializer) and \
+               isinstance(field, serializers.Field):
+                field_origin = '{}.{}'.format(
+                    type(instance).__name__,
+                    field.field_name)
+                if bothub_origin:
+                    return '{} ({})'.format(field_origin, bothub_origin)
+                return field_origin
+            module = frame.f_globals.get('__name__', '')
+            origin = '{}:{}'.format(module, frame.f_code.co_name)
+            if bothub_origin is None and module.startswith('bothub.') and \
+               not module.startswith(MIDDLEWARE_MODULES):
+                bothub_origin = origin
+            if library_origin is None and \
+               not module.startswith('django.db'):
+                library_origin = origin
+            frame = frame.f_back
+        return bothub_origin or library_origin or 'unknown'
+
+
+# Dataset
+
+def seed_repository(owner, slug='budget', examples=2000, intents=20,
+                    entities=30, labels=6, translation_ratio=.5,
+                    evaluations=100, seed=0):
+    rand = random.Random(seed)
+    language = languages.LANGUAGE_EN
+    translation_language = languages.LANGUAGE_PT
+
+    repository = Repository.objects.create(
+        owner=owner,
+        name='Budget {}'.format(slug),
+        slug=slug,
+        language=language)
+    repository.categories.add(*RepositoryCategory.objects.all())
+    update = repository.current_update()
+    translation_update = repository.current_update(translation_language)
+
+    RepositoryEntityLabel.objects.bulk_create([
+        RepositoryEntityLabel(
+            repository=repository,
+            value='label_{}'.format(i))
+        for i in range(labels)])
+    labels_list = list(repository.labels.all())
+    RepositoryEntity.objects.bulk_create([
+        RepositoryEntity(
+            repository=repository,
+            value='entity_{}'.format(i),
+            label=labels_list[i % labels] if i % 3 and labels else None)
+        for i in range(entities)])
+    entities_list = list(repository.entities.all())
+
+    RepositoryExample.objects.bulk_create([
+        RepositoryExample(
+            repository_update=update,
+            text='example {} about intent {}'.format(i, i % intents),
+            intent='intent_{}'.format(i % intents))
+        for i in range(examples)])
+    examples_list = list(repository.examples().order_by('id'))
+    examples_entity = {
+        example.pk: rand.choice(entities_list)
+        for example in examples_list
+        if rand.random() < .5}
+    RepositoryExampleEntity.objects.bulk_create([
+        RepositoryExampleEntity(
+            repository_example_id=example_id,
+            start=0,
+            end=7,
+            entity=entity)
+        for example_id, entity in examples_entity.items()])
+
+    RepositoryTranslatedExample.objects.bulk_create([
+        RepositoryTranslatedExample(
+            repository_update=translation_update,
+            original_example=example,
+            language=translation_language,
+            text='exemplo {}'.format(example.pk))
+        for example in examples_list
+        if rand.random() < translation_ratio])
+    RepositoryTranslatedExampleEntity.objects.bulk_create([
+        RepositoryTranslatedExampleEntity(
+            repository_translated_example=translated,
+            start=0,
+            end=7,
+            entity=examples_entity.get(translated.original_example_id))
+        for translated in RepositoryTranslatedExample.objects.filter(
+            repository_update=translation_update)
+        if translated.original_example_id in examples_entity])
+
+    RepositoryEvaluate.objects.bulk_create([
+        RepositoryEvaluate(
+            repository_update=update,
+            text='evaluate {} about intent {}'.format(i, i % intents),
+            intent='intent_{}'.format(i % intents))
+        for i in range(evaluations)])
+    RepositoryEvaluateEntity.objects.bulk_create([
+        RepositoryEvaluateEntity(
+            repository_evaluate=evaluate,
+            start=0,
+            end=8,
+            entity=rand.choice(entities_list))
+        for evaluate in repository.evaluations()
+        if rand.random() < .5])
+
+    for i in range(2):
+        result = RepositoryEvaluateResult.objects.create(
+            repository_update=update,
+            intent_results=RepositoryEvaluateResultScore.objects.create(
+                precision=.9, f1_score=.9, accuracy=.9, recall=.9),
+            entity_results=RepositoryEvaluateResultScore.objects.create(
+                precision=.8, f1_score=.8, accuracy=.8, recall=.8),
+            matrix_chart='https://example.com/matrix.png',
+            confidence_chart='https://example.com/confidence.png',
+            log='[]')
+        for intent in range(intents):
+            RepositoryEvaluateResultIntent.objects.create(
+                evaluate_result=result,
+                intent='intent_{}'.format(intent),
+                score=RepositoryEvaluateResultScore.objects.create(
+                    precision=.7, f1_score=.7, recall=.7, support=5))
+        for entity in entities_list:
+            RepositoryEvaluateResultEntity.objects.create(
+                evaluate_result=result,
+                entity=entity,
+                score=RepositoryEvaluateResultScore.objects.create(
+                    precision=.6, f1_score=.6, recall=.6, support=5))
+
+    return repository
+
+
+def create_context(**kwargs):
+    for i in range(3):
+        RepositoryCategory.objects.create(name='Category {}'.format(i))
+    owner = User.objects.create_user(
+        'owner@budget.com',
+        'budget_owner',
+        'owner',
+        name='Owner')
+    user = User.objects.create_user(
+        'user@budget.com',
+        'budget_user',
+        'user',
+        name='User')
+    reader = User.objects.create_user(
+        'reader@budget.com',
+        'budget_reader',
+        'reader',
+        name='Reader')
+    repository = seed_repository(owner, **kwargs)
+    trained_update = repository.current_update()
+    trained_update.start_training(owner)
+    trained_update.save_training(b'bot data')
+    RequestRepositoryAuthorization.objects.create(
+        user=user,
+        repository=repository,
+        text='I can contribute')
+    training_job = RepositoryTrainingJob.objects.create(
+        repository=repository,
+        language=repository.language,
+        by=owner,
+        status=RepositoryJob.STATUS_SUCCESS,
+        repository_update=trained_update)
+    evaluate_job = RepositoryEvaluateJob.objects.create(
+        repository=repository,
+        language=repository.language,
+        by=owner,
+        status=RepositoryJob.STATUS_SUCCESS,
+        repository_update=trained_update)
+    clone_job = RepositoryCloneJob.objects.create(
+        repository=repository,
+        language=repository.language,
+        by=owner,
+        status=RepositoryJob.STATUS_SUCCESS,
+        clone=Repository.objects.create(
+            owner=reader,
+            name='Budget clone',
+            slug='budget-clone',
+            language=repository.language,
+            is_private=True))
+    return {
+        'owner': owner,
+        'owner_token': Token.objects.create(user=owner).key,
+        'user': user,
+        'user_token': Token.objects.create(user=user).key,
+        'reader': reader,
+        'reader_token': Token.objects.create(user=reader).key,
+        'repository': repository,
+        'category': RepositoryCategory.objects.first(),
+        'example': repository.examples().filter(
+            entities__isnull=False,
+            translations__isnull=False).first(),
+        'translation': RepositoryTranslatedExample.objects.filter(
+            repository_update__repository=repository).first(),
+        'evaluate': repository.evaluations().first(),
+        'result': repository.evaluations_results().first(),
+        'request': RequestRepositoryAuthorization.objects.get(
+            user=user,
+            repository=repository),
+        'update': RepositoryUpdate.objects.get(pk=trained_update.pk),
+        'training_job': training_job,
+        'evaluate_job': evaluate_job,
+        'clone_job': clone_job,
+        'nlp_token': str(repository.get_user_authorization(owner).uuid),
+    }
+
+
+# NLP
+
+class NLPResponse(object):
+    status_code = 200
+
+    def json(self):
+        return {}
+
+
+@contextmanager
+def nlp_stub():
+    response = NLPResponse()
+    with mock.patch.object(
+            Repository,
+            'request_nlp_train',
+            return_value=response), \
+        mock.patch.object(
+            Repository,
+            'request_nlp_analyze',
+            return_value=response), \
+        mock.patch.object(
+            Repository,
+            'request_nlp_evaluate',
+            return_value=response):
+        yield
+
+
+# Endpoints
+
+Endpoint = namedtuple('Endpoint', [
+    'name',
+    'method',
+    'path',
+    'data',
+    'max_queries',
+    'max_time',
+    'token',
+    'keyword',
+    'status',
+    'known_issue',
+    'known_queries',
+])
+
+# Expected status by method, a request that fails early runs fewer queries
+METHOD_STATUS = {
+    'get': 200,
+    'post': 201,
+    'put': 200,
+    'patch': 200,
+    'delete': 204,
+}
+
+# Known issues, the endpoints over their budget until they're fixed
+REPOSITORY_SERIALIZER = 'RepositorySerializer recomputes the ' + \
+    'requirements to train of every language for each field that uses them'
+DELETE_CASCADE = 'The Django deletion collector selects every related ' + \
+    'model of the repository, one query each'
+SQLITE_BULK_CREATE = 'SQLite does not return the ids of a bulk insert, ' + \
+    'the scores are saved one by one (2 queries in PostgreSQL)'
+
+
+def endpoint(name, method, path, max_queries, data=None, max_time=None,
+             token='owner_token', keyword='Token', status=None,
+             known_issue=None, known_queries=None):
+    """
+    max_queries is the budget of the endpoint. An endpoint with a known
+    issue is over it, known_queries is then the most it can run until the
+    issue is fixed. max_time, in seconds, is only checked by the
+    query_budget_report command, timings are too noisy for the tests.
+    """
+    return Endpoint(
+        name,
+        method,
+        path,
+        data or (lambda c: {}),
+        max_queries,
+        max_time,
+        token,
+        keyword,
+        status or METHOD_STATUS.get(method),
+        known_issue,
+        known_queries)
+
+
+def repository_path(suffix=''):
+    return lambda c: '/api/repository/{}/{}/{}'.format(
+        c['owner'].nickname,
+        c['repository'].slug,
+        suffix)
+
+
+def repository_uuid(c):
+    return {'repository_uuid': str(c['repository'].uuid)}
+
+
+ENDPOINTS = [
+    # v1
+    endpoint(
+        'v1-repository-new', 'post',
+        lambda c: '/api/repository/new/',
+        max_queries=25,
+        known_issue=REPOSITORY_SERIALIZER,
+        known_queries=51,
+        data=lambda c: {
+            'name': 'New', 'slug': 'new', 'language': 'en',
+            'categories': [c['category'].pk], 'description': ''}),
+    endpoint(
+        'v1-my-repositories', 'get',
+        lambda c: '/api/my-repositories/',
+        max_queries=30,
+        known_issue=REPOSITORY_SERIALIZER,
+        known_queries=83),
+    endpoint(
+        'v1-repository-detail', 'get',
+        repository_path(),
+        max_queries=30,
+        known_issue=REPOSITORY_SERIALIZER,
+        known_queries=82),
+    endpoint(
+        'v1-repository-update', 'patch',
+        repository_path(),
+        max_queries=7,
+        data=lambda c: {'description': 'changed'}),
+    endpoint(
+        'v1-repository-delete', 'delete',
+        repository_path(),
+        max_queries=40,
+        known_issue=DELETE_CASCADE,
+        known_queries=110),
+    endpoint(
+        'v1-repository-languagesstatus', 'get',
+        repository_path('languagesstatus/'),
+        max_queries=11),
+    endpoint(
+        'v1-repository-authorization', 'get',
+        repository_path('authorization/'),
+        max_queries=3),
+    endpoint(
+        'v1-repository-train', 'get',
+        repository_path('train/'),
+        max_queries=3),
+    endpoint(
+        'v1-repository-analyze', 'post',
+        repository_path('analyze/'),
+        max_queries=3,
+        status=200,
+        data=lambda c: {'language': 'en', 'text': 'hi'}),
+    endpoint(
+        'v1-repository-evaluate', 'post',
+        repository_path('evaluate/'),
+        max_queries=5,
+        status=200,
+        data=lambda c: {'language': 'en'}),
+    endpoint(
+        'v1-repository-vote', 'post',
+        repository_path('vote/'),
+        max_queries=8,
+        data=lambda c: {'vote': 1}),
+    endpoint(
+        'v1-example-new', 'post',
+        lambda c: '/api/example/new/',
+        max_queries=16,
+        data=lambda c: {
+            'repository': str(c['repository'].uuid),
+            'text': 'my new example', 'intent': 'intent_0',
+            'entities': [{'start': 0, 'end': 2, 'entity': 'entity_0'}]}),
+    endpoint(
+        'v1-example-detail', 'get',
+        lambda c: '/api/example/{}/'.format(c['example'].pk),
+        max_queries=6),
+    endpoint(
+        'v1-example-delete', 'delete',
+        lambda c: '/api/example/{}/'.format(c['example'].pk),
+        max_queries=11),
+    endpoint(
+        'v1-translate-example', 'post',
+        lambda c: '/api/translate-example/',
+        max_queries=13,
+        data=lambda c: {
+            'original_example': c['repository'].examples().filter(
+                entities__isnull=True,
+                translations__isnull=True).first().pk,
+            'language': 'pt', 'text': 'novo exemplo', 'entities': []}),
+    endpoint(
+        'v1-translation-detail', 'get',
+        lambda c: '/api/translation/{}/'.format(c['translation'].pk),
+        max_queries=4),
+    endpoint(
+        'v1-translation-update', 'patch',
+        lambda c: '/api/translation/{}/'.format(c['translation'].pk),
+        max_queries=8,
+        data=lambda c: {'text': 'exemplo alterado'}),
+    endpoint(
+        'v1-translation-delete', 'delete',
+        lambda c: '/api/translation/{}/'.format(c['translation'].pk),
+        max_queries=7),
+    endpoint(
+        'v1-examples', 'get',
+        lambda c: '/api/examples/',
+        max_queries=9,
+        data=repository_uuid),
+    endpoint(
+        'v1-register', 'post',
+        lambda c: '/api/register/',
+        max_queries=4,
+        token=None,
+        data=lambda c: {
+            'email': 'new@budget.com', 'name': 'New', 'nickname': 'new',
+            'password': 'Budg3t-pass'}),
+    endpoint(
+        'v1-login', 'post',
+        lambda c: '/api/login/',
+        max_queries=2,
+        status=200,
+        token=None,
+        data=lambda c: {'username': 'owner@budget.com', 'password': 'owner'}),
+    endpoint(
+        'v1-change-password', 'put',
+        lambda c: '/api/change-password/',
+        max_queries=3,
+        data=lambda c: {
+            'current_password': 'owner', 'password': 'Budg3t-pass'}),
+    endpoint(
+        'v1-forgot-password', 'post',
+        lambda c: '/api/forgot-password/',
+        max_queries=3,
+        status=200,
+        token=None,
+        data=lambda c: {'email': 'owner@budget.com'}),
+    endpoint(
+        'v1-reset-password', 'put',
+        lambda c: '/api/reset-password/{}/'.format(c['owner'].nickname),
+        max_queries=4,
+        token=None,
+        data=lambda c: {
+            'token': c['owner'].make_password_reset_token(),
+            'password': 'Budg3t-pass'}),
+    endpoint(
+        'v1-my-profile', 'get',
+        lambda c: '/api/my-profile/',
+        max_queries=1),
+    endpoint(
+        'v1-user-profile', 'get',
+        lambda c: '/api/user-profile/{}/'.format(c['user'].nickname),
+        max_queries=2),
+    endpoint(
+        'v1-categories', 'get',
+        lambda c: '/api/categories/',
+        max_queries=2),
+    endpoint(
+        'v1-repositories', 'get',
+        lambda c: '/api/repositories/',
+        max_queries=30,
+        known_issue=REPOSITORY_SERIALIZER,
+        known_queries=83),
+    endpoint(
+        'v1-translations', 'get',
+        lambda c: '/api/translations/',
+        max_queries=7,
+        data=repository_uuid),
+    endpoint(
+        'v1-authorizations', 'get',
+        lambda c: '/api/authorizations/',
+        max_queries=4,
+        data=lambda c: {'repository': str(c['repository'].uuid)}),
+    endpoint(
+        'v1-authorization-role', 'patch',
+        lambda c: '/api/authorization-role/{}/{}/'.format(
+            c['repository'].uuid,
+            c['user'].nickname),
+        max_queries=17,
+        data=lambda c: {'role': 2}),
+    endpoint(
+        'v1-search-user', 'get',
+        lambda c: '/api/search-user/',
+        max_queries=2,
+        data=lambda c: {'search': 'budget'}),
+    endpoint(
+        'v1-request-authorization', 'post',
+        lambda c: '/api/request-authorization/',
+        max_queries=8,
+        token='reader_token',
+        data=lambda c: {
+            'repository': str(c['repository'].uuid), 'text': 'let me in'}),
+    endpoint(
+        'v1-authorization-requests', 'get',
+        lambda c: '/api/authorization-requests/',
+        max_queries=6,
+        data=repository_uuid),
+    endpoint(
+        'v1-review-authorization-request', 'patch',
+        lambda c: '/api/review-authorization-request/{}/'.format(
+            c['request'].pk),
+        max_queries=13,
+        data=lambda c: {}),
+    endpoint(
+        'v1-reject-authorization-request', 'delete',
+        lambda c: '/api/review-authorization-request/{}/'.format(
+            c['request'].pk),
+        max_queries=7),
+    endpoint(
+        'v1-entities', 'get',
+        lambda c: '/api/entities/',
+        max_queries=5,
+        data=repository_uuid),
+    endpoint(
+        'v1-updates', 'get',
+        lambda c: '/api/updates/',
+        max_queries=7,
+        data=repository_uuid),
+    # v2
+    endpoint(
+        'v2-repository-create', 'post',
+        lambda c: '/v2/repository/',
+        max_queries=30,
+        known_issue=REPOSITORY_SERIALIZER,
+        known_queries=57,
+        data=lambda c: {
+            'name': 'New', 'slug': 'new', 'language': 'en',
+            'categories': [c['category'].pk]}),
+    endpoint(
+        'v2-repository-detail', 'get',
+        lambda c: '/v2/repository/{}/'.format(c['repository'].uuid),
+        max_queries=40,
+        known_issue=REPOSITORY_SERIALIZER,
+        known_queries=92),
+    endpoint(
+        'v2-repository-duplicates', 'get',
+        lambda c: '/v2/repository/{}/duplicates/'.format(
+            c['repository'].uuid),
+        max_queries=6),
+    endpoint(
+        'v2-repository-update', 'patch',
+        lambda c: '/v2/repository/{}/'.format(c['repository'].uuid),
+        max_queries=40,
+        known_issue=REPOSITORY_SERIALIZER,
+        known_queries=93,
+        data=lambda c: {'description': 'changed'}),
+    endpoint(
+        'v2-repository-delete', 'delete',
+        lambda c: '/v2/repository/{}/'.format(c['repository'].uuid),
+        max_queries=40,
+        known_issue=DELETE_CASCADE,
+        known_queries=110),
+    endpoint(
+        'v2-repository-shortcut', 'get',
+        lambda c: '/v2/repository-shortcut/{}/{}/'.format(
+            c['owner'].nickname,
+            c['repository'].slug),
+        max_queries=1,
+        status=302),
+    endpoint(
+        'v2-repositories', 'get',
+        lambda c: '/v2/repositories/',
+        max_queries=8),
+    endpoint(
+        'v2-examples', 'get',
+        lambda c: '/v2/examples/',
+        max_queries=8,
+        data=repository_uuid),
+    endpoint(
+        'v2-evaluate-list', 'get',
+        lambda c: '/v2/evaluate/',
+        max_queries=7,
+        data=repository_uuid),
+    endpoint(
+        'v2-evaluate-create', 'post',
+        lambda c: '/v2/evaluate/',
+        max_queries=9,
+        data=lambda c: {
+            'repository': str(c['repository'].uuid), 'language': 'en',
+            'text': 'evaluate new', 'intent': 'intent_0',
+            'entities': []}),
+    endpoint(
+        'v2-evaluate-detail', 'get',
+        lambda c: '/v2/evaluate/{}/'.format(c['evaluate'].pk),
+        max_queries=5),
+    endpoint(
+        'v2-evaluate-update', 'put',
+        lambda c: '/v2/evaluate/{}/'.format(c['evaluate'].pk),
+        max_queries=14,
+        data=lambda c: {
+            'repository': str(c['repository'].uuid), 'language': 'en',
+            'text': 'evaluate changed', 'intent': 'intent_0',
+            'entities': []}),
+    endpoint(
+        'v2-evaluate-delete', 'delete',
+        lambda c: '/v2/evaluate/{}/'.format(c['evaluate'].pk),
+        max_queries=10),
+    endpoint(
+        'v2-evaluate-results', 'get',
+        lambda c: '/v2/evaluate/results/',
+        max_queries=8,
+        data=repository_uuid),
+    endpoint(
+        'v2-evaluate-result-detail', 'get',
+        lambda c: '/v2/evaluate/results/{}/'.format(c['result'].pk),
+        max_queries=10,
+        data=repository_uuid),
+    endpoint(
+        'v2-evaluate-results-report', 'post',
+        lambda c: '/v2/evaluate/results/report/',
+        max_queries=25,
+        known_issue=SQLITE_BULK_CREATE,
+        known_queries=73,
+        token='nlp_token',
+        keyword='Bearer',
+        data=lambda c: {
+            'language': 'en',
+            'matrix_chart': 'https://example.com/matrix.png',
+            'confidence_chart': 'https://example.com/confidence.png',
+            'log': [{'text': 'hi', 'intent': 'intent_0'}],
+            'intent_results': {
+                'precision': .9, 'f1_score': .9, 'accuracy': .9},
+            'entity_results': {
+                'precision': .8, 'f1_score': .8, 'accuracy': .8},
+            'intents_list': [
+                {'intent': 'intent_{}'.format(i), 'score': {
+                    'precision': .7, 'recall': .7, 'f1_score': .7,
+                    'support': 5}}
+                for i in range(20)],
+            'entities_list': [
+                {'entity': 'entity_{}'.format(i), 'score': {
+                    'precision': .6, 'recall': .6, 'f1_score': .6,
+                    'support': 5}}
+                for i in range(30)]}),
+    endpoint(
+        'v2-evaluate-jobs', 'get',
+        lambda c: '/v2/evaluate/jobs/',
+        max_queries=5,
+        data=repository_uuid),
+    endpoint(
+        'v2-evaluate-job-create', 'post',
+        lambda c: '/v2/evaluate/jobs/',
+        max_queries=15,
+        data=lambda c: {'repository': str(c['repository'].uuid)}),
+    endpoint(
+        'v2-evaluate-job-detail', 'get',
+        lambda c: '/v2/evaluate/jobs/{}/'.format(c['evaluate_job'].pk),
+        max_queries=3),
+    endpoint(
+        'v2-training-jobs', 'get',
+        lambda c: '/v2/training/',
+        max_queries=5,
+        data=repository_uuid),
+    endpoint(
+        'v2-training-job-create', 'post',
+        lambda c: '/v2/training/',
+        max_queries=20,
+        data=lambda c: {
+            'repository': str(c['repository'].uuid), 'language': 'pt'}),
+    endpoint(
+        'v2-training-job-detail', 'get',
+        lambda c: '/v2/training/{}/'.format(c['training_job'].pk),
+        max_queries=3),
+    endpoint(
+        'v2-clone-jobs', 'get',
+        lambda c: '/v2/clone/',
+        max_queries=3),
+    endpoint(
+        'v2-clone-job-create', 'post',
+        lambda c: '/v2/clone/',
+        max_queries=9,
+        data=lambda c: {
+            'repository': str(c['repository'].uuid), 'slug': 'budget-new',
+            'is_private': False}),
+    endpoint(
+        'v2-clone-job-detail', 'get',
+        lambda c: '/v2/clone/{}/'.format(c['clone_job'].pk),
+        max_queries=2),
+]
+
+
+def run_endpoint(endpoint, context):
+    client = APIClient()
+    token = context.get(endpoint.token) if endpoint.token else None
+    if token:
+        client.credentials(HTTP_AUTHORIZATION='{} {}'.format(
+            endpoint.keyword,
+            token))
+    data = endpoint.data(context)
+    path = endpoint.path(context)
+    profiler = QueryProfiler()
+    # Budgets include the authentication query of a token not used lately
+    token_cache.clear()
+    with transaction.atomic(), nlp_stub():
+        with profiler:
+            if endpoint.method == 'get':
+                response = client.get(path, data)
+            else:
+                response = getattr(client, endpoint.method)(
+                    path,
+                    data,
+                    format='json')
+        transaction.set_rollback(True)
+    return response, profiler
+
+
+def format_report(endpoint, response, profiler, origins=5):
+    lines = ['{:<36} {:>3} {:>5} queries {:>9.2f}ms'.format(
+        endpoint.name,
+        response.status_code,
+        profiler.count,
+        profiler.time * 1000)]
+    for origin, data in list(profiler.origins.items())[:origins]:
+        lines.append('    {:>5} {:>9.2f}ms  {}'.format(
+            data.get('count'),
+            data.get('time') * 1000,
+            origin))
+    return '\n'.join(lines)
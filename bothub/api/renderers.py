@@ -0,0 +1,66 @@
+"""
+JSON rendering with orjson, several times faster than the json module in
+the large repository and example payloads. Without orjson installed, or
+when the data has something orjson doesn't encode the same way, the
+stock DRF JSONRenderer renders it.
+"""
+
+import math
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def has_special_floats(data):
+    """
+    If data has a float orjson doesn't render like the json module: NaN
+    and Infinity (an error with STRICT_JSON, null in orjson) and the
+    ones json writes with an exponent (1e+16, 1e-05).
+    """
+    values = [data]
+    while values:
+        value = values.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value) or \
+                    value and not 1e-4 <= abs(value) < 1e16:
+                return True
+        elif isinstance(value, dict):
+            values.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            values.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    def __init__(self):
+        # Lazy translations, Decimal, generators, like the stock encoder
+        self.default = self.encoder_class().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or \
+                not self.compact or \
+                self.get_indent(accepted_media_type, renderer_context or {}) \
+                or has_special_floats(data):
+            return super().render(
+                data,
+                accepted_media_type,
+                renderer_context)
+        try:
+            # Dates formatted by the stock encoder too
+            ret = orjson.dumps(
+                data,
+                default=self.default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except (TypeError, ValueError):
+            return super().render(
+                data,
+                accepted_media_type,
+                renderer_context)
+        # Strict javascript subset, like the stock renderer
+        return ret.replace(
+            b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,174 @@
+"""
+Indexed search of example and evaluation text, repository and user names.
+Every search term must be a substring of the text (icontains), PostgreSQL
+answers it from the trigram indexes of UPPER(text) (pg_trgm, migrations
+0041_text_trigram_indexes, 0042_repository_trigram_indexes and
+authentication 0006_user_search_indexes), other databases run the same
+query without them. The results are ranked: the text equal to the search,
+then the texts starting with it, then the others by trigram similarity
+(PostgreSQL) and the default ordering.
+"""
+
+import operator
+from functools import reduce
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case
+from django.db.models import When
+from django.db.models import Q
+from django.db.models import Value
+from django.db.models import IntegerField
+from django.db.models import TextField
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Greatest
+from django.db.models.functions import Upper
+from django.contrib.postgres.lookups import TrigramSimilar
+from django.contrib.postgres.search import TrigramSimilarity
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+
+class UpperText(TextField):
+    """
+    Output field of the UPPER(name) annotations, its trigram_similar
+    lookup is UPPER(name) % 'TERM', answered by the same indexes as
+    icontains (django.contrib.postgres isn't installed). Registered only
+    here, not on every CharField and TextField.
+    """
+
+
+UpperText.register_lookup(TrigramSimilar)
+
+
+def is_postgresql(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+class TextSearchFilter(SearchFilter):
+    """
+    SearchFilter of substrings (search_fields without prefix), ranked by
+    the first search field unless the request has an ordering.
+    """
+
+    RANK_EXACT = 0
+    RANK_PREFIX = 1
+    RANK_SUBSTRING = 2
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = getattr(view, 'search_fields', None)
+        search_terms = self.get_search_terms(request)
+        queryset = super().filter_queryset(request, queryset, view)
+        if not search_fields or not search_terms or \
+                request.query_params.get(api_settings.ORDERING_PARAM):
+            return queryset
+        return self.rank(
+            queryset,
+            search_fields[:1],
+            ' '.join(search_terms))
+
+    def rank(self, queryset, fields, search, cases=[],
+             default=RANK_SUBSTRING):
+        def match(lookup):
+            return reduce(operator.or_, [
+                Q(**{'{}__{}'.format(field, lookup): search})
+                for field in fields
+            ])
+        ordering = ['search_rank']
+        queryset = queryset.annotate(search_rank=Case(
+            When(match('iexact'), then=Value(self.RANK_EXACT)),
+            When(match('istartswith'), then=Value(self.RANK_PREFIX)),
+            *cases,
+            default=Value(default),
+            output_field=IntegerField()))
+        if is_postgresql(queryset):
+            similarities = [
+                TrigramSimilarity(field, search)
+                for field in fields
+            ]
+            queryset = queryset.annotate(
+                search_similarity=similarities[0]
+                if len(similarities) == 1 else Greatest(*similarities))
+            ordering.append('-search_similarity')
+        ordering += list(
+            queryset.query.order_by or queryset.model._meta.ordering)
+        return queryset.order_by(*ordering)
+
+
+class NameSearchFilter(TextSearchFilter):
+    """
+    Autocomplete of names, search_fields are searched and ranked like
+    TextSearchFilter, all of them, except the exact ones ('=email'). In
+    PostgreSQL names similar to the whole search match too, with typos,
+    ranked last. The fields of the view search_document_fields (like the
+    description) match when settings.SEARCH_DOCUMENT is on, ranked after
+    the names.
+    """
+
+    RANK_DOCUMENT = 3
+    RANK_SIMILAR = 4
+
+    def get_search_document_fields(self, view):
+        if not settings.SEARCH_DOCUMENT:
+            return []
+        return getattr(view, 'search_document_fields', [])
+
+    def get_document_condition(self, queryset, field, term):
+        lookup = '{}__icontains'.format(field)
+        if LOOKUP_SEP not in field:
+            return Q(**{lookup: term})
+        # Related fields in a subquery, no duplicated rows or annotations
+        return Q(pk__in=queryset.model.objects.filter(
+            **{lookup: term}).values('pk'))
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = getattr(view, 'search_fields', None)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+        name_fields = [
+            field
+            for field in search_fields
+            if field[0] not in self.lookup_prefixes
+        ]
+        document_fields = self.get_search_document_fields(view)
+        search = ' '.join(search_terms)
+
+        def match_all(conditions):
+            return reduce(operator.and_, [
+                reduce(operator.or_, conditions(term))
+                for term in search_terms
+            ])
+
+        names = match_all(lambda term: [
+            Q(**{self.construct_search(field): term})
+            for field in search_fields
+        ])
+        document = match_all(lambda term: [
+            Q(**{self.construct_search(field): term})
+            for field in search_fields
+        ] + [
+            self.get_document_condition(queryset, field, term)
+            for field in document_fields
+        ])
+        condition = document
+        if is_postgresql(queryset):
+            for i, field in enumerate(name_fields):
+                name = 'search_upper_{}'.format(i)
+                queryset = queryset.annotate(**{
+                    name: Upper(field, output_field=UpperText())})
+                condition |= Q(**{
+                    '{}__trigram_similar'.format(name): search.upper()})
+        queryset = queryset.filter(condition)
+
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return queryset
+        cases = [When(names, then=Value(self.RANK_SUBSTRING))]
+        if document_fields:
+            cases.append(When(document, then=Value(self.RANK_DOCUMENT)))
+        return self.rank(
+            queryset,
+            name_fields,
+            search,
+            cases=cases,
+            default=self.RANK_SIMILAR)
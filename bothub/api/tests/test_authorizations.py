@@ -0,0 +1,122 @@
+from django.test import TestCase
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.test import APIRequestFactory
+
+from bothub.common import languages
+from bothub.common.models import Repository
+from bothub.common.models import RepositoryAuthorization
+
+from ..authorizations import get_authorization
+from ..authorizations import get_saved_authorization
+from ..authorizations import prefetch_authorizations
+from ..v2.tests.utils import create_user_and_token
+
+
+class AuthorizationResolverTestCase(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.owner, self.owner_token = create_user_and_token('owner')
+        self.user, self.user_token = create_user_and_token('user')
+        self.repositories = [
+            Repository.objects.create(
+                owner=self.owner,
+                name='Repository {}'.format(i),
+                slug='repository-{}'.format(i),
+                language=languages.LANGUAGE_EN,
+                is_private=bool(i % 2))
+            for i in range(4)
+        ]
+        for repository in self.repositories:
+            repository.get_user_authorization(self.user)
+        self.repository = self.repositories[0]
+
+    def request(self, user):
+        request = self.factory.get('/')
+        request.user = user
+        return request
+
+    def test_memoized(self):
+        request = self.request(self.user)
+        authorization = get_authorization(request, self.repository)
+        with self.assertNumQueries(0):
+            self.assertIs(
+                get_authorization(
+                    request,
+                    Repository(pk=self.repository.pk)),
+                authorization)
+            self.assertTrue(authorization.can_read)
+            self.assertFalse(authorization.can_contribute)
+            self.assertFalse(authorization.is_owner)
+
+    def test_prefetch_one_query(self):
+        request = self.request(self.user)
+        with self.assertNumQueries(1):
+            prefetch_authorizations(request, self.repositories)
+        with self.assertNumQueries(0):
+            levels = [
+                get_authorization(request, repository).can_read
+                for repository in self.repositories
+            ]
+        self.assertEqual(levels, [True, False, True, False])
+
+    def test_prefetch_missing_not_saved(self):
+        other = Repository.objects.create(
+            owner=self.owner,
+            name='Other',
+            slug='other',
+            language=languages.LANGUAGE_EN)
+        request = self.request(self.user)
+        with self.assertNumQueries(1):
+            prefetch_authorizations(request, self.repositories + [other])
+            authorization = get_authorization(request, other)
+        self.assertTrue(authorization._state.adding)
+        self.assertTrue(authorization.can_read)
+        self.assertFalse(RepositoryAuthorization.objects.filter(
+            user=self.user,
+            repository=other).exists())
+
+    def test_saved(self):
+        other = Repository.objects.create(
+            owner=self.owner,
+            name='Other',
+            slug='other',
+            language=languages.LANGUAGE_EN)
+        request = self.request(self.user)
+        self.assertTrue(get_authorization(request, other)._state.adding)
+        authorization = get_saved_authorization(request, other)
+        self.assertFalse(authorization._state.adding)
+        self.assertEqual(authorization.user, self.user)
+        self.assertIs(get_authorization(request, other), authorization)
+        self.assertIs(get_saved_authorization(request, other), authorization)
+
+    def test_owner(self):
+        authorization = get_authorization(
+            self.request(self.owner),
+            self.repository)
+        self.assertTrue(authorization.is_owner)
+        self.assertTrue(authorization.is_admin)
+
+    def test_anonymous(self):
+        request = self.request(AnonymousUser())
+        with self.assertNumQueries(0):
+            prefetch_authorizations(request, self.repositories)
+            self.assertTrue(
+                get_authorization(request, self.repository).can_read)
+            self.assertFalse(
+                get_authorization(request, self.repositories[1]).can_read)
+
+    def test_user_changed(self):
+        request = self.request(self.user)
+        get_authorization(request, self.repository)
+        request.user = self.owner
+        self.assertTrue(
+            get_authorization(request, self.repository).is_owner)
+
+    def test_level_follows_role(self):
+        authorization = get_authorization(
+            self.request(self.user),
+            self.repository)
+        self.assertFalse(authorization.can_contribute)
+        authorization.role = RepositoryAuthorization.ROLE_CONTRIBUTOR
+        self.assertTrue(authorization.can_contribute)
+        self.assertFalse(authorization.can_write)
@@ -0,0 +1,85 @@
+import gzip
+import json
+
+from unittest import skipUnless
+
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test import RequestFactory
+from django.test import override_settings
+
+from ..compression import CompressionMiddleware
+from ..compression import accepted_encodings
+from ..compression import brotli
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.content = json.dumps([
+            {'text': 'example {}'.format(i), 'intent': 'greet'}
+            for i in range(50)
+        ]).encode()
+
+    def request(self, content, accept_encoding='gzip, deflate',
+                content_type='application/json', etag=None):
+        def get_response(request):
+            response = HttpResponse(content, content_type=content_type)
+            if etag:
+                response['ETag'] = etag
+            return response
+        request = self.factory.get(
+            '/v2/examples/',
+            HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(get_response)(request)
+
+    def test_gzip(self):
+        response = self.request(self.content, etag='"abc"')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.content)
+        self.assertEqual(
+            response['Content-Length'],
+            str(len(response.content)))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_brotli_preferred(self):
+        response = self.request(self.content, accept_encoding='gzip, br')
+        self.assertEqual(
+            response['Content-Encoding'],
+            'br' if brotli else 'gzip')
+
+    @skipUnless(brotli, 'brotli not installed')
+    def test_brotli(self):
+        response = self.request(self.content, accept_encoding='br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.content)
+        self.assertEqual(
+            response['Content-Length'],
+            str(len(response.content)))
+
+    def test_small(self):
+        response = self.request(b'{}')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_not_accepted(self):
+        response = self.request(self.content, accept_encoding='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.content)
+
+    def test_not_compressible(self):
+        response = self.request(self.content, content_type='image/png')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @override_settings(COMPRESSION_MIN_SIZE=0)
+    def test_disabled(self):
+        response = self.request(self.content)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_accepted_encodings(self):
+        request = self.factory.get(
+            '/',
+            HTTP_ACCEPT_ENCODING='GZIP;q=0.5, br;q=0, identity')
+        self.assertEqual(accepted_encodings(request), {'gzip', 'identity'})
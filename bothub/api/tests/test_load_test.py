@@ -0,0 +1,114 @@
+import random
+import threading
+
+from unittest import mock
+
+import requests
+
+from django.test import SimpleTestCase
+from django.core.management.base import CommandError
+
+from ..management.commands.nlp_stub_server import make_server
+from ..management.commands.nlp_stub_server import parse_per_endpoint
+from ..management.commands.load_test import Stats
+from ..management.commands.load_test import Client
+from ..management.commands.load_test import parse_mix
+from ..management.commands.load_test import run_scenario
+from ..management.commands.load_test import percentile
+
+
+class NLPStubServerTestCase(SimpleTestCase):
+    def start_server(self, **kwargs):
+        server = make_server(port=0, seed=0, **kwargs)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return 'http://{}:{}/'.format(*server.server_address)
+
+    def test_parse_per_endpoint(self):
+        self.assertEqual(
+            parse_per_endpoint(['train=2000', '50'], float, 0),
+            {'train': 2000, 'parse': 50, 'evaluate': 50})
+        self.assertEqual(
+            parse_per_endpoint(None, float, 0),
+            {'train': 0, 'parse': 0, 'evaluate': 0})
+        with self.assertRaises(CommandError):
+            parse_per_endpoint(['analyze=1'], float, 0)
+
+    def test_endpoints(self):
+        url = self.start_server()
+        headers = {'Authorization': 'Bearer 123'}
+        response = requests.post(
+            '{}parse/'.format(url),
+            data={'text': 'hi', 'language': 'en'},
+            headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json().get('text'), 'hi')
+        self.assertIn('intent', response.json())
+        for endpoint in ['train', 'evaluate']:
+            response = requests.post(
+                '{}{}/'.format(url, endpoint),
+                headers=headers)
+            self.assertEqual(response.status_code, 200)
+        response = requests.post('{}parse/'.format(url))
+        self.assertEqual(response.status_code, 401)
+
+    def test_failure_rate(self):
+        url = self.start_server(failure_rate={
+            'train': 1,
+            'parse': 0,
+            'evaluate': 0,
+        })
+        response = requests.post(
+            '{}train/'.format(url),
+            headers={'Authorization': 'Bearer 123'})
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('message', response.json().get('error'))
+
+
+class LoadTestTestCase(SimpleTestCase):
+    def test_percentile(self):
+        timings = list(range(1, 101))
+        self.assertEqual(percentile(timings, .5), 50)
+        self.assertEqual(percentile(timings, .99), 99)
+
+    def test_parse_mix(self):
+        self.assertEqual(
+            list(parse_mix('list=3,analyze=1').items()),
+            [('list', 3), ('analyze', 1)])
+        for value in ['unknown=1', 'list', 'list=x', 'list=1=2']:
+            with self.assertRaises(CommandError):
+                parse_mix(value)
+
+    def test_stats_report(self):
+        stats = Stats()
+        stats.add('list', .1, False)
+        stats.add('list', .3, True)
+        report = list(stats.report(2))
+        self.assertEqual(len(report), 2)
+        self.assertIn('50.0%', report[1])
+
+    def test_run_scenario_exception(self):
+        stats = Stats()
+        client = Client('http://localhost:8000/', '123', stats)
+        response = mock.Mock(status_code=201)
+        response.json.side_effect = ValueError('Expecting value')
+        with mock.patch.object(
+                client.session,
+                'request',
+                return_value=response):
+            run_scenario(
+                'example-write',
+                client,
+                {'uuid': 'uuid'},
+                random.Random(0),
+                stats)
+        self.assertEqual(stats.errors.get('example-new'), 1)
+        self.assertNotIn('example-write', stats.timings)
+        report = list(stats.report(1))
+        self.assertEqual(len(report), 3)
+        self.assertEqual(
+            report[-1],
+            'example-new raised ValueError: Expecting value')
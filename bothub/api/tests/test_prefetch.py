@@ -0,0 +1,84 @@
+from django.test import TestCase
+
+from bothub.common import languages
+from bothub.common.models import Repository
+from bothub.common.models import RepositoryExample
+from bothub.common.models import RepositoryExampleEntity
+from bothub.common.models import RepositoryTranslatedExample
+from bothub.common.models import RepositoryTranslatedExampleEntity
+from bothub.common.models import RepositoryEntity
+from bothub.common.models import RepositoryEntityLabel
+from bothub.authentication.models import User
+
+from ..prefetch import prefetch_examples
+from ..prefetch import prefetch_translations
+from ..v1.serializers import RepositoryExampleSerializer
+from ..v1.serializers import RepositoryTranslatedExampleSerializer
+from ..v2.example.serializers import RepositoryExampleSerializer \
+    as RepositoryExampleSerializerV2
+
+
+class PrefetchTestCase(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user('owner@user.com', 'owner')
+        self.repository = Repository.objects.create(
+            owner=owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+        label = RepositoryEntityLabel.objects.create(
+            repository=self.repository,
+            value='subject')
+        RepositoryEntity.objects.create(
+            repository=self.repository,
+            value='name',
+            label=label)
+        for i in range(3):
+            example = RepositoryExample.objects.create(
+                repository_update=self.repository.current_update(),
+                text='my name is user{}'.format(i),
+                intent='greet')
+            RepositoryExampleEntity.objects.create(
+                repository_example=example,
+                start=11,
+                end=16,
+                entity='name')
+            translation = RepositoryTranslatedExample.objects.create(
+                original_example=example,
+                language=languages.LANGUAGE_PT,
+                text='meu nome é user{}'.format(i))
+            RepositoryTranslatedExampleEntity.objects.create(
+                repository_translated_example=translation,
+                start=11,
+                end=16,
+                entity='name')
+
+    def assertOnlyPrefetched(self, serializer_class, queryset):
+        instances = list(queryset)
+        with self.assertNumQueries(0):
+            data = serializer_class(instances, many=True).data
+        self.assertEqual(len(data), 3)
+        return data
+
+    def test_examples(self):
+        data = self.assertOnlyPrefetched(
+            RepositoryExampleSerializer,
+            prefetch_examples(self.repository.examples()))
+        self.assertEqual(data[0].get('entities')[0].get('label'), 'subject')
+        self.assertEqual(
+            data[0].get('translations')[0].get('entities')[0].get('value'),
+            'user2')
+
+    def test_examples_v2(self):
+        self.assertOnlyPrefetched(
+            RepositoryExampleSerializerV2,
+            prefetch_examples(
+                self.repository.examples(),
+                nested_translations=False))
+
+    def test_translations(self):
+        data = self.assertOnlyPrefetched(
+            RepositoryTranslatedExampleSerializer,
+            prefetch_translations(self.repository.translations()))
+        self.assertEqual(data[0].get('from_language'), languages.LANGUAGE_EN)
+        self.assertTrue(data[0].get('has_valid_entities'))
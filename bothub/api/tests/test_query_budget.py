@@ -0,0 +1,33 @@
+from django.test import TestCase
+
+from ..query_budget import ENDPOINTS
+from ..query_budget import create_context
+from ..query_budget import run_endpoint
+from ..query_budget import format_report
+
+
+class QueryBudgetTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.context = create_context()
+
+    def test_endpoints_budget(self):
+        for endpoint in ENDPOINTS:
+            with self.subTest(endpoint=endpoint.name):
+                response, profiler = run_endpoint(endpoint, self.context)
+                report = format_report(endpoint, response, profiler)
+                self.assertEqual(response.status_code, endpoint.status, report)
+                if endpoint.known_issue is None:
+                    self.assertLessEqual(
+                        profiler.count,
+                        endpoint.max_queries,
+                        report)
+                    continue
+                self.assertLessEqual(
+                    profiler.count,
+                    endpoint.known_queries,
+                    report)
+                self.assertGreater(
+                    profiler.count,
+                    endpoint.max_queries,
+                    'Within budget, remove the known issue\n' + report)
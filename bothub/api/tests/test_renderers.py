@@ -0,0 +1,93 @@
+import datetime
+import uuid
+
+from decimal import Decimal
+from unittest import mock
+from unittest import skipUnless
+
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.renderers import JSONRenderer
+
+from .. import renderers
+from ..renderers import FastJSONRenderer
+from ..renderers import orjson
+from ..query_budget import ENDPOINTS
+from ..query_budget import create_context
+from ..query_budget import run_endpoint
+
+
+class FastJSONRendererTestCase(TestCase):
+    def get_data(self):
+        return {
+            'uuid': uuid.uuid4(),
+            'created_at': timezone.now(),
+            'date': datetime.date.today(),
+            'price': Decimal('1.50'),
+            'label': _('repository'),
+            'text': 'line\u2028separator ç',
+            'items': [1, 2.5, None, True],
+        }
+
+    @skipUnless(orjson, 'orjson not installed')
+    def test_orjson_same_as_stock_renderer(self):
+        data = self.get_data()
+        with mock.patch.object(
+                orjson,
+                'dumps',
+                wraps=orjson.dumps) as dumps:
+            content = FastJSONRenderer().render(data)
+        # Rendered by orjson, the dates, Decimal and lazy string by default
+        self.assertEqual(dumps.call_count, 1)
+        self.assertEqual(content, JSONRenderer().render(data))
+
+    @skipUnless(orjson, 'orjson not installed')
+    def test_orjson_fallback(self):
+        # Integers over 64 bits aren't encoded by orjson
+        data = {'big': 2 ** 70}
+        self.assertEqual(
+            FastJSONRenderer().render(data),
+            JSONRenderer().render(data))
+
+    @skipUnless(orjson, 'orjson not installed')
+    def test_special_floats(self):
+        for value in [1e16, 1.5e-05, -2e-10]:
+            data = {'value': value}
+            self.assertEqual(
+                FastJSONRenderer().render(data),
+                JSONRenderer().render(data))
+        # Not valid JSON, the stock renderer refuses them
+        for value in [float('nan'), float('inf')]:
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({'value': value})
+
+    @skipUnless(orjson, 'orjson not installed')
+    def test_api_payloads(self):
+        context = create_context(examples=50, evaluations=10)
+        for endpoint in ENDPOINTS:
+            if endpoint.method != 'get':
+                continue
+            with self.subTest(endpoint=endpoint.name):
+                response, profiler = run_endpoint(endpoint, context)
+                data = getattr(response, 'data', None)
+                self.assertEqual(
+                    FastJSONRenderer().render(data),
+                    JSONRenderer().render(data))
+
+    def test_without_orjson(self):
+        data = self.get_data()
+        with mock.patch.object(renderers, 'orjson', None):
+            content = FastJSONRenderer().render(data)
+        self.assertEqual(content, JSONRenderer().render(data))
+
+    def test_indent(self):
+        data = {'items': [1, 2]}
+        self.assertEqual(
+            FastJSONRenderer().render(
+                data,
+                'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4'))
+
+    def test_none(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
@@ -16,6 +16,7 @@ from ..fields import LabelValueField
 from ..validators import CanContributeInRepositoryExampleValidator
 from ..validators import CanContributeInRepositoryValidator
 from ..validators import ExampleWithIntentOrEntityValidator
+from ..validators import ExampleTextNotDuplicatedValidator
 from ..validators import EntityNotEqualLabelValidator
 from .translate import RepositoryTranslatedExampleSerializer
 
@@ -158,6 +159,7 @@ class NewRepositoryExampleSerializer(serializers.ModelSerializer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.validators.append(ExampleWithIntentOrEntityValidator())
+        self.validators.append(ExampleTextNotDuplicatedValidator())
 
     def create(self, validated_data):
         entities_data = validated_data.pop('entities')
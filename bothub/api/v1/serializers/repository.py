@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied
 from django.utils.translation import gettext as _
+from django.db.models import Manager
 
 from bothub.common.models import Repository
 from bothub.common.models import RepositoryCategory
@@ -9,6 +10,10 @@ from bothub.common.models import RepositoryVote
 from bothub.common.models import RequestRepositoryAuthorization
 from bothub.common.languages import LANGUAGE_CHOICES
 
+from ...authorizations import get_authorization
+from ...authorizations import get_saved_authorization
+from ...authorizations import prefetch_authorizations
+
 from ..fields import ModelMultipleChoiceField
 from ..fields import TextField
 
@@ -54,9 +59,20 @@ class EditRepositorySerializer(NewRepositorySerializer):
     pass
 
 
+class RepositoryListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        request = self.context.get('request')
+        if request:
+            # The authorizations of the whole page in one query
+            data = list(data.all() if isinstance(data, Manager) else data)
+            prefetch_authorizations(request, data)
+        return super().to_representation(data)
+
+
 class RepositorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Repository
+        list_serializer_class = RepositoryListSerializer
         fields = [
             'uuid',
             'owner',
@@ -121,8 +137,12 @@ class RepositorySerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request:
             return None  # pragma: no cover
+        if isinstance(self.parent, RepositoryListSerializer):
+            # Not saved for each repository of a list, without uuid
+            return RepositoryAuthorizationSerializer(
+                get_authorization(request, obj)).data
         return RepositoryAuthorizationSerializer(
-            obj.get_user_authorization(request.user)).data
+            get_saved_authorization(request, obj)).data
 
     def get_examples__count(self, obj):
         return obj.examples().count()
@@ -131,7 +151,7 @@ class RepositorySerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return False
-        authorization = obj.get_user_authorization(request.user)
+        authorization = get_authorization(request, obj)
         if authorization.role is not RepositoryAuthorization.ROLE_NOT_SETTED:
             return False
         if authorization.is_owner:
@@ -180,6 +200,13 @@ class RepositoryAuthorizationSerializer(serializers.ModelSerializer):
         slug_field='nickname',
         read_only=True)
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance._state.adding:
+            # The uuid of an unsaved authorization isn't a NLP token
+            data['uuid'] = None
+        return data
+
 
 class AnalyzeTextSerializer(serializers.Serializer):
     language = serializers.ChoiceField(LANGUAGE_CHOICES, required=True)
@@ -12,6 +12,7 @@ from ..validators import CanContributeInRepositoryTranslatedExampleValidator
 from ..validators import CanContributeInRepositoryExampleValidator
 from ..validators import TranslatedExampleEntitiesValidator
 from ..validators import TranslatedExampleLanguageValidator
+from ..validators import TranslatedExampleTextNotDuplicatedValidator
 
 
 class RepositoryTranslatedExampleEntitySeralizer(serializers.ModelSerializer):
@@ -105,6 +106,7 @@ class NewRepositoryTranslatedExampleSerializer(serializers.ModelSerializer):
         super().__init__(*args, **kwargs)
         self.validators.append(TranslatedExampleEntitiesValidator())
         self.validators.append(TranslatedExampleLanguageValidator())
+        self.validators.append(TranslatedExampleTextNotDuplicatedValidator())
 
     original_example = serializers.PrimaryKeyRelatedField(
         queryset=RepositoryExample.objects,
@@ -3,6 +3,7 @@ import uuid
 
 from django.test import TestCase
 from django.test import RequestFactory
+from django.test import override_settings
 from rest_framework import status
 
 from bothub.common import languages
@@ -67,6 +68,30 @@ class NewRepositoryExampleTestCase(TestCase):
             content_data.get('intent'),
             intent)
 
+    @override_settings(REJECT_DUPLICATE_TEXT=True)
+    def test_duplicated_text(self):
+        RepositoryExample.objects.create(
+            repository_update=self.repository.current_update(),
+            text='Olá  mundo',
+            intent='greet')
+        data = {
+            'repository': str(self.repository.uuid),
+            'text': 'ola mundo',
+            'intent': 'greet',
+            'entities': [],
+        }
+        response, content_data = self.request(self.owner_token, data)
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_400_BAD_REQUEST)
+        self.assertIn('text', content_data.keys())
+        response, content_data = self.request(
+            self.owner_token,
+            dict(data, language=languages.LANGUAGE_PT))
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_201_CREATED)
+
     def test_okay_with_language(self):
         text = 'hi'
         intent = 'greet'
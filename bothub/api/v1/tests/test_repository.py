@@ -3,6 +3,7 @@ import uuid
 
 from django.test import TestCase
 from django.test import RequestFactory
+from django.test import override_settings
 from django.test.client import MULTIPART_CONTENT
 from rest_framework import status
 
@@ -558,6 +559,51 @@ class RepositoriesTestCase(TestCase):
             content_data.get('count'),
             0)
 
+    def create_public_repository(self, name, slug, **kwargs):
+        return Repository.objects.create(
+            owner=self.owner,
+            name=name,
+            slug=slug,
+            language=languages.LANGUAGE_EN,
+            **kwargs)
+
+    def test_search_ranked(self):
+        substring = self.create_public_repository('My test', 'my-test')
+        exact = self.create_public_repository('test', 'exact')
+        self.create_public_repository(
+            'Other',
+            'other',
+            description='A test')
+        response, content_data = self.request({
+            'search': 'test',
+        })
+        self.assertEqual(
+            [result.get('uuid') for result in content_data.get('results')],
+            [str(exact.uuid), str(self.repository.uuid), str(substring.uuid)])
+
+    @override_settings(SEARCH_DOCUMENT=True)
+    def test_search_document(self):
+        description = self.create_public_repository(
+            'Other',
+            'other',
+            description='A test')
+        category = self.create_public_repository('Category', 'category')
+        category.categories.add(
+            RepositoryCategory.objects.create(name='Testers'))
+        category.categories.add(
+            RepositoryCategory.objects.create(name='More testers'))
+        response, content_data = self.request({
+            'search': 'test',
+        })
+        self.assertEqual(
+            content_data.get('results')[0].get('uuid'),
+            str(self.repository.uuid))
+        self.assertEqual(
+            sorted(
+                result.get('uuid')
+                for result in content_data.get('results')[1:]),
+            sorted([str(description.uuid), str(category.uuid)]))
+
 
 class TrainRepositoryTestCase(TestCase):
     def setUp(self):
@@ -493,3 +493,31 @@ class TranslationsViewTest(TestCase):
         self.assertEqual(
             content_data.get('count'),
             0)
+
+    def test_filter_has_valid_entities(self):
+        RepositoryExampleEntity.objects.create(
+            repository_example=self.example,
+            start=0,
+            end=2,
+            entity='greet')
+
+        response, content_data = self.request({
+            'repository_uuid': self.repository.uuid,
+            'has_valid_entities': False,
+        })
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK)
+        self.assertEqual(
+            content_data.get('count'),
+            1)
+        self.assertFalse(
+            content_data.get('results')[0].get('has_valid_entities'))
+
+        response, content_data = self.request({
+            'repository_uuid': self.repository.uuid,
+            'has_valid_entities': True,
+        })
+        self.assertEqual(
+            content_data.get('count'),
+            0)
@@ -1,5 +1,7 @@
 import json
+from unittest import skipUnless
 
+from django.db import connection
 from django.test import TestCase
 from django.test import RequestFactory
 from django.test.client import MULTIPART_CONTENT
@@ -13,6 +15,7 @@ from ..views import ChangePasswordViewSet
 from ..views import RequestResetPassword
 from ..views import ResetPassword
 from ..views import MyUserProfileViewSet
+from ..views import SearchUserViewSet
 
 from .utils import create_user_and_token
 
@@ -343,3 +346,60 @@ class MyUserProfileTestCase(TestCase):
         self.assertEqual(
             content_data.get('nickname'),
             self.user.nickname)
+
+
+class SearchUserTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user, self.user_token = create_user_and_token('douglas')
+        self.other = User.objects.create_user(
+            'other@user.com',
+            'other',
+            name='Other Douglas')
+        self.many = [
+            User.objects.create_user(
+                'user{}@user.com'.format(i),
+                'douglas{}'.format(i))
+            for i in range(SearchUserViewSet.limit)
+        ]
+
+    def request(self, search):
+        request = self.factory.get(
+            '/api/search-user/',
+            {'search': search})
+        response = SearchUserViewSet.as_view({'get': 'list'})(request)
+        response.render()
+        content_data = json.loads(response.content)
+        return (response, content_data,)
+
+    def test_ranked(self):
+        response, content_data = self.request('douglas')
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK)
+        self.assertEqual(
+            len(content_data),
+            SearchUserViewSet.limit)
+        self.assertEqual(
+            content_data[0].get('nickname'),
+            self.user.nickname)
+        self.assertNotIn(
+            self.other.nickname,
+            [user.get('nickname') for user in content_data])
+
+    def test_exact_email(self):
+        response, content_data = self.request('OTHER@user.com')
+        self.assertEqual(
+            [user.get('nickname') for user in content_data],
+            [self.other.nickname])
+        response, content_data = self.request('other@user')
+        self.assertEqual(len(content_data), 0)
+
+    @skipUnless(
+        connection.vendor == 'postgresql',
+        'Similar names are searched only in PostgreSQL')
+    def test_typo(self):
+        response, content_data = self.request('duoglas')
+        self.assertIn(
+            self.user.nickname,
+            [user.get('nickname') for user in content_data])
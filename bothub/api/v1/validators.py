@@ -1,14 +1,17 @@
+from django.conf import settings
 from django.utils.translation import gettext as _
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.exceptions import ValidationError
 
 from bothub.common.models import RepositoryTranslatedExample
+from bothub.common.fields import text_hash
+
+from ..authorizations import get_authorization
 
 
 class CanContributeInRepositoryValidator(object):
     def __call__(self, value):
-        user_authorization = value.get_user_authorization(
-            self.request.user)
+        user_authorization = get_authorization(self.request, value)
         if not user_authorization.can_contribute:
             raise PermissionDenied(
                 _('You can\'t contribute in this repository'))
@@ -20,8 +23,7 @@ class CanContributeInRepositoryValidator(object):
 class CanContributeInRepositoryExampleValidator(object):
     def __call__(self, value):
         repository = value.repository_update.repository
-        user_authorization = repository.get_user_authorization(
-            self.request.user)
+        user_authorization = get_authorization(self.request, repository)
         if not user_authorization.can_contribute:
             raise PermissionDenied(
                 _('You can\'t contribute in this repository'))
@@ -33,8 +35,7 @@ class CanContributeInRepositoryExampleValidator(object):
 class CanContributeInRepositoryTranslatedExampleValidator(object):
     def __call__(self, value):
         repository = value.original_example.repository_update.repository
-        user_authorization = repository.get_user_authorization(
-            self.request.user)
+        user_authorization = get_authorization(self.request, repository)
         if not user_authorization.can_contribute:
             raise PermissionDenied(
                 _('You can\'t contribute in this repository'))
@@ -75,6 +76,30 @@ class TranslatedExampleLanguageValidator(object):
                 'Can\'t translate to the same language')})
 
 
+class ExampleTextNotDuplicatedValidator(object):
+    def __call__(self, attrs):
+        if not settings.REJECT_DUPLICATE_TEXT:
+            return
+        repository = attrs.get('repository')
+        language = attrs.get('language') or repository.language
+        if repository.examples(language).filter(
+                text_hash=text_hash(attrs.get('text'))).exists():
+            raise ValidationError({'text': _(
+                'There is already an example with this text')})
+
+
+class TranslatedExampleTextNotDuplicatedValidator(object):
+    def __call__(self, attrs):
+        if not settings.REJECT_DUPLICATE_TEXT:
+            return
+        repository = attrs.get('original_example').repository_update \
+            .repository
+        if repository.translations(attrs.get('language')).filter(
+                text_hash=text_hash(attrs.get('text'))).exists():
+            raise ValidationError({'text': _(
+                'There is already a translation with this text')})
+
+
 class ExampleWithIntentOrEntityValidator(object):
     def __call__(self, attrs):
         intent = attrs.get('intent')
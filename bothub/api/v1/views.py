@@ -10,7 +10,6 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.authtoken.models import Token
 from rest_framework import status
 from rest_framework.filters import OrderingFilter
-from rest_framework.filters import SearchFilter
 from rest_framework.permissions import IsAuthenticated
 from django.utils.translation import gettext as _
 from django.db.models import Count
@@ -31,6 +30,14 @@ from bothub.common.models import RepositoryEntity
 from bothub.common.models import RepositoryUpdate
 from bothub.authentication.models import User
 
+from ..prefetch import prefetch_examples
+from ..prefetch import prefetch_translations
+from ..authorizations import get_authorization
+from ..authorizations import get_saved_authorization
+from ..conditional import ConditionalListMixin
+from ..conditional import ConditionalRetrieveMixin
+from ..search import NameSearchFilter
+
 from .serializers import RepositorySerializer
 from .serializers import NewRepositorySerializer
 from .serializers import RepositoryExampleSerializer
@@ -66,7 +73,7 @@ ADMIN_METHODS = ['DELETE']
 
 class RepositoryPermission(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        authorization = obj.get_user_authorization(request.user)
+        authorization = get_authorization(request, obj)
         if request.method in READ_METHODS:
             return authorization.can_read
         if request.user.is_authenticated:
@@ -78,8 +85,9 @@ class RepositoryPermission(permissions.BasePermission):
 
 class RepositoryExamplePermission(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        authorization = obj.repository_update.repository \
-            .get_user_authorization(request.user)
+        authorization = get_authorization(
+            request,
+            obj.repository_update.repository)
         if request.method in READ_METHODS:
             return authorization.can_read
         return authorization.can_contribute
@@ -88,7 +96,7 @@ class RepositoryExamplePermission(permissions.BasePermission):
 class RepositoryTranslatedExamplePermission(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         repository = obj.original_example.repository_update.repository
-        authorization = repository.get_user_authorization(request.user)
+        authorization = get_authorization(request, repository)
         if request.method in READ_METHODS:
             return authorization.can_read
         return authorization.can_contribute
@@ -96,13 +104,13 @@ class RepositoryTranslatedExamplePermission(permissions.BasePermission):
 
 class RepositoryAdminManagerAuthorization(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        authorization = obj.repository.get_user_authorization(request.user)
+        authorization = get_authorization(request, obj.repository)
         return authorization.is_admin
 
 
 class RepositoryEntityHasPermission(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        authorization = obj.repository.get_user_authorization(request.user)
+        authorization = get_authorization(request, obj.repository)
         if request.method in READ_METHODS:
             return authorization.can_read
         if request.user.is_authenticated:
@@ -114,7 +122,7 @@ class RepositoryEntityHasPermission(permissions.BasePermission):
 
 class RepositoryUpdateHasPermission(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        authorization = obj.repository.get_user_authorization(request.user)
+        authorization = get_authorization(request, obj.repository)
         if request.method in READ_METHODS:
             return authorization.can_read
         if request.user.is_authenticated:
@@ -159,7 +167,7 @@ class ExamplesFilter(filters.FilterSet):
         request = self.request
         try:
             repository = Repository.objects.get(uuid=value)
-            authorization = repository.get_user_authorization(request.user)
+            authorization = get_authorization(request, repository)
             if not authorization.can_read:
                 raise PermissionDenied()
             return repository.examples(queryset=queryset)
@@ -228,15 +236,19 @@ class TranslationsFilter(filters.FilterSet):
         field_name='language',
         method='filter_to_language',
         help_text='Filter by translated language')
+    has_valid_entities = filters.BooleanFilter(
+        field_name='has_valid_entities',
+        help_text=_('Filter for translations with or without the ' +
+                    'entities of the original example'))
 
     def filter_repository_uuid(self, queryset, name, value):
         request = self.request
         try:
             repository = Repository.objects.get(uuid=value)
-            authorization = repository.get_user_authorization(request.user)
+            authorization = get_authorization(request, repository)
             if not authorization.can_read:
                 raise PermissionDenied()
-            return RepositoryTranslatedExample.objects.filter(
+            return queryset.filter(
                 original_example__repository_update__repository=repository)
         except Repository.DoesNotExist:
             raise NotFound(
@@ -266,7 +278,7 @@ class RepositoryAuthorizationFilter(filters.FilterSet):
         request = self.request
         try:
             repository = Repository.objects.get(uuid=value)
-            authorization = repository.get_user_authorization(request.user)
+            authorization = get_authorization(request, repository)
             if not authorization.is_admin:
                 raise PermissionDenied()
             return queryset.filter(repository=repository)
@@ -292,7 +304,7 @@ class RepositoryAuthorizationRequestsFilter(filters.FilterSet):
         request = self.request
         try:
             repository = Repository.objects.get(uuid=value)
-            authorization = repository.get_user_authorization(request.user)
+            authorization = get_authorization(request, repository)
             if not authorization.is_admin:
                 raise PermissionDenied()
             return queryset.filter(repository=repository)
@@ -321,7 +333,7 @@ class RepositoryEntitiesFilter(filters.FilterSet):
         request = self.request
         try:
             repository = Repository.objects.get(uuid=value)
-            authorization = repository.get_user_authorization(request.user)
+            authorization = get_authorization(request, repository)
             if not authorization.is_admin:
                 raise PermissionDenied()
             return queryset.filter(repository=repository)
@@ -349,7 +361,7 @@ class RepositoryUpdatesFilter(filters.FilterSet):
         request = self.request
         try:
             repository = Repository.objects.get(uuid=value)
-            authorization = repository.get_user_authorization(request.user)
+            authorization = get_authorization(request, repository)
             if not authorization.can_read:
                 raise PermissionDenied()
             return queryset.filter(repository=repository)
@@ -420,6 +432,7 @@ class MyRepositoriesViewSet(
 
 class RepositoryViewSet(
         MultipleFieldLookupMixin,
+        ConditionalRetrieveMixin,
         mixins.RetrieveModelMixin,
         mixins.UpdateModelMixin,
         mixins.DestroyModelMixin,
@@ -470,7 +483,7 @@ class RepositoryViewSet(
         messages.
         """
         repository = self.get_object()
-        user_authorization = repository.get_user_authorization(request.user)
+        user_authorization = get_saved_authorization(request, repository)
         serializer = RepositoryAuthorizationSerializer(user_authorization)
         return Response(serializer.data)
 
@@ -482,7 +495,7 @@ class RepositoryViewSet(
         Train current update using Bothub NLP service
         """
         repository = self.get_object()
-        user_authorization = repository.get_user_authorization(request.user)
+        user_authorization = get_saved_authorization(request, repository)
         if not user_authorization.can_write:
             raise PermissionDenied()
         request = Repository.request_nlp_train(  # pragma: no cover
@@ -499,7 +512,7 @@ class RepositoryViewSet(
         permission_classes=[])
     def analyze(self, request, **kwargs):
         repository = self.get_object()
-        user_authorization = repository.get_user_authorization(request.user)
+        user_authorization = get_saved_authorization(request, repository)
         serializer = AnalyzeTextSerializer(
             data=request.data)  # pragma: no cover
         serializer.is_valid(raise_exception=True)  # pragma: no cover
@@ -532,7 +545,7 @@ class RepositoryViewSet(
         Evaluate repository using Bothub NLP service
         """
         repository = self.get_object()
-        user_authorization = repository.get_user_authorization(request.user)
+        user_authorization = get_saved_authorization(request, repository)
         if not user_authorization.can_write:
             raise PermissionDenied()
         serializer = EvaluateSerializer(
@@ -625,6 +638,7 @@ class NewRepositoryExampleViewSet(
 
 
 class RepositoryExampleViewSet(
+        ConditionalRetrieveMixin,
         mixins.RetrieveModelMixin,
         mixins.DestroyModelMixin,
         GenericViewSet):
@@ -637,11 +651,12 @@ class RepositoryExampleViewSet(
     delete:
     Delete repository example.
     """
-    queryset = RepositoryExample.objects
+    queryset = prefetch_examples(RepositoryExample.objects.all())
     serializer_class = RepositoryExampleSerializer
     permission_classes = [
         RepositoryExamplePermission,
     ]
+    conditional_repository_field = 'repository_update.repository'
 
     def perform_destroy(self, obj):
         if obj.deleted_in:
@@ -661,6 +676,7 @@ class NewRepositoryTranslatedExampleViewSet(
 
 
 class RepositoryTranslatedExampleViewSet(
+        ConditionalRetrieveMixin,
         mixins.RetrieveModelMixin,
         mixins.UpdateModelMixin,
         mixins.DestroyModelMixin,
@@ -680,18 +696,22 @@ class RepositoryTranslatedExampleViewSet(
     delete:
     Delete example translation.
     """
-    queryset = RepositoryTranslatedExample.objects
+    queryset = prefetch_translations(
+        RepositoryTranslatedExample.objects.all())
     serializer_class = RepositoryTranslatedExampleSerializer
     permission_classes = [
         permissions.IsAuthenticated,
         RepositoryTranslatedExamplePermission,
     ]
+    conditional_repository_field = \
+        'original_example.repository_update.repository'
 
 
 class RepositoryExamplesViewSet(
+        ConditionalListMixin,
         mixins.ListModelMixin,
         GenericViewSet):
-    queryset = RepositoryExample.objects
+    queryset = prefetch_examples(RepositoryExample.objects.all())
     serializer_class = RepositoryExampleSerializer
     filter_class = ExamplesFilter
     filter_backends = [
@@ -875,23 +895,27 @@ class RepositoriesViewSet(
     filter_class = RepositoriesFilter
     filter_backends = [
         DjangoFilterBackend,
-        SearchFilter,
+        NameSearchFilter,
     ]
     search_fields = [
-        '$name',
-        '^name',
-        '=name',
+        'name',
+    ]
+    search_document_fields = [
+        'description',
+        'categories__name',
     ]
 
 
 class TranslationsViewSet(
+        ConditionalListMixin,
         mixins.ListModelMixin,
         GenericViewSet):
     """
     List repository translations.
     """
     serializer_class = RepositoryTranslatedExampleSerializer
-    queryset = RepositoryTranslatedExample.objects.all()
+    queryset = prefetch_translations(
+        RepositoryTranslatedExample.objects.all())
     filter_class = TranslationsFilter
 
 
@@ -948,15 +972,11 @@ class SearchUserViewSet(
     queryset = User.objects.all()
     filter_backends = [
         DjangoFilterBackend,
-        SearchFilter,
+        NameSearchFilter,
     ]
     search_fields = [
-        '=name',
-        '^name',
-        '$name',
-        '=nickname',
-        '^nickname',
-        '$nickname',
+        'nickname',
+        'name',
         '=email',
     ]
     pagination_class = None
@@ -1011,7 +1031,7 @@ class ReviewAuthorizationRequestViewSet(
 class RepositoryEntitiesViewSet(
         mixins.ListModelMixin,
         GenericViewSet):
-    queryset = RepositoryEntity.objects.all()
+    queryset = RepositoryEntity.objects.select_related('label')
     serializer_class = RepositoryEntitySerializer
     filter_class = RepositoryEntitiesFilter
     permission_classes = [
@@ -1021,6 +1041,7 @@ class RepositoryEntitiesViewSet(
 
 
 class RepositoryUpdatesViewSet(
+      ConditionalListMixin,
       mixins.ListModelMixin,
       GenericViewSet):
     queryset = RepositoryUpdate.objects.filter(
@@ -0,0 +1,29 @@
+from django.utils.translation import gettext as _
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import authentication
+from rest_framework import exceptions
+
+from bothub.common.models import RepositoryAuthorization
+
+
+class RepositoryAuthorizationAuthentication(
+        authentication.TokenAuthentication):
+    """
+    Authenticate the requests of the NLP service, made with the UUID of
+    the repository authorization it got (Authorization: Bearer <uuid>).
+    request.auth is the repository authorization.
+    """
+    keyword = 'Bearer'
+
+    def authenticate_credentials(self, key):
+        try:
+            authorization = RepositoryAuthorization.objects.select_related(
+                'user',
+                'repository').get(uuid=key)
+        except (RepositoryAuthorization.DoesNotExist, DjangoValidationError):
+            raise exceptions.AuthenticationFailed(
+                _('Invalid repository authorization.'))
+        if not authorization.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'))
+        return (authorization.user, authorization)
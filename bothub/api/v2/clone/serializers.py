@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from rest_framework import serializers
+from rest_framework.exceptions import PermissionDenied
+
+from bothub.common.models import Repository
+from bothub.common.models import RepositoryCloneJob
+
+from ...authorizations import get_authorization
+
+
+class RepositoryCloneJobSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = RepositoryCloneJob
+        fields = [
+            'id',
+            'repository',
+            'clone',
+            'name',
+            'slug',
+            'is_private',
+            'language',
+            'status',
+            'status_display',
+            'by',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'log',
+        ]
+        read_only_fields = [
+            'language',
+            'status',
+            'by',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'log',
+        ]
+
+    repository = serializers.SlugRelatedField(
+        queryset=Repository.objects,
+        slug_field='uuid',
+        required=True)
+    clone = serializers.SlugRelatedField(
+        slug_field='uuid',
+        read_only=True)
+    name = serializers.CharField(
+        source='clone.name',
+        max_length=64,
+        required=False,
+        help_text=_('Default is the name of the repository cloned'))
+    slug = serializers.SlugField(
+        source='clone.slug',
+        max_length=32,
+        required=True)
+    is_private = serializers.BooleanField(
+        source='clone.is_private',
+        default=False,
+        help_text=_('Always true in clones of a private repository ' +
+                    'by users that are not its admins'))
+    status_display = serializers.CharField(
+        source='get_status_display',
+        read_only=True)
+    by = serializers.StringRelatedField(
+        read_only=True)
+
+    def validate(self, attrs):
+        request = self.context.get('request')
+        repository = attrs.get('repository')
+        authorization = get_authorization(request, repository)
+        if not authorization.can_read:
+            raise PermissionDenied()
+        # Only an admin of a private repository can make its dataset public
+        if repository.is_private and not authorization.is_admin:
+            attrs.get('clone').update({'is_private': True})
+        slug = attrs.get('clone').get('slug')
+        if Repository.objects.filter(owner=request.user, slug=slug).exists():
+            raise serializers.ValidationError({'slug': _(
+                'You already have a repository with this slug.')})
+        return attrs
+
+    def create(self, validated_data):
+        repository = validated_data.get('repository')
+        clone = validated_data.get('clone')
+        by = self.context.get('request').user
+        # Small datasets are copied right away, the others by run_jobs.
+        # The job is created running, so no worker claims it too.
+        run = repository.examples().count() <= \
+            settings.CLONE_SYNC_MAX_EXAMPLES
+        with transaction.atomic():
+            job = RepositoryCloneJob.objects.create(
+                repository=repository,
+                language=repository.language,
+                by=by,
+                status=RepositoryCloneJob.STATUS_RUNNING if run
+                else RepositoryCloneJob.STATUS_QUEUED,
+                started_at=timezone.now() if run else None,
+                clone=Repository.objects.create(
+                    owner=by,
+                    name=clone.get('name') or repository.name,
+                    slug=clone.get('slug'),
+                    language=repository.language,
+                    algorithm=repository.algorithm,
+                    use_competing_intents=repository.use_competing_intents,
+                    use_name_entities=repository.use_name_entities,
+                    description=repository.description,
+                    is_private=clone.get('is_private')))
+        if run:
+            job.run()
+        return job
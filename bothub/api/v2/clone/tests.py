@@ -0,0 +1,199 @@
+import json
+
+from unittest import mock
+
+from django.test import TestCase
+from django.test import RequestFactory
+from django.test import override_settings
+from rest_framework import status
+
+from bothub.common.models import Repository
+from bothub.common.models import RepositoryExample
+from bothub.common.models import RepositoryCloneJob
+from bothub.common.models import RepositoryAuthorization
+from bothub.common import languages
+
+from ..tests.utils import create_user_and_token
+from .views import CloneJobViewSet
+
+
+class CloneJobAPITestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.owner, self.owner_token = create_user_and_token('owner')
+        self.user, self.user_token = create_user_and_token('user')
+
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN,
+            description='Say hi')
+        for text, intent in [('hi', 'greet'), ('bye', 'bye')]:
+            RepositoryExample.objects.create(
+                repository_update=self.repository.current_update(),
+                text=text,
+                intent=intent)
+        self.private_repository = Repository.objects.create(
+            owner=self.owner,
+            name='Private',
+            slug='private',
+            language=languages.LANGUAGE_EN,
+            is_private=True)
+
+    def request(self, method, data={}, token=None, action='list', pk=None):
+        authorization_header = {
+            'HTTP_AUTHORIZATION': 'Token {}'.format(token.key),
+        } if token else {}
+        if method == 'post':
+            request = self.factory.post(
+                '/api/v2/clone/',
+                data,
+                **authorization_header)
+        else:
+            request = self.factory.get(
+                '/api/v2/clone/',
+                data,
+                **authorization_header)
+        response = CloneJobViewSet.as_view({method: action})(
+            request,
+            pk=pk)
+        response.render()
+        content_data = json.loads(response.content)
+        return (response, content_data,)
+
+    def test_create(self):
+        run = RepositoryCloneJob.run
+
+        def run_claimed(job):
+            # Created running, a run_jobs worker can't claim it meanwhile
+            self.assertIsNone(RepositoryCloneJob.objects.next_queued())
+            self.assertEqual(
+                RepositoryCloneJob.objects.get(pk=job.pk).status,
+                RepositoryCloneJob.STATUS_RUNNING)
+            return run(job)
+
+        with mock.patch.object(
+                RepositoryCloneJob,
+                'run',
+                autospec=True,
+                side_effect=run_claimed) as job_run:
+            response, content_data = self.request(
+                'post',
+                {
+                    'repository': str(self.repository.uuid),
+                    'slug': 'my-test',
+                },
+                self.user_token,
+                action='create')
+        self.assertEqual(job_run.call_count, 1)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            content_data.get('status'),
+            RepositoryCloneJob.STATUS_SUCCESS)
+        clone = Repository.objects.get(uuid=content_data.get('clone'))
+        self.assertEqual(clone.owner, self.user)
+        self.assertEqual(clone.name, 'Testing')
+        self.assertEqual(clone.description, 'Say hi')
+        self.assertEqual(
+            sorted(clone.examples().values_list('text', flat=True)),
+            ['bye', 'hi'])
+
+    @override_settings(CLONE_SYNC_MAX_EXAMPLES=1)
+    def test_create_queued(self):
+        response, content_data = self.request(
+            'post',
+            {
+                'repository': str(self.repository.uuid),
+                'name': 'Mine',
+                'slug': 'mine',
+                'is_private': True,
+            },
+            self.user_token,
+            action='create')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            content_data.get('status'),
+            RepositoryCloneJob.STATUS_QUEUED)
+        self.assertEqual(content_data.get('name'), 'Mine')
+        self.assertTrue(content_data.get('is_private'))
+        clone = Repository.objects.get(uuid=content_data.get('clone'))
+        self.assertFalse(clone.examples().exists())
+
+    def test_slug_taken(self):
+        response, content_data = self.request(
+            'post',
+            {
+                'repository': str(self.repository.uuid),
+                'slug': 'test',
+            },
+            self.owner_token,
+            action='create')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('slug', content_data)
+
+    def test_create_without_permission(self):
+        response, content_data = self.request(
+            'post',
+            {
+                'repository': str(self.private_repository.uuid),
+                'slug': 'private',
+            },
+            self.user_token,
+            action='create')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_create_from_private(self):
+        authorization = self.private_repository.get_user_authorization(
+            self.user)
+        authorization.role = RepositoryAuthorization.ROLE_CONTRIBUTOR
+        authorization.save()
+        response, content_data = self.request(
+            'post',
+            {
+                'repository': str(self.private_repository.uuid),
+                'slug': 'copy',
+                'is_private': False,
+            },
+            self.user_token,
+            action='create')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(content_data.get('is_private'))
+
+        response, content_data = self.request(
+            'post',
+            {
+                'repository': str(self.private_repository.uuid),
+                'slug': 'copy',
+                'is_private': False,
+            },
+            self.owner_token,
+            action='create')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(content_data.get('is_private'))
+
+    def test_list_and_retrieve(self):
+        job = RepositoryCloneJob.objects.create(
+            repository=self.repository,
+            language=self.repository.language,
+            by=self.user,
+            clone=Repository.objects.create(
+                owner=self.user,
+                name='Testing',
+                slug='test',
+                language=languages.LANGUAGE_EN))
+        response, content_data = self.request('get', token=self.user_token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(content_data.get('count'), 1)
+
+        response, content_data = self.request('get', token=self.owner_token)
+        self.assertEqual(content_data.get('count'), 0)
+
+        response, content_data = self.request(
+            'get',
+            token=self.user_token,
+            action='retrieve',
+            pk=job.pk)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(content_data.get('status_display'), 'queued')
+        self.assertEqual(content_data.get('slug'), 'test')
@@ -0,0 +1,33 @@
+from rest_framework.viewsets import GenericViewSet
+from rest_framework import mixins
+from rest_framework.permissions import IsAuthenticated
+
+from bothub.common.models import RepositoryCloneJob
+
+from ..metadata import Metadata
+from .serializers import RepositoryCloneJobSerializer
+
+
+class CloneJobViewSet(
+        mixins.ListModelMixin,
+        mixins.CreateModelMixin,
+        mixins.RetrieveModelMixin,
+        GenericViewSet):
+    """
+    Clone a repository to a new one of the user with its current
+    examples, translations, entities and evaluate tests, and follow the
+    status of the copy. Large repositories are copied by the run_jobs
+    command.
+    """
+    queryset = RepositoryCloneJob.objects.select_related(
+        'repository',
+        'clone',
+        'by')
+    serializer_class = RepositoryCloneJobSerializer
+    permission_classes = [
+        IsAuthenticated,
+    ]
+    metadata_class = Metadata
+
+    def get_queryset(self):
+        return super().get_queryset().filter(by=self.request.user)
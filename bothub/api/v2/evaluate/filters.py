@@ -8,6 +8,9 @@ from rest_framework.exceptions import NotFound
 from bothub.common.models import Repository
 from bothub.common.models import RepositoryEvaluate
 from bothub.common.models import RepositoryEvaluateResult
+from bothub.common.models import RepositoryEvaluateJob
+
+from ...authorizations import get_authorization
 
 
 class EvaluatesFilter(filters.FilterSet):
@@ -48,7 +51,7 @@ class EvaluatesFilter(filters.FilterSet):
         request = self.request
         try:
             repository = Repository.objects.get(uuid=value)
-            authorization = repository.get_user_authorization(request.user)
+            authorization = get_authorization(request, repository)
             if not authorization.can_read:
                 raise PermissionDenied()
             return repository.evaluations(queryset=queryset)
@@ -86,7 +89,7 @@ class EvaluateResultsFilter(filters.FilterSet):
         request = self.request
         try:
             repository = Repository.objects.get(uuid=value)
-            authorization = repository.get_user_authorization(request.user)
+            authorization = get_authorization(request, repository)
 
             if not authorization.can_read:
                 raise PermissionDenied()
@@ -123,7 +126,7 @@ class EvaluateResultFilter(filters.FilterSet):
         request = self.request
         try:
             repository = Repository.objects.get(uuid=value)
-            authorization = repository.get_user_authorization(request.user)
+            authorization = get_authorization(request, repository)
 
             if not authorization.can_read:
                 raise PermissionDenied()
@@ -133,3 +136,33 @@ class EvaluateResultFilter(filters.FilterSet):
                 _('Repository {} does not exist').format(value))
         except DjangoValidationError:
             raise NotFound(_('Invalid repository_uuid'))
+
+
+class EvaluateJobsFilter(filters.FilterSet):
+
+    class Meta:
+        model = RepositoryEvaluateJob
+        fields = [
+            'language',
+            'status',
+        ]
+
+    repository_uuid = filters.CharFilter(
+        field_name='repository_uuid',
+        method='filter_repository_uuid',
+        required=True,
+        help_text=_('Repository\'s UUID'))
+
+    def filter_repository_uuid(self, queryset, name, value):
+        request = self.request
+        try:
+            repository = Repository.objects.get(uuid=value)
+            authorization = get_authorization(request, repository)
+            if not authorization.can_read:
+                raise PermissionDenied()
+            return queryset.filter(repository=repository)
+        except Repository.DoesNotExist:
+            raise NotFound(
+                _('Repository {} does not exist').format(value))
+        except DjangoValidationError:
+            raise NotFound(_('Invalid repository_uuid'))
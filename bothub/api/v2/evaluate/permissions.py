@@ -1,5 +1,9 @@
 from rest_framework import permissions
 
+from bothub.common.models import RepositoryAuthorization
+
+from ...authorizations import get_authorization
+
 from .. import READ_METHODS
 from .. import WRITE_METHODS
 
@@ -7,8 +11,9 @@ from .. import WRITE_METHODS
 class RepositoryEvaluatePermission(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
-        authorization = obj.repository_update. \
-            repository.get_user_authorization(request.user)
+        authorization = get_authorization(
+            request,
+            obj.repository_update.repository)
         if request.method in READ_METHODS:
             return authorization.can_read
         if request.user.is_authenticated:
@@ -21,9 +26,29 @@ class RepositoryEvaluatePermission(permissions.BasePermission):
 class RepositoryEvaluateResultPermission(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
-        authorization = obj.repository_update. \
-            repository.get_user_authorization(request.user)
+        authorization = get_authorization(
+            request,
+            obj.repository_update.repository)
 
         if request.method in READ_METHODS:
             return authorization.can_read
         return authorization.can_contribute
+
+
+class RepositoryEvaluateJobPermission(permissions.BasePermission):
+
+    def has_object_permission(self, request, view, obj):
+        authorization = get_authorization(request, obj.repository)
+        if request.method in READ_METHODS:
+            return authorization.can_read
+        return authorization.can_write
+
+
+class EvaluateResultReportPermission(permissions.BasePermission):
+    """
+    Only the NLP service, with a repository authorization that can write.
+    """
+
+    def has_permission(self, request, view):
+        return isinstance(request.auth, RepositoryAuthorization) and \
+            request.auth.can_write
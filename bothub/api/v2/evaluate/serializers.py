@@ -2,6 +2,7 @@ import json
 
 from django.utils.translation import gettext as _
 from rest_framework import serializers
+from rest_framework.exceptions import PermissionDenied
 
 from bothub.common.models import Repository
 from bothub.common.models import RepositoryEvaluate
@@ -10,12 +11,17 @@ from bothub.common.models import RepositoryEvaluateResult
 from bothub.common.models import RepositoryEvaluateResultScore
 from bothub.common.models import RepositoryEvaluateResultIntent
 from bothub.common.models import RepositoryEvaluateResultEntity
+from bothub.common.models import RepositoryEvaluateJob
+from bothub.common.models import validate_item_key
 
 from bothub.common.languages import LANGUAGE_CHOICES
 
+from ...authorizations import get_authorization
+
 from ..fields import EntityValueField
 from .validators import ThereIsEntityValidator
 from .validators import ThereIsIntentValidator
+from .validators import EvaluateTextNotDuplicatedValidator
 
 
 class RepositoryEvaluateEntitySerializer(serializers.ModelSerializer):
@@ -69,6 +75,7 @@ class RepositoryEvaluateSerializer(serializers.ModelSerializer):
         super().__init__(*args, **kwargs)
         self.validators.append(ThereIsEntityValidator())
         self.validators.append(ThereIsIntentValidator())
+        self.validators.append(EvaluateTextNotDuplicatedValidator())
 
     def create(self, validated_data):
         entities = validated_data.pop('entities')
@@ -206,12 +213,180 @@ class RepositoryEvaluateResultSerializer(serializers.ModelSerializer):
 
     def get_intents_list(self, obj):
         return RepositoryEvaluateResultIntentSerializer(
-            obj.evaluate_result_intent.all().exclude(intent__exact=''),
+            obj.evaluate_result_intent.select_related('score').exclude(
+                intent__exact=''),
             many=True).data
 
     def get_entities_list(self, obj):
         return RepositoryEvaluateResultEntitySerializer(
-            obj.evaluate_result_entity.all(), many=True).data
+            obj.evaluate_result_entity.select_related('score', 'entity'),
+            many=True).data
 
     def get_log(self, obj):
         return json.loads(obj.log)
+
+
+class EvaluateReportScoreSerializer(serializers.Serializer):
+    precision = serializers.FloatField(
+        required=False,
+        allow_null=True,
+        min_value=0,
+        max_value=1)
+    f1_score = serializers.FloatField(
+        required=False,
+        allow_null=True,
+        min_value=0,
+        max_value=1)
+    accuracy = serializers.FloatField(
+        required=False,
+        allow_null=True,
+        min_value=0,
+        max_value=1)
+    recall = serializers.FloatField(
+        required=False,
+        allow_null=True,
+        min_value=0,
+        max_value=1)
+    support = serializers.IntegerField(
+        required=False,
+        allow_null=True,
+        min_value=0)
+
+
+class EvaluateReportIntentSerializer(serializers.Serializer):
+    intent = serializers.CharField(
+        max_length=64,
+        allow_blank=True,
+        validators=[validate_item_key])
+    score = EvaluateReportScoreSerializer()
+
+
+class EvaluateReportEntitySerializer(serializers.Serializer):
+    entity = serializers.CharField(
+        max_length=64)
+    score = EvaluateReportScoreSerializer()
+
+
+class RepositoryEvaluateResultReportSerializer(serializers.Serializer):
+    """
+    Complete evaluation report sent by the NLP service, in the same shape
+    the results are read.
+    """
+
+    language = serializers.ChoiceField(
+        LANGUAGE_CHOICES,
+        label=_('Language'))
+    matrix_chart = serializers.URLField()
+    confidence_chart = serializers.URLField()
+    log = serializers.JSONField(
+        required=False,
+        default=list)
+    intent_results = EvaluateReportScoreSerializer()
+    entity_results = EvaluateReportScoreSerializer()
+    intents_list = EvaluateReportIntentSerializer(
+        many=True,
+        required=False)
+    entities_list = EvaluateReportEntitySerializer(
+        many=True,
+        required=False)
+
+    def validate(self, attrs):
+        repository = self.context.get('request').auth.repository
+        repository_update = repository.last_trained_update(
+            attrs.get('language'))
+        if not repository_update:
+            raise serializers.ValidationError({'language': _(
+                'There is no trained update in this language.')})
+
+        entities = set(map(
+            lambda e: e.get('entity'),
+            attrs.get('entities_list', [])))
+        missing = entities - set(repository.entities.filter(
+            value__in=entities).values_list('value', flat=True))
+        if missing:
+            raise serializers.ValidationError({'entities_list': _(
+                'Entities MUST match existing entities: {}').format(
+                    ', '.join(sorted(missing)))})
+
+        attrs.update({'repository_update': repository_update})
+        return attrs
+
+    def create(self, validated_data):
+        repository_update = validated_data.pop('repository_update')
+        validated_data.update({'log': json.dumps(validated_data.get('log'))})
+        return RepositoryEvaluateResult.objects.create_report(
+            repository_update,
+            validated_data)
+
+
+class RepositoryEvaluateJobSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = RepositoryEvaluateJob
+        fields = [
+            'id',
+            'repository',
+            'language',
+            'status',
+            'status_display',
+            'by',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'log',
+            'repository_update',
+            'evaluate_result',
+        ]
+        read_only_fields = [
+            'status',
+            'by',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'log',
+            'repository_update',
+            'evaluate_result',
+        ]
+
+    repository = serializers.SlugRelatedField(
+        queryset=Repository.objects,
+        slug_field='uuid',
+        required=True)
+    language = serializers.ChoiceField(
+        LANGUAGE_CHOICES,
+        required=False,
+        label=_('Language'),
+        help_text=_('Default is repository base language'))
+    status_display = serializers.CharField(
+        source='get_status_display',
+        read_only=True)
+    by = serializers.StringRelatedField(
+        read_only=True)
+
+    def validate(self, attrs):
+        repository = attrs.get('repository')
+        language = attrs.get('language') or repository.language
+        authorization = get_authorization(
+            self.context.get('request'),
+            repository)
+        if not authorization.can_write:
+            raise PermissionDenied()
+        if not repository.evaluations(language=language).exists():
+            raise serializers.ValidationError({'language': _(
+                'You need to have at least one registered test phrase')})
+        if len(repository.intents) <= 1:
+            raise serializers.ValidationError({'repository': _(
+                'You need to have at least two registered intents')})
+        if not repository.last_trained_update(language):
+            raise serializers.ValidationError({'language': _(
+                'There is no trained update in this language.')})
+        attrs.update({'language': language})
+        return attrs
+
+    def create(self, validated_data):
+        job, created = RepositoryEvaluateJob.enqueue(
+            validated_data.get('repository'),
+            validated_data.get('language'),
+            self.context.get('request').user)
+        self.created = created
+        return job
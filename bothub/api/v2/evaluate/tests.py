@@ -0,0 +1,296 @@
+import json
+
+from django.test import TestCase
+from django.test import RequestFactory
+from django.test import override_settings
+from rest_framework import status
+
+from bothub.common.models import Repository
+from bothub.common.models import RepositoryExample
+from bothub.common.models import RepositoryExampleEntity
+from bothub.common.models import RepositoryEvaluate
+from bothub.common.models import RepositoryEvaluateJob
+from bothub.common.models import RepositoryEvaluateResult
+from bothub.common import languages
+
+from ..tests.utils import create_user_and_token
+from .views import EvaluateViewSet
+from .views import ResultsListViewSet
+from .views import EvaluateJobViewSet
+
+
+class EvaluateTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.owner, self.owner_token = create_user_and_token('owner')
+        self.user, self.user_token = create_user_and_token('user')
+
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+        for text, intent in [('hi', 'greet'), ('hello', 'greet'),
+                             ('bye', 'bye'), ('good bye', 'bye')]:
+            example = RepositoryExample.objects.create(
+                repository_update=self.repository.current_update(),
+                text=text,
+                intent=intent)
+        RepositoryExampleEntity.objects.create(
+            repository_example=example,
+            start=0,
+            end=4,
+            entity='good')
+        RepositoryEvaluate.objects.create(
+            repository_update=self.repository.current_update(),
+            text='hey',
+            intent='greet')
+        update = self.repository.current_update()
+        update.start_training(self.owner)
+        update.save_training(b'bot')
+        self.trained_update = update
+        self.authorization = self.repository.get_user_authorization(
+            self.owner)
+
+    def post(self, view, data, authorization_header):
+        request = self.factory.post(
+            '/api/v2/evaluate/',
+            json.dumps(data),
+            content_type='application/json',
+            **authorization_header)
+        response = view(request)
+        response.render()
+        content_data = json.loads(response.content)
+        return (response, content_data,)
+
+
+class EvaluateResultReportAPITestCase(EvaluateTestCase):
+    def report(self, data, authorization=None):
+        authorization = authorization or self.authorization
+        return self.post(
+            ResultsListViewSet.as_view(
+                {'post': 'report'},
+                **ResultsListViewSet.report.kwargs),
+            data,
+            {'HTTP_AUTHORIZATION': 'Bearer {}'.format(authorization.uuid)})
+
+    def report_data(self, **kwargs):
+        data = {
+            'language': languages.LANGUAGE_EN,
+            'matrix_chart': 'https://example.com/matrix.png',
+            'confidence_chart': 'https://example.com/confidence.png',
+            'log': [{'text': 'hey', 'intent': 'greet', 'status': 'success'}],
+            'intent_results': {
+                'precision': 0.8571,
+                'f1_score': 0.8,
+                'accuracy': 0.75,
+            },
+            'entity_results': {
+                'precision': 1,
+                'f1_score': 1,
+                'accuracy': 1,
+            },
+            'intents_list': [
+                {
+                    'intent': 'greet',
+                    'score': {
+                        'precision': 1,
+                        'recall': 0.5,
+                        'f1_score': 0.67,
+                        'support': 2,
+                    },
+                },
+                {
+                    'intent': 'bye',
+                    'score': {
+                        'precision': 0.5,
+                        'recall': 1,
+                        'f1_score': 0.67,
+                        'support': 1,
+                    },
+                },
+            ],
+            'entities_list': [
+                {
+                    'entity': 'good',
+                    'score': {
+                        'precision': 1,
+                        'recall': 1,
+                        'f1_score': 1,
+                        'support': 1,
+                    },
+                },
+            ],
+        }
+        data.update(kwargs)
+        return data
+
+    def test_okay(self):
+        job, created = RepositoryEvaluateJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        job.start()
+        response, content_data = self.report(self.report_data())
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(content_data.get('version'), 1)
+        self.assertEqual(len(content_data.get('intents_list')), 2)
+        self.assertEqual(
+            content_data.get('entities_list')[0].get('entity'),
+            'good')
+        self.assertEqual(
+            content_data.get('intent_results').get('precision'),
+            0.86)
+        self.assertEqual(content_data.get('log')[0].get('text'), 'hey')
+
+        result = RepositoryEvaluateResult.objects.get()
+        self.assertEqual(result.repository_update, self.trained_update)
+        job.refresh_from_db()
+        self.assertEqual(job.evaluate_result, result)
+
+    def test_unknown_entity(self):
+        data = self.report_data()
+        data.get('entities_list')[0].update({'entity': 'unknown'})
+        response, content_data = self.report(data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('entities_list', content_data)
+        self.assertFalse(RepositoryEvaluateResult.objects.exists())
+
+    def test_invalid_intent(self):
+        data = self.report_data()
+        data.get('intents_list')[0].update({'intent': 'Not Valid'})
+        response, content_data = self.report(data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('intents_list', content_data)
+        self.assertFalse(RepositoryEvaluateResult.objects.exists())
+
+    def test_without_trained_update(self):
+        response, content_data = self.report(self.report_data(
+            language=languages.LANGUAGE_PT))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('language', content_data)
+
+    def test_authorization_without_write(self):
+        response, content_data = self.report(
+            self.report_data(),
+            self.repository.get_user_authorization(self.user))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_user_token(self):
+        response, content_data = self.post(
+            ResultsListViewSet.as_view(
+                {'post': 'report'},
+                **ResultsListViewSet.report.kwargs),
+            self.report_data(),
+            {'HTTP_AUTHORIZATION': 'Token {}'.format(self.owner_token.key)})
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_401_UNAUTHORIZED)
+
+
+class EvaluateJobAPITestCase(EvaluateTestCase):
+    def create(self, data, token):
+        return self.post(
+            EvaluateJobViewSet.as_view({'post': 'create'}),
+            data,
+            {'HTTP_AUTHORIZATION': 'Token {}'.format(token.key)})
+
+    def test_create(self):
+        response, content_data = self.create(
+            {'repository': str(self.repository.uuid)},
+            self.owner_token)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            content_data.get('status'),
+            RepositoryEvaluateJob.STATUS_QUEUED)
+        self.assertIsNone(content_data.get('evaluate_result'))
+
+        response, same_data = self.create(
+            {'repository': str(self.repository.uuid)},
+            self.owner_token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(same_data.get('id'), content_data.get('id'))
+
+    def test_create_without_permission(self):
+        response, content_data = self.create(
+            {'repository': str(self.repository.uuid)},
+            self.user_token)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_without_evaluations(self):
+        response, content_data = self.create(
+            {
+                'repository': str(self.repository.uuid),
+                'language': languages.LANGUAGE_PT,
+            },
+            self.owner_token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('language', content_data)
+
+    def test_list(self):
+        RepositoryEvaluateJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        request = self.factory.get(
+            '/api/v2/evaluate/jobs/',
+            {'repository_uuid': str(self.repository.uuid)},
+            HTTP_AUTHORIZATION='Token {}'.format(self.user_token.key))
+        response = EvaluateJobViewSet.as_view({'get': 'list'})(request)
+        response.render()
+        content_data = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(content_data.get('count'), 1)
+
+
+class EvaluateSearchAPITestCase(EvaluateTestCase):
+    def search(self, search):
+        request = self.factory.get(
+            '/api/v2/evaluate/',
+            {
+                'repository_uuid': str(self.repository.uuid),
+                'search': search,
+            },
+            HTTP_AUTHORIZATION='Token {}'.format(self.owner_token.key))
+        response = EvaluateViewSet.as_view({'get': 'list'})(request)
+        response.render()
+        content_data = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [result.get('text') for result in content_data.get('results')]
+
+    def test_ranked(self):
+        for text in ['they', 'hey you']:
+            RepositoryEvaluate.objects.create(
+                repository_update=self.repository.current_update(),
+                text=text,
+                intent='greet')
+        self.assertEqual(self.search('HEY'), ['hey', 'hey you', 'they'])
+        self.assertEqual(self.search('hey you'), ['hey you'])
+
+
+class EvaluateDuplicatedTextAPITestCase(EvaluateTestCase):
+    def create(self, text):
+        return self.post(
+            EvaluateViewSet.as_view({'post': 'create'}),
+            {
+                'repository': str(self.repository.uuid),
+                'language': languages.LANGUAGE_EN,
+                'text': text,
+                'intent': 'greet',
+                'entities': [],
+            },
+            {'HTTP_AUTHORIZATION': 'Token {}'.format(self.owner_token.key)})
+
+    def test_allowed(self):
+        response, content_data = self.create('Hey')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(REJECT_DUPLICATE_TEXT=True)
+    def test_rejected(self):
+        response, content_data = self.create('Hey')
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_400_BAD_REQUEST)
+        self.assertIn('text', content_data.keys())
+        response, content_data = self.create('hey you')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.utils.translation import gettext as _
 from rest_framework.exceptions import ValidationError
 
+from bothub.common.fields import text_hash
+
 
 class ThereIsIntentValidator(object):
 
@@ -27,3 +30,22 @@ class ThereIsEntityValidator(object):
                 raise ValidationError({'entities': _(
                     'Entities MUST match existing entities for training.'
                 )})
+
+
+class EvaluateTextNotDuplicatedValidator(object):
+
+    def __call__(self, attrs):
+        if not settings.REJECT_DUPLICATE_TEXT or 'text' not in attrs:
+            return
+        evaluations = attrs.get('repository').evaluations(
+            attrs.get('language')).filter(
+                text_hash=text_hash(attrs.get('text')))
+        if self.instance is not None:
+            evaluations = evaluations.exclude(pk=self.instance.pk)
+        if evaluations.exists():
+            raise ValidationError({'text': _(
+                'There is already an evaluate test with this text'
+            )})
+
+    def set_context(self, serializer):
+        self.instance = serializer.instance
@@ -1,28 +1,44 @@
 from rest_framework.viewsets import GenericViewSet
 from rest_framework import mixins
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from rest_framework.filters import SearchFilter
 from rest_framework.filters import OrderingFilter
 
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Prefetch
 
 from bothub.common.models import RepositoryEvaluate
+from bothub.common.models import RepositoryEvaluateEntity
 from bothub.common.models import RepositoryEvaluateResult
+from bothub.common.models import RepositoryEvaluateJob
 
+from ...conditional import ConditionalListMixin
+from ...conditional import ConditionalRetrieveMixin
+from ...search import TextSearchFilter
 from ..metadata import Metadata
+from ..authentication import RepositoryAuthorizationAuthentication
 from .serializers import RepositoryEvaluateSerializer
 from .serializers import RepositoryEvaluateResultVersionsSerializer
 from .serializers import RepositoryEvaluateResultSerializer
+from .serializers import RepositoryEvaluateResultReportSerializer
+from .serializers import RepositoryEvaluateJobSerializer
 
 from .filters import EvaluatesFilter
 from .filters import EvaluateResultsFilter
 from .filters import EvaluateResultFilter
+from .filters import EvaluateJobsFilter
 
 from .permissions import RepositoryEvaluatePermission
 from .permissions import RepositoryEvaluateResultPermission
+from .permissions import RepositoryEvaluateJobPermission
+from .permissions import EvaluateResultReportPermission
 
 
 class EvaluateViewSet(
+        ConditionalListMixin,
+        ConditionalRetrieveMixin,
         mixins.ListModelMixin,
         mixins.CreateModelMixin,
         mixins.RetrieveModelMixin,
@@ -32,25 +48,29 @@ class EvaluateViewSet(
     """
     Manager evaluate (tests).
     """
-    queryset = RepositoryEvaluate.objects
+    queryset = RepositoryEvaluate.objects.select_related(
+        'repository_update').prefetch_related(
+            Prefetch(
+                'entities',
+                queryset=RepositoryEvaluateEntity.objects.select_related(
+                    'entity')))
     serializer_class = RepositoryEvaluateSerializer
     permission_classes = [
         IsAuthenticatedOrReadOnly,
         RepositoryEvaluatePermission,
     ]
     metadata_class = Metadata
+    conditional_repository_field = 'repository_update.repository'
 
     def list(self, request, *args, **kwargs):
         self.filter_class = EvaluatesFilter
         self.filter_backends = [
             OrderingFilter,
-            SearchFilter,
+            TextSearchFilter,
             DjangoFilterBackend,
         ]
         self.search_fields = [
-            '$text',
-            '^text',
-            '=text',
+            'text',
         ]
         self.ordering_fields = [
             'created_at',
@@ -60,6 +80,8 @@ class EvaluateViewSet(
 
 
 class ResultsListViewSet(
+        ConditionalListMixin,
+        ConditionalRetrieveMixin,
         mixins.ListModelMixin,
         mixins.RetrieveModelMixin,
         GenericViewSet):
@@ -78,8 +100,70 @@ class ResultsListViewSet(
     ordering_fields = [
         'created_at',
     ]
+    conditional_repository_field = 'repository_update.repository'
 
     def retrieve(self, request, *args, **kwargs):
         self.serializer_class = RepositoryEvaluateResultSerializer
         self.filter_class = EvaluateResultFilter
         return super().retrieve(request, *args, **kwargs)
+
+    @action(
+        detail=False,
+        methods=['POST'],
+        url_name='evaluate-results-report',
+        authentication_classes=[RepositoryAuthorizationAuthentication],
+        permission_classes=[EvaluateResultReportPermission])
+    def report(self, request, **kwargs):
+        """
+        Save a complete evaluation report of the NLP service at once
+        """
+        serializer = RepositoryEvaluateResultReportSerializer(
+            data=request.data,
+            context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+        # Read back the scores rounded by the database
+        result = RepositoryEvaluateResult.objects.get(pk=result.pk)
+        return Response(
+            RepositoryEvaluateResultSerializer(result).data,
+            status=status.HTTP_201_CREATED)
+
+
+class EvaluateJobViewSet(
+        mixins.ListModelMixin,
+        mixins.CreateModelMixin,
+        mixins.RetrieveModelMixin,
+        GenericViewSet):
+    """
+    Queue the evaluation of a repository language, run by the run_jobs
+    command, and follow its status.
+    """
+    queryset = RepositoryEvaluateJob.objects.select_related(
+        'repository',
+        'by')
+    serializer_class = RepositoryEvaluateJobSerializer
+    permission_classes = [
+        IsAuthenticatedOrReadOnly,
+        RepositoryEvaluateJobPermission,
+    ]
+    metadata_class = Metadata
+
+    def list(self, request, *args, **kwargs):
+        self.filter_class = EvaluateJobsFilter
+        self.filter_backends = [
+            OrderingFilter,
+            DjangoFilterBackend,
+        ]
+        self.ordering_fields = [
+            'created_at',
+        ]
+        return super().list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED if serializer.created
+            else status.HTTP_200_OK)
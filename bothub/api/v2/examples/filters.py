@@ -9,6 +9,8 @@ from django_filters import rest_framework as filters
 from bothub.common.models import Repository
 from bothub.common.models import RepositoryExample
 
+from ...authorizations import get_authorization
+
 
 class ExamplesFilter(filters.FilterSet):
     class Meta:
@@ -52,7 +54,7 @@ class ExamplesFilter(filters.FilterSet):
         request = self.request
         try:
             repository = Repository.objects.get(uuid=value)
-            authorization = repository.get_user_authorization(request.user)
+            authorization = get_authorization(request, repository)
             if not authorization.can_read:
                 raise PermissionDenied()
             return repository.examples(queryset=queryset)
@@ -1,13 +1,17 @@
 import json
 
 from django.test import TestCase
+from django.test import TransactionTestCase
 from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from rest_framework import status
 
 from bothub.common.models import Repository
 from bothub.common.models import RepositoryExample
 from bothub.common.models import RepositoryTranslatedExample
 from bothub.common.models import RepositoryExampleEntity
+from bothub.common.models import RepositoryTranslatedExampleEntity
 from bothub.common import languages
 
 from ..tests.utils import create_user_and_token
@@ -149,6 +153,31 @@ class ListExamplesAPITestCase(TestCase):
             content_data.get('count'),
             2)
 
+    def test_search_ranked(self):
+        example = RepositoryExample.objects.create(
+            repository_update=self.repository.current_update(),
+            text='goodbye',
+            intent='farewell')
+        response, content_data = self.request({
+            'repository_uuid': self.repository.uuid,
+            'search': 'BYE',
+        })
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK)
+        self.assertEqual(
+            [result.get('id') for result in content_data.get('results')],
+            [self.example_3.id, self.example_4.id, example.id])
+
+    def test_search_terms(self):
+        response, content_data = self.request({
+            'repository_uuid': self.repository.uuid,
+            'search': 'ye b',
+        })
+        self.assertEqual(
+            [result.get('id') for result in content_data.get('results')],
+            [self.example_4.id, self.example_3.id])
+
     def test_filter_language(self):
         response, content_data = self.request({
             'repository_uuid': self.repository_2.uuid,
@@ -284,3 +313,93 @@ class ListExamplesAPITestCase(TestCase):
         self.assertEqual(
             content_data.get('count'),
             1)
+
+    def test_queries_by_page(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                response, content_data = self.request(
+                    {'repository_uuid': self.repository_2.uuid},
+                    self.owner_token)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(context), content_data
+
+        # The first request creates the user authorization
+        count_queries()
+        queries = count_queries()[0]
+        for i in range(5):
+            example = RepositoryExample.objects.create(
+                repository_update=self.repository_2.current_update(),
+                text='my name is user {}'.format(i),
+                intent='greet')
+            RepositoryExampleEntity.objects.create(
+                repository_example=example,
+                start=11,
+                end=15,
+                entity='name')
+            translated = RepositoryTranslatedExample.objects.create(
+                original_example=example,
+                language=languages.LANGUAGE_PT,
+                text='meu nome é user {}'.format(i))
+            RepositoryTranslatedExampleEntity.objects.create(
+                repository_translated_example=translated,
+                start=11,
+                end=15,
+                entity='name')
+
+        queries_after, content_data = count_queries()
+        self.assertEqual(queries_after, queries)
+        example = next(filter(
+            lambda e: e.get('translations'),
+            content_data.get('results')))
+        self.assertEqual(len(example.get('translations')), 1)
+        self.assertEqual(example.get('entities')[0].get('value'), 'user')
+        self.assertEqual(example.get('entities')[0].get('entity'), 'name')
+
+
+class ConditionalListExamplesAPITestCase(TransactionTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.owner, self.owner_token = create_user_and_token('owner')
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Repository 1',
+            slug='repo',
+            language=languages.LANGUAGE_EN)
+        RepositoryExample.objects.create(
+            repository_update=self.repository.current_update(),
+            text='hi',
+            intent='greet')
+
+    def request(self, **headers):
+        request = self.factory.get(
+            '/api/v2/examples/',
+            {'repository_uuid': self.repository.uuid},
+            HTTP_AUTHORIZATION='Token {}'.format(self.owner_token.key),
+            **headers)
+        response = ExamplesViewSet.as_view({'get': 'list'})(request)
+        response.render()
+        return response
+
+    def test_not_modified(self):
+        etag = self.request()['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = self.request(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse([
+            query
+            for query in context.captured_queries
+            if 'COUNT' in query['sql']
+        ])
+
+    def test_example_added(self):
+        etag = self.request()['ETag']
+        RepositoryExample.objects.create(
+            repository_update=self.repository.current_update(),
+            text='bye',
+            intent='farewell')
+        response = self.request(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content).get('count'), 2)
+        self.assertNotEqual(response['ETag'], etag)
@@ -1,31 +1,34 @@
 from rest_framework import mixins
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.filters import OrderingFilter
-from rest_framework.filters import SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
 
 from bothub.common.models import RepositoryExample
 
+from ...prefetch import prefetch_examples
+from ...conditional import ConditionalListMixin
+from ...search import TextSearchFilter
 from ..example.serializers import RepositoryExampleSerializer
 from ..example.permissions import RepositoryExamplePermission
 from .filters import ExamplesFilter
 
 
 class ExamplesViewSet(
+        ConditionalListMixin,
         mixins.ListModelMixin,
         GenericViewSet):
-    queryset = RepositoryExample.objects
+    queryset = prefetch_examples(
+        RepositoryExample.objects.all(),
+        nested_translations=False)
     serializer_class = RepositoryExampleSerializer
     filter_class = ExamplesFilter
     filter_backends = [
         OrderingFilter,
-        SearchFilter,
+        TextSearchFilter,
         DjangoFilterBackend,
     ]
     search_fields = [
-        '$text',
-        '^text',
-        '=text',
+        'text',
     ]
     ordering_fields = [
         'created_at',
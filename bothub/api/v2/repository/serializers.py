@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db.models import Count
 
 from bothub.common.models import Repository
 from bothub.common.models import RepositoryCategory
@@ -6,6 +7,9 @@ from bothub.common.models import RepositoryEntityLabel
 from bothub.common.models import RepositoryAuthorization
 from bothub.common.models import RequestRepositoryAuthorization
 from bothub.common.languages import LANGUAGE_CHOICES
+
+from ...authorizations import get_authorization
+from ...authorizations import get_saved_authorization
 from ..request.serializers import RequestRepositoryAuthorizationSerializer
 
 
@@ -173,13 +177,14 @@ class RepositorySerializer(serializers.ModelSerializer):
         return obj.current_entities.values('value', 'id').distinct()
 
     def get_intents(self, obj):
+        examples_count = dict(obj.examples(
+            exclude_deleted=True).order_by().values_list(
+                'intent').annotate(Count('id')))
         return IntentSerializer(
             map(
                 lambda intent: {
                     'value': intent,
-                    'examples__count': obj.examples(
-                        exclude_deleted=True).filter(
-                            intent=intent).count(),
+                    'examples__count': examples_count.get(intent, 0),
                 },
                 obj.intents),
             many=True).data
@@ -210,7 +215,7 @@ class RepositorySerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             return None
         return RepositoryAuthorizationSerializer(
-            obj.get_user_authorization(request.user)).data
+            get_saved_authorization(request, obj)).data
 
     def get_request_authorization(self, obj):
         request = self.context.get('request')
@@ -229,7 +234,7 @@ class RepositorySerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return False
-        authorization = obj.get_user_authorization(request.user)
+        authorization = get_authorization(request, obj)
         if authorization.role is not RepositoryAuthorization.ROLE_NOT_SETTED:
             return False
         if authorization.is_owner:
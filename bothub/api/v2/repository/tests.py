@@ -1,8 +1,12 @@
 import json
 
+from datetime import timedelta
+
 from django.test import TestCase
 from django.test import RequestFactory
 from django.test.client import MULTIPART_CONTENT
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework import status
 
 from bothub.common.models import RepositoryCategory
@@ -202,6 +206,151 @@ class RetriveRepositoryTestCase(TestCase):
                 if repository.is_private else status.HTTP_200_OK)
 
 
+class ConditionalRetrieveRepositoryTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        self.owner, self.owner_token = create_user_and_token('owner')
+        self.user, self.user_token = create_user_and_token('user')
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+
+    def request(self, token, **headers):
+        request = self.factory.get(
+            '/api/v2/repository/{}/'.format(self.repository.uuid),
+            HTTP_AUTHORIZATION='Token {}'.format(token.key),
+            **headers)
+        response = RepositoryViewSet.as_view({'get': 'retrieve'})(
+            request,
+            uuid=self.repository.uuid)
+        response.render()
+        return response
+
+    def test_not_modified(self):
+        response = self.request(self.owner_token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('no-cache', response['Cache-Control'])
+        response = self.request(
+            self.owner_token,
+            HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_if_modified_since(self):
+        Repository.objects.filter(pk=self.repository.pk).update(
+            changed_at=timezone.now() - timedelta(seconds=2))
+        response = self.request(self.owner_token)
+        response = self.request(
+            self.owner_token,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_304_NOT_MODIFIED)
+
+    def test_changed_in_the_last_second(self):
+        response = self.request(self.owner_token)
+        self.assertNotIn('Last-Modified', response)
+        response = self.request(
+            self.owner_token,
+            HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_changed(self):
+        etag = self.request(self.owner_token)['ETag']
+        self.repository.description = 'Changed'
+        self.repository.save()
+        response = self.request(self.owner_token, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_other_user(self):
+        etag = self.request(self.owner_token)['ETag']
+        response = self.request(self.user_token, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class RepositoryDuplicatesTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        self.owner, self.owner_token = create_user_and_token('owner')
+        self.user, self.user_token = create_user_and_token('user')
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN,
+            is_private=True)
+        self.examples = [
+            RepositoryExample.objects.create(
+                repository_update=self.repository.current_update(),
+                text=text,
+                intent='greet')
+            for text in ['Hi there', 'hi  THERE', 'hello', 'hi there ']
+        ]
+        RepositoryExample.objects.create(
+            repository_update=self.repository.current_update(
+                languages.LANGUAGE_PT),
+            text='hi there',
+            intent='greet')
+        for example in self.examples[:2]:
+            RepositoryTranslatedExample.objects.create(
+                original_example=example,
+                language=languages.LANGUAGE_PT,
+                text='Olá')
+
+    def request(self, token, data={}):
+        request = self.factory.get(
+            '/api/v2/repository/{}/duplicates/'.format(self.repository.uuid),
+            data,
+            HTTP_AUTHORIZATION='Token {}'.format(token.key))
+        response = RepositoryViewSet.as_view({'get': 'duplicates'})(
+            request,
+            uuid=self.repository.uuid)
+        response.render()
+        content_data = json.loads(response.content)
+        return (response, content_data,)
+
+    def test_okay(self):
+        response, content_data = self.request(self.owner_token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                [item.get('id') for item in group]
+                for group in content_data.get('examples')
+            ],
+            [[self.examples[0].pk, self.examples[1].pk, self.examples[3].pk]])
+        self.assertEqual(content_data.get('translations'), [])
+        self.assertEqual(content_data.get('evaluations'), [])
+
+    def test_language(self):
+        response, content_data = self.request(
+            self.owner_token,
+            {'language': languages.LANGUAGE_PT})
+        self.assertEqual(content_data.get('examples'), [])
+        self.assertEqual(
+            [len(group) for group in content_data.get('translations')],
+            [2])
+
+    def test_invalid_language(self):
+        response, content_data = self.request(
+            self.owner_token,
+            {'language': 'xx'})
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_400_BAD_REQUEST)
+        self.assertIn('language', content_data.keys())
+
+    def test_without_permission(self):
+        response, content_data = self.request(self.user_token)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
 class UpdateRepositoryTestCase(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
@@ -1,11 +1,19 @@
+from django.utils.translation import gettext as _
 from rest_framework.viewsets import GenericViewSet
 from rest_framework import mixins
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter
 
+from bothub.common import languages
 from bothub.common.models import Repository
 
+from ...conditional import ConditionalRetrieveMixin
+from ...conditional import not_modified_response
+from ...conditional import set_validators
+from ...search import NameSearchFilter
 from ..metadata import Metadata
 from .serializers import RepositorySerializer
 from .serializers import ShortRepositorySerializer
@@ -14,6 +22,7 @@ from .filters import RepositoriesFilter
 
 
 class RepositoryViewSet(
+        ConditionalRetrieveMixin,
         mixins.CreateModelMixin,
         mixins.RetrieveModelMixin,
         mixins.UpdateModelMixin,
@@ -31,6 +40,29 @@ class RepositoryViewSet(
     ]
     metadata_class = Metadata
 
+    @action(
+        detail=True,
+        methods=['GET'],
+        url_name='repository-duplicates')
+    def duplicates(self, request, **kwargs):
+        """
+        Groups of examples, translations and evaluate tests with the same
+        text, ignoring accents, case and whitespace, in the language of the
+        language query param (default is the repository language).
+        """
+        repository = self.get_object()
+        language = request.query_params.get('language')
+        if language and not languages.is_valid_language(language):
+            raise ValidationError({'language': _(
+                '{} is not a supported language.').format(language)})
+        response = not_modified_response(request, repository.changed_at)
+        if response is not None:
+            return response
+        return set_validators(
+            request,
+            Response(repository.duplicates(language)),
+            repository.changed_at)
+
 
 class RepositoriesViewSet(
         mixins.ListModelMixin,
@@ -43,10 +75,12 @@ class RepositoriesViewSet(
     filter_class = RepositoriesFilter
     filter_backends = [
         DjangoFilterBackend,
-        SearchFilter,
+        NameSearchFilter,
     ]
     search_fields = [
-        '$name',
-        '^name',
-        '=name',
+        'name',
+    ]
+    search_document_fields = [
+        'description',
+        'categories__name',
     ]
@@ -5,6 +5,9 @@ from .repository.views import RepositoriesViewSet
 from .examples.views import ExamplesViewSet
 from .evaluate.views import EvaluateViewSet
 from .evaluate.views import ResultsListViewSet
+from .evaluate.views import EvaluateJobViewSet
+from .training.views import TrainingJobViewSet
+from .clone.views import CloneJobViewSet
 
 
 router = routers.SimpleRouter()
@@ -12,4 +15,7 @@ router.register('repository', RepositoryViewSet)
 router.register('repositories', RepositoriesViewSet)
 router.register('examples', ExamplesViewSet)
 router.register('evaluate/results', ResultsListViewSet)
+router.register('evaluate/jobs', EvaluateJobViewSet)
 router.register('evaluate', EvaluateViewSet)
+router.register('training', TrainingJobViewSet)
+router.register('clone', CloneJobViewSet)
@@ -0,0 +1,41 @@
+from django.utils.translation import gettext as _
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django_filters import rest_framework as filters
+
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound
+
+from bothub.common.models import Repository
+from bothub.common.models import RepositoryTrainingJob
+
+from ...authorizations import get_authorization
+
+
+class TrainingJobsFilter(filters.FilterSet):
+
+    class Meta:
+        model = RepositoryTrainingJob
+        fields = [
+            'language',
+            'status',
+        ]
+
+    repository_uuid = filters.CharFilter(
+        field_name='repository_uuid',
+        method='filter_repository_uuid',
+        required=True,
+        help_text=_('Repository\'s UUID'))
+
+    def filter_repository_uuid(self, queryset, name, value):
+        request = self.request
+        try:
+            repository = Repository.objects.get(uuid=value)
+            authorization = get_authorization(request, repository)
+            if not authorization.can_read:
+                raise PermissionDenied()
+            return queryset.filter(repository=repository)
+        except Repository.DoesNotExist:
+            raise NotFound(
+                _('Repository {} does not exist').format(value))
+        except DjangoValidationError:
+            raise NotFound(_('Invalid repository_uuid'))
@@ -0,0 +1,14 @@
+from rest_framework import permissions
+
+from ...authorizations import get_authorization
+
+from .. import READ_METHODS
+
+
+class RepositoryTrainingJobPermission(permissions.BasePermission):
+
+    def has_object_permission(self, request, view, obj):
+        authorization = get_authorization(request, obj.repository)
+        if request.method in READ_METHODS:
+            return authorization.can_read
+        return authorization.can_write
@@ -0,0 +1,91 @@
+from django.utils.translation import gettext as _
+from rest_framework import serializers
+from rest_framework.exceptions import PermissionDenied
+
+from bothub.common.models import Repository
+from bothub.common.models import RepositoryTrainingJob
+
+from bothub.common.languages import LANGUAGE_CHOICES
+
+from ...authorizations import get_authorization
+
+
+class RepositoryTrainingJobSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = RepositoryTrainingJob
+        fields = [
+            'id',
+            'repository',
+            'language',
+            'status',
+            'status_display',
+            'by',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'log',
+            'repository_update',
+            'training_started_at',
+            'trained_at',
+            'failed_at',
+            'training_log',
+        ]
+        read_only_fields = [
+            'status',
+            'by',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'log',
+            'repository_update',
+        ]
+
+    repository = serializers.SlugRelatedField(
+        queryset=Repository.objects,
+        slug_field='uuid',
+        required=True)
+    language = serializers.ChoiceField(
+        LANGUAGE_CHOICES,
+        required=False,
+        label=_('Language'),
+        help_text=_('Default is repository base language'))
+    status_display = serializers.CharField(
+        source='get_status_display',
+        read_only=True)
+    by = serializers.StringRelatedField(
+        read_only=True)
+    training_started_at = serializers.DateTimeField(
+        source='repository_update.training_started_at',
+        read_only=True)
+    trained_at = serializers.DateTimeField(
+        source='repository_update.trained_at',
+        read_only=True)
+    failed_at = serializers.DateTimeField(
+        source='repository_update.failed_at',
+        read_only=True)
+    training_log = serializers.CharField(
+        source='repository_update.training_log',
+        read_only=True)
+
+    def validate(self, attrs):
+        repository = attrs.get('repository')
+        language = attrs.get('language') or repository.language
+        authorization = get_authorization(
+            self.context.get('request'),
+            repository)
+        if not authorization.can_write:
+            raise PermissionDenied()
+        if not repository.current_update(language).ready_for_train:
+            raise serializers.ValidationError({'language': _(
+                'The {} update is not ready for train.').format(language)})
+        attrs.update({'language': language})
+        return attrs
+
+    def create(self, validated_data):
+        job, created = RepositoryTrainingJob.enqueue(
+            validated_data.get('repository'),
+            validated_data.get('language'),
+            self.context.get('request').user)
+        self.created = created
+        return job
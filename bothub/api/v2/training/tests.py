@@ -0,0 +1,117 @@
+import json
+
+from django.test import TestCase
+from django.test import RequestFactory
+from rest_framework import status
+
+from bothub.common.models import Repository
+from bothub.common.models import RepositoryExample
+from bothub.common.models import RepositoryTrainingJob
+from bothub.common import languages
+
+from ..tests.utils import create_user_and_token
+from .views import TrainingJobViewSet
+
+
+class TrainingJobAPITestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.owner, self.owner_token = create_user_and_token('owner')
+        self.user, self.user_token = create_user_and_token('user')
+
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+        for text, intent in [('hi', 'greet'), ('hello', 'greet'),
+                             ('bye', 'bye'), ('good bye', 'bye')]:
+            RepositoryExample.objects.create(
+                repository_update=self.repository.current_update(),
+                text=text,
+                intent=intent)
+
+    def request(self, method, data={}, token=None, action='list', pk=None):
+        authorization_header = {
+            'HTTP_AUTHORIZATION': 'Token {}'.format(token.key),
+        } if token else {}
+        if method == 'post':
+            request = self.factory.post(
+                '/api/v2/training/',
+                data,
+                **authorization_header)
+        else:
+            request = self.factory.get(
+                '/api/v2/training/',
+                data,
+                **authorization_header)
+        response = TrainingJobViewSet.as_view({method: action})(
+            request,
+            pk=pk)
+        response.render()
+        content_data = json.loads(response.content)
+        return (response, content_data,)
+
+    def test_create(self):
+        response, content_data = self.request(
+            'post',
+            {'repository': str(self.repository.uuid)},
+            self.owner_token,
+            action='create')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(content_data.get('language'), languages.LANGUAGE_EN)
+        self.assertEqual(
+            content_data.get('status'),
+            RepositoryTrainingJob.STATUS_QUEUED)
+        self.assertEqual(
+            content_data.get('repository_update'),
+            self.repository.current_update().pk)
+
+        response, same_data = self.request(
+            'post',
+            {'repository': str(self.repository.uuid)},
+            self.owner_token,
+            action='create')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(same_data.get('id'), content_data.get('id'))
+
+    def test_create_without_permission(self):
+        response, content_data = self.request(
+            'post',
+            {'repository': str(self.repository.uuid)},
+            self.user_token,
+            action='create')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_not_ready_for_train(self):
+        response, content_data = self.request(
+            'post',
+            {
+                'repository': str(self.repository.uuid),
+                'language': languages.LANGUAGE_PT,
+            },
+            self.owner_token,
+            action='create')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('language', content_data)
+
+    def test_list_and_retrieve(self):
+        job, created = RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        response, content_data = self.request(
+            'get',
+            {'repository_uuid': str(self.repository.uuid)},
+            self.user_token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(content_data.get('count'), 1)
+
+        response, content_data = self.request(
+            'get',
+            token=self.user_token,
+            action='retrieve',
+            pk=job.pk)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(content_data.get('status_display'), 'queued')
+        self.assertIsNone(content_data.get('trained_at'))
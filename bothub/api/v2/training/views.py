@@ -0,0 +1,56 @@
+from rest_framework.viewsets import GenericViewSet
+from rest_framework import mixins
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.filters import OrderingFilter
+
+from django_filters.rest_framework import DjangoFilterBackend
+
+from bothub.common.models import RepositoryTrainingJob
+
+from ..metadata import Metadata
+from .serializers import RepositoryTrainingJobSerializer
+from .filters import TrainingJobsFilter
+from .permissions import RepositoryTrainingJobPermission
+
+
+class TrainingJobViewSet(
+        mixins.ListModelMixin,
+        mixins.CreateModelMixin,
+        mixins.RetrieveModelMixin,
+        GenericViewSet):
+    """
+    Queue the training of a repository update, run by the run_jobs
+    command, and follow its status.
+    """
+    queryset = RepositoryTrainingJob.objects.select_related(
+        'repository',
+        'repository_update',
+        'by')
+    serializer_class = RepositoryTrainingJobSerializer
+    permission_classes = [
+        IsAuthenticatedOrReadOnly,
+        RepositoryTrainingJobPermission,
+    ]
+    metadata_class = Metadata
+
+    def list(self, request, *args, **kwargs):
+        self.filter_class = TrainingJobsFilter
+        self.filter_backends = [
+            OrderingFilter,
+            DjangoFilterBackend,
+        ]
+        self.ordering_fields = [
+            'created_at',
+        ]
+        return super().list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED if serializer.created
+            else status.HTTP_200_OK)
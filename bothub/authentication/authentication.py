@@ -0,0 +1,146 @@
+import copy
+import time
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import authentication
+from rest_framework.authtoken.models import Token
+
+from bothub.health.metrics import cache_hit
+from bothub.health.metrics import cache_miss
+
+
+class TokenCache(object):
+    """
+    Tokens (with their users) used lately in this process, at most
+    TOKEN_CACHE_SIZE for TOKEN_CACHE_LOCAL_TTL seconds. When
+    TOKEN_CACHE_SHARED names a cache of CACHES they are saved there too,
+    for TOKEN_CACHE_TTL seconds, shared by every worker and host.
+
+    A deleted token or a changed user is removed from this process and
+    from the shared cache at once, the other processes forget it in at
+    most TOKEN_CACHE_LOCAL_TTL seconds. The shared cache only has a
+    snapshot of the token and its user fields, without the password.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tokens = OrderedDict()
+
+    @property
+    def shared(self):
+        if not settings.TOKEN_CACHE_SHARED:
+            return None
+        return caches[settings.TOKEN_CACHE_SHARED]
+
+    @classmethod
+    def shared_key(cls, key):
+        return 'auth-token-snapshot:{}'.format(
+            hashlib.sha1(key.encode()).hexdigest())
+
+    @classmethod
+    def snapshot(cls, token):
+        user = token.user
+        return {
+            'db': user._state.db,
+            'token': {
+                field.attname: getattr(token, field.attname)
+                for field in Token._meta.concrete_fields
+            },
+            'user': {
+                field.attname: getattr(user, field.attname)
+                for field in type(user)._meta.concrete_fields
+                if field.attname != 'password'
+            },
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        The password is a deferred field of the user, loaded if used and
+        not written by save().
+        """
+        db = snapshot.get('db')
+        user_model = Token._meta.get_field('user').related_model
+        user = user_model.from_db(
+            db,
+            list(snapshot.get('user').keys()),
+            list(snapshot.get('user').values()))
+        token = Token.from_db(
+            db,
+            list(snapshot.get('token').keys()),
+            list(snapshot.get('token').values()))
+        token.user = user
+        return token
+
+    def get(self, key):
+        with self.lock:
+            cached = self.tokens.get(key)
+            if cached is not None:
+                token, expires_at = cached
+                if expires_at > time.time():
+                    self.tokens.move_to_end(key)
+                    return token
+                del self.tokens[key]
+        if self.shared is None:
+            return None
+        snapshot = self.shared.get(self.shared_key(key))
+        if snapshot is None:
+            return None
+        token = self.from_snapshot(snapshot)
+        self.set_local(key, token)
+        return token
+
+    def set_local(self, key, token):
+        if settings.TOKEN_CACHE_SIZE <= 0:
+            return
+        with self.lock:
+            self.tokens[key] = (
+                token,
+                time.time() + settings.TOKEN_CACHE_LOCAL_TTL)
+            self.tokens.move_to_end(key)
+            while len(self.tokens) > settings.TOKEN_CACHE_SIZE:
+                self.tokens.popitem(last=False)
+
+    def set(self, key, token):
+        self.set_local(key, token)
+        if self.shared is not None:
+            self.shared.set(
+                self.shared_key(key),
+                self.snapshot(token),
+                settings.TOKEN_CACHE_TTL)
+
+    def delete(self, key):
+        with self.lock:
+            self.tokens.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete(self.shared_key(key))
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(authentication.TokenAuthentication):
+    """
+    TokenAuthentication reading the token and its user from token_cache,
+    the database is only queried for tokens not used lately. Each request
+    gets its own copy of the cached user.
+    """
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is not None:
+            cache_hit('token')
+            return (copy.copy(token.user), token)
+        cache_miss('token')
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, token)
+        return (copy.copy(user), token)
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+from bothub.db.trigram import CreateTrigramIndexes
+
+
+def create_email_index(apps, schema_editor):
+    # email__iexact
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX authentication_user_email_upper_idx '
+        'ON authentication_user (UPPER(email))')
+
+
+def drop_email_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'DROP INDEX IF EXISTS authentication_user_email_upper_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_auto_20180620_2059'),
+    ]
+
+    operations = [
+        CreateTrigramIndexes([
+            ('authentication_user_name_trgm_idx', 'authentication_user',
+             'name'),
+            ('authentication_user_nickname_trgm_idx', 'authentication_user',
+             'nickname'),
+        ]),
+        migrations.RunPython(create_email_index, drop_email_index),
+    ]
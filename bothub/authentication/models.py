@@ -5,8 +5,6 @@ from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import PermissionsMixin
 from django.core.validators import RegexValidator, _lazy_re_compile
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.dispatch import receiver
@@ -103,26 +101,23 @@ class User(AbstractBaseUser, PermissionsMixin):
         return PasswordResetTokenGenerator()
 
     def send_welcome_email(self):
+        from bothub.common.models import QueuedEmail
         if not settings.SEND_EMAILS:
             return False
         context = {
             'name': self.name,
         }
-        send_mail(
+        QueuedEmail.objects.enqueue(
             _('Welcome to Bothub'),
-            render_to_string(
-                'authentication/emails/welcome.txt',
-                context),
-            None,
-            [self.email],
-            html_message=render_to_string(
-                'authentication/emails/welcome.html',
-                context))
+            'authentication/emails/welcome',
+            context,
+            self.email)
 
     def make_password_reset_token(self):
         return self.token_generator.make_token(self)
 
     def send_reset_password_email(self):
+        from bothub.common.models import QueuedEmail
         if not settings.SEND_EMAILS:
             return False
         token = self.make_password_reset_token()
@@ -133,16 +128,11 @@ class User(AbstractBaseUser, PermissionsMixin):
         context = {
             'reset_url': reset_url,
         }
-        send_mail(
+        QueuedEmail.objects.enqueue(
             _('Reset your bothub password'),
-            render_to_string(
-                'authentication/emails/reset_password.txt',
-                context),
-            None,
-            [self.email],
-            html_message=render_to_string(
-                'authentication/emails/reset_password.html',
-                context),)
+            'authentication/emails/reset_password',
+            context,
+            self.email)
 
     def check_password_reset_token(self, token):
         return self.token_generator.check_token(self, token)
@@ -152,3 +142,22 @@ class User(AbstractBaseUser, PermissionsMixin):
 def send_welcome_email(instance, created, **kwargs):
     if created:
         instance.send_welcome_email()
+
+
+@receiver(models.signals.post_save, sender=User)
+def forget_cached_user_tokens(instance, created, **kwargs):
+    # Deactivated users must stop authenticating at once
+    from rest_framework.authtoken.models import Token
+    from .authentication import token_cache
+    if created:
+        return
+    for key in Token.objects.filter(user=instance).values_list(
+            'key',
+            flat=True):
+        token_cache.delete(key)
+
+
+@receiver(models.signals.post_delete, sender='authtoken.Token')
+def forget_cached_token(instance, **kwargs):
+    from .authentication import token_cache
+    token_cache.delete(instance.key)
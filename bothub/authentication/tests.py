@@ -1,7 +1,15 @@
+from unittest import mock
+
 from django.test import TestCase
+from django.test import override_settings
 from django.db import IntegrityError
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
 
 from .models import User
+from .authentication import CachedTokenAuthentication
+from .authentication import token_cache
 
 
 class AuthenticationTestCase(TestCase):
@@ -30,3 +38,99 @@ class AuthenticationTestCase(TestCase):
         User.objects.create_user('user1@user.com', 'fake')
         with self.assertRaises(IntegrityError):
             User.objects.create_user('user2@user.com', 'fake')
+
+
+class CachedTokenAuthenticationTestCase(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.user = User.objects.create_user(
+            'fake@user.com',
+            'fake',
+            '123456')
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = CachedTokenAuthentication()
+
+    def authenticate(self, token=None):
+        return self.authentication.authenticate_credentials(
+            (token or self.token).key)
+
+    def test_cache_hit(self):
+        with self.assertNumQueries(1):
+            user, token = self.authenticate()
+        self.assertEqual(user, self.user)
+        with self.assertNumQueries(0):
+            user, token = self.authenticate()
+        self.assertEqual(user, self.user)
+        self.assertEqual(token, self.token)
+
+    def test_token_deleted(self):
+        key = self.token.key
+        self.authenticate()
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials(key)
+
+    def test_user_deactivated(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_user_changed(self):
+        self.authenticate()
+        self.user.name = 'New Name'
+        self.user.save()
+        user, token = self.authenticate()
+        self.assertEqual(user.name, 'New Name')
+
+    def test_user_copy(self):
+        user, token = self.authenticate()
+        user.name = 'Changed'
+        user, token = self.authenticate()
+        self.assertNotEqual(user.name, 'Changed')
+
+    @override_settings(TOKEN_CACHE_SIZE=1)
+    def test_size(self):
+        other = Token.objects.create(
+            user=User.objects.create_user('other@user.com', 'other'))
+        self.authenticate()
+        self.authenticate(other)
+        with self.assertNumQueries(1):
+            self.authenticate()
+
+    @override_settings(TOKEN_CACHE_LOCAL_TTL=10)
+    def test_expired(self):
+        self.authenticate()
+        with mock.patch(
+                'bothub.authentication.authentication.time.time',
+                return_value=10 ** 10):
+            with self.assertNumQueries(1):
+                self.authenticate()
+
+    @override_settings(TOKEN_CACHE_SHARED='default')
+    def test_shared(self):
+        self.addCleanup(cache.clear)
+        self.authenticate()
+        # Another process
+        token_cache.clear()
+        with self.assertNumQueries(0):
+            user, token = self.authenticate()
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.nickname, self.user.nickname)
+        self.assertEqual(token.user_id, self.user.pk)
+        self.assertNotIn(
+            self.user.password,
+            str(cache.get(token_cache.shared_key(self.token.key))))
+        # The password is loaded if used, never saved empty
+        user.name = 'New Name'
+        user.save()
+        self.assertTrue(
+            User.objects.get(pk=self.user.pk).check_password('123456'))
+
+        key = self.token.key
+        self.token.delete()
+        token_cache.clear()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials(key)
@@ -0,0 +1 @@
+default_app_config = 'bothub.common.apps.CommonConfig'
@@ -5,6 +5,10 @@ from django.shortcuts import reverse
 from bothub.common.models import Repository
 from bothub.common.models import RepositoryUpdate
 from bothub.common.models import RepositoryCategory
+from bothub.common.models import QueuedEmail
+from bothub.common.models import RepositoryTrainingJob
+from bothub.common.models import RepositoryEvaluateJob
+from bothub.common.models import RepositoryCloneJob
 
 
 class RepositoryUpdateInline(admin.TabularInline):
@@ -67,3 +71,46 @@ class RepositoryCategoryAdmin(admin.ModelAdmin):
         '__str__',
         'icon',
     ]
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = [
+        'subject',
+        'to',
+        'status',
+        'attempts',
+        'created_at',
+        'sent_at',
+    ]
+    search_fields = [
+        'to',
+        'subject',
+    ]
+    list_filter = [
+        'status',
+        'template_name',
+    ]
+    readonly_fields = [
+        'last_error',
+    ]
+
+
+@admin.register(RepositoryTrainingJob)
+@admin.register(RepositoryEvaluateJob)
+@admin.register(RepositoryCloneJob)
+class RepositoryJobAdmin(admin.ModelAdmin):
+    list_display = [
+        'repository',
+        'language',
+        'status',
+        'by',
+        'created_at',
+        'finished_at',
+    ]
+    list_filter = [
+        'status',
+    ]
+    readonly_fields = [
+        'log',
+    ]
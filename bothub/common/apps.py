@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class CommonConfig(AppConfig):
-    name = 'common'
+    name = 'bothub.common'
+
+    def ready(self):
+        from .replicas import check_pin_cache
+        checks.register(check_pin_cache, checks.Tags.caches)
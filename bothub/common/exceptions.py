@@ -10,6 +10,10 @@ class RepositoryUpdateAlreadyTrained(BotHubException):
     pass
 
 
+class RepositoryUpdateTrainingFailed(BotHubException):
+    pass
+
+
 class TrainingNotAllowed(BotHubException):
     pass
 
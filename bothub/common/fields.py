@@ -0,0 +1,43 @@
+import hashlib
+import unicodedata
+
+from django.db import models
+
+
+def normalize_text(text):
+    """
+    Text folded for comparisons: without accents, case or repeated
+    whitespace.
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.casefold().split())
+
+
+def text_hash(text):
+    return hashlib.sha1(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class TextHashField(models.CharField):
+    """
+    text_hash of source_field, set whenever the object is saved, also by
+    bulk_create. QuerySet.update of the source field doesn't set it.
+    """
+
+    def __init__(self, *args, source_field='text', **kwargs):
+        self.source_field = source_field
+        kwargs.setdefault('max_length', 40)
+        kwargs.setdefault('default', '')
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.source_field != 'text':
+            kwargs['source_field'] = self.source_field
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = text_hash(getattr(model_instance, self.source_field))
+        setattr(model_instance, self.attname, value)
+        return value
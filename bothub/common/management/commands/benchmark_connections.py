@@ -0,0 +1,116 @@
+import time
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db import close_old_connections
+from django.db.backends.signals import connection_created
+
+
+def percentile(timings, p):
+    """
+    timings must be sorted.
+    """
+    return timings[int((len(timings) - 1) * p)]
+
+
+class Command(BaseCommand):
+    help = 'Run short requests (connect, queries, close like at the ' + \
+        'end of a request) from many threads and report throughput, ' + \
+        'latency percentiles and database connections opened.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            dest='database',
+            default='default')
+        parser.add_argument(
+            '--requests',
+            dest='requests',
+            type=int,
+            default=2000)
+        parser.add_argument(
+            '--concurrency',
+            dest='concurrency',
+            type=int,
+            default=100,
+            help='Requests running together, like greenlets of a worker')
+        parser.add_argument(
+            '--queries',
+            dest='queries',
+            type=int,
+            default=3,
+            help='Queries by request')
+        parser.add_argument(
+            '--query',
+            dest='query',
+            default='SELECT 1',
+            help='SQL of each query, like SELECT pg_sleep(0.01) to ' +
+            'simulate slow queries')
+
+    def handle(self, *args, **options):
+        alias = options.get('database')
+        lock = threading.Lock()
+        created = []
+        timings = []
+        errors = []
+
+        def count_created(sender, connection, **kwargs):
+            if connection.alias == alias:
+                with lock:
+                    created.append(connection)
+
+        def run(i):
+            start = time.perf_counter()
+            close_old_connections()
+            try:
+                with connections[alias].cursor() as cursor:
+                    for query in range(options.get('queries')):
+                        cursor.execute(options.get('query'))
+                        cursor.fetchall()
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+            finally:
+                # The end of a request
+                close_old_connections()
+            with lock:
+                timings.append(time.perf_counter() - start)
+
+        # Connected once to know the pool, when it's pooled
+        connections[alias].ensure_connection()
+        connections[alias].close()
+        pool = getattr(connections[alias], 'pool', None)
+        opened_before = pool.opened if pool else 0
+        connection_created.connect(count_created)
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(options.get('concurrency')) as executor:
+                list(executor.map(run, range(options.get('requests'))))
+        finally:
+            connection_created.disconnect(count_created)
+        duration = time.perf_counter() - start
+
+        timings.sort()
+        self.stdout.write('{} requests in {:.1f}s, {:.1f} req/s'.format(
+            len(timings),
+            duration,
+            len(timings) / duration))
+        self.stdout.write(
+            'p50 {:.1f} ms, p95 {:.1f} ms, p99 {:.1f} ms'.format(
+                percentile(timings, .5) * 1000,
+                percentile(timings, .95) * 1000,
+                percentile(timings, .99) * 1000))
+        self.stdout.write('{} errors{}'.format(
+            len(errors),
+            ', first: {}'.format(errors[0]) if errors else ''))
+        if pool:
+            self.stdout.write(
+                '{} connections opened, {} checkouts, pool size {}'.format(
+                    pool.opened - opened_before,
+                    len(created),
+                    pool.size))
+        else:
+            self.stdout.write('{} connections opened'.format(len(created)))
@@ -0,0 +1,129 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from bothub.common.models import Repository
+from bothub.common.models import RepositoryTranslatedExample
+from bothub.common.models import RepositoryEntity
+
+
+SEARCH_TERM = 'the'
+
+
+def examples_page(repository):
+    return repository.examples(
+        repository.language).order_by('-created_at')[:20]
+
+
+def examples_intents(repository):
+    return repository.examples().exclude(intent='').values_list(
+        'intent',
+        flat=True).distinct()
+
+
+def examples_search(repository):
+    # Substring search, answered by the trigram index in PostgreSQL
+    return repository.examples(repository.language).filter(
+        text__icontains=SEARCH_TERM).order_by('-created_at')[:20]
+
+
+def evaluations_page(repository):
+    return repository.evaluations(
+        repository.language).order_by('-created_at')[:20]
+
+
+def evaluations_search(repository):
+    return repository.evaluations(repository.language).filter(
+        text__icontains=SEARCH_TERM).order_by('-created_at')[:20]
+
+
+def evaluations_results(repository):
+    return repository.evaluations_results().order_by('-created_at')[:20]
+
+
+def current_update(repository):
+    return repository.updates.filter(
+        language=repository.language,
+        training_started_at=None)
+
+
+def last_trained_update(repository):
+    return repository.updates.filter(
+        language=repository.language,
+        by__isnull=False,
+        trained_at__isnull=False)[:1]
+
+
+def translations(repository):
+    return RepositoryTranslatedExample.objects.filter(
+        original_example__in=repository.examples(repository.language))
+
+
+def entity_by_value(repository):
+    return RepositoryEntity.objects.filter(
+        repository=repository,
+        value='entity')
+
+
+QUERIES = [
+    examples_page,
+    examples_intents,
+    examples_search,
+    evaluations_page,
+    evaluations_search,
+    evaluations_results,
+    current_update,
+    last_trained_update,
+    translations,
+    entity_by_value,
+]
+
+
+class Command(BaseCommand):
+    help = 'Time the hot query shapes of examples, evaluations and updates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repository',
+            dest='repository',
+            help='Repository UUID, default is the one with most updates')
+        parser.add_argument(
+            '--repeat',
+            dest='repeat',
+            type=int,
+            default=50)
+        parser.add_argument(
+            '--explain',
+            dest='explain',
+            action='store_true',
+            help='Print the query plan of each query')
+
+    def handle(self, *args, **options):
+        if options.get('repository'):
+            repository = Repository.objects.get(uuid=options['repository'])
+        else:
+            repository = Repository.objects.annotate(
+                updates_count=Count('updates')).order_by(
+                    '-updates_count').first()
+        if not repository:
+            self.stderr.write('No repository found.')
+            return
+
+        self.stdout.write('{} ({} repeats)'.format(
+            repository,
+            options.get('repeat')))
+        for query in QUERIES:
+            timings = []
+            for i in range(options.get('repeat')):
+                start = time.perf_counter()
+                list(query(repository))
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            self.stdout.write(
+                '{:<24} mean {:8.3f}ms  p95 {:8.3f}ms'.format(
+                    query.__name__,
+                    sum(timings) / len(timings) * 1000,
+                    timings[int((len(timings) - 1) * .95)] * 1000))
+            if options.get('explain'):
+                self.stdout.write(query(repository).explain())
@@ -0,0 +1,465 @@
+import time
+import uuid
+import random
+
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import reset_queries
+from django.db import transaction
+from django.utils import timezone
+
+from bothub.authentication.models import User
+from bothub.common.models import RepositoryCategory
+from bothub.common.models import Repository
+from bothub.common.models import RepositoryUpdate
+from bothub.common.models import RepositoryExample
+from bothub.common.models import RepositoryExampleEntity
+from bothub.common.models import RepositoryTranslatedExample
+from bothub.common.models import RepositoryTranslatedExampleEntity
+from bothub.common.models import RepositoryEntity
+from bothub.common.models import RepositoryEntityLabel
+from bothub.common.models import RepositoryEvaluate
+from bothub.common.models import RepositoryEvaluateEntity
+from bothub.common.models import RepositoryEvaluateResult
+from bothub.common.models import RepositoryEvaluateResultCounter
+from bothub.common.models import RepositoryEvaluateResultScore
+from bothub.common.models import RepositoryEvaluateResultIntent
+from bothub.common.models import RepositoryEvaluateResultEntity
+
+from bothub.common import languages
+
+
+WORDS = [
+    'hello', 'hi', 'hey', 'good', 'morning', 'night', 'bye', 'see', 'you',
+    'later', 'i', 'want', 'need', 'would', 'like', 'to', 'buy', 'order',
+    'cancel', 'my', 'the', 'a', 'pizza', 'ticket', 'flight', 'table',
+    'for', 'two', 'today', 'tomorrow', 'please', 'thanks', 'where', 'is',
+    'how', 'much', 'does', 'it', 'cost', 'open', 'close', 'store', 'help',
+    'me', 'with', 'account', 'password', 'card', 'refund', 'delivery',
+]
+
+
+def save(model, objs):
+    """
+    Insert objs with a single bulk_create and set their primary keys,
+    reading them back when the database doesn't return them (SQLite).
+    Only safe while nothing else writes to the same table.
+    """
+    if not objs:
+        return objs
+    model._base_manager.bulk_create(objs)
+    if objs[0].pk is None:
+        pks = model._base_manager.order_by('-pk').values_list(
+            'pk',
+            flat=True)[:len(objs)]
+        for obj, pk in zip(objs, reversed(list(pks))):
+            obj.pk = pk
+    # Keep DEBUG query logging from holding every batch in memory
+    reset_queries()
+    return objs
+
+
+class BatchWriter(object):
+    def __init__(self, model, batch_size, on_save=None):
+        self.model = model
+        self.batch_size = batch_size
+        self.on_save = on_save
+        self.objs = []
+        self.count = 0
+
+    def add(self, obj):
+        self.objs.append(obj)
+        if len(self.objs) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        objs, self.objs = self.objs, []
+        save(self.model, objs)
+        self.count += len(objs)
+        if objs and self.on_save:
+            self.on_save(objs)
+
+
+class Command(BaseCommand):
+    help = 'Generate a large deterministic dataset for load and ' + \
+        'benchmark runs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--repositories', type=int, default=10)
+        parser.add_argument(
+            '--examples',
+            type=int,
+            default=1000,
+            help='Examples per repository')
+        parser.add_argument(
+            '--intents',
+            type=int,
+            default=10,
+            help='Intents per repository')
+        parser.add_argument(
+            '--entities',
+            type=int,
+            default=10,
+            help='Entities per repository')
+        parser.add_argument(
+            '--labels',
+            type=int,
+            default=3,
+            help='Labels per repository')
+        parser.add_argument(
+            '--languages',
+            nargs='+',
+            help='Repository and translation languages, default is ' +
+                 'SUPPORTED_LANGUAGES')
+        parser.add_argument(
+            '--translation-ratio',
+            dest='translation_ratio',
+            type=float,
+            default=.5,
+            help='Share of the examples translated to another language')
+        parser.add_argument(
+            '--evaluations',
+            type=int,
+            default=100,
+            help='Evaluate sentences per repository')
+        parser.add_argument(
+            '--trained-updates',
+            dest='trained_updates',
+            type=int,
+            default=2,
+            help='Trained (and evaluated) updates per repository')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            type=int,
+            default=1000)
+        parser.add_argument(
+            '--force',
+            dest='force',
+            action='store_true',
+            help='Run with DEBUG off, like in a benchmark database')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options.get('force'):
+            raise CommandError(
+                'DEBUG is off, use --force to add fake data to the {} '
+                'database'.format(settings.DATABASES['default']['NAME']))
+
+        self.options = options
+        self.random = random.Random(options.get('seed'))
+        self.languages = options.get('languages') or \
+            list(settings.SUPPORTED_LANGUAGES.keys())
+        for language in self.languages:
+            if not languages.is_valid_language(language):
+                raise CommandError(
+                    '{} is not a supported language.'.format(language))
+        if options.get('intents') < 1:
+            raise CommandError('At least one intent is required.')
+
+        self.counts = {}
+        start = time.perf_counter()
+        with transaction.atomic():
+            self.create_users()
+            self.create_repositories()
+            self.create_updates()
+            self.create_entities()
+            self.create_examples()
+            self.create_evaluations()
+            self.create_results()
+
+        for model, count in self.counts.items():
+            self.stdout.write('{:<36} {:>10}'.format(
+                model.__name__,
+                count))
+        self.stdout.write('{} rows in {:.1f}s'.format(
+            sum(self.counts.values()),
+            time.perf_counter() - start))
+
+    def writer(self, model, on_save=None):
+        return BatchWriter(model, self.options.get('batch_size'), on_save)
+
+    def finish(self, *writers):
+        for writer in writers:
+            writer.flush()
+            self.counts[writer.model] = self.counts.get(writer.model, 0) + \
+                writer.count
+
+    def sentence(self, entities):
+        words = [
+            self.random.choice(WORDS)
+            for i in range(self.random.randint(2, 8))]
+        if not entities or self.random.random() < .5:
+            return ' '.join(words), None
+        position = self.random.randrange(len(words))
+        start = len(' '.join(words[:position] + ['']))
+        return ' '.join(words), (
+            start,
+            start + len(words[position]),
+            self.random.choice(entities))
+
+    def score(self):
+        return RepositoryEvaluateResultScore(
+            precision=Decimal(self.random.randint(50, 100)) / 100,
+            f1_score=Decimal(self.random.randint(50, 100)) / 100,
+            accuracy=Decimal(self.random.randint(50, 100)) / 100,
+            recall=Decimal(self.random.randint(50, 100)) / 100,
+            support=self.random.randint(1, 100))
+
+    def create_users(self):
+        password = make_password('fake')
+        self.users = []
+        users = self.writer(User, self.users.extend)
+        for i in range(self.options.get('users')):
+            users.add(User(
+                email='fake{}_{}@bothub.it'.format(self.options['seed'], i),
+                nickname='fake{}_{}'.format(self.options['seed'], i),
+                name='Fake User {}'.format(i),
+                password=password))
+        self.finish(users)
+
+    def create_repositories(self):
+        categories = list(RepositoryCategory.objects.all())
+        if not categories:
+            categories = save(RepositoryCategory, [
+                RepositoryCategory(name='Category {}'.format(i))
+                for i in range(1, 6)])
+        self.repositories = []
+        through = Repository.categories.through
+        categories_through = self.writer(through)
+
+        def add_categories(repositories):
+            self.repositories.extend(repositories)
+            for repository in repositories:
+                for category in self.random.sample(
+                        categories,
+                        self.random.randint(1, len(categories))):
+                    categories_through.add(through(
+                        repository_id=repository.pk,
+                        repositorycategory_id=category.pk))
+
+        repositories = self.writer(Repository, add_categories)
+        for i in range(self.options.get('repositories')):
+            repositories.add(Repository(
+                uuid=uuid.UUID(int=self.random.getrandbits(128), version=4),
+                owner=self.random.choice(self.users),
+                name='Fake Repository {}'.format(i),
+                slug='fake-{}'.format(i),
+                language=self.random.choice(self.languages),
+                is_private=self.random.random() < .1))
+        self.finish(repositories, categories_through)
+
+    def create_updates(self):
+        now = timezone.now()
+        self.trained_updates = []
+        self.open_updates = {}
+        self.example_updates = {}
+        updates = self.writer(RepositoryUpdate)
+        for repository in self.repositories:
+            trained = []
+            for i in range(self.options.get('trained_updates')):
+                update = RepositoryUpdate(
+                    repository=repository,
+                    language=repository.language,
+                    by=repository.owner,
+                    training_started_at=now,
+                    trained_at=now)
+                trained.append(update)
+                updates.add(update)
+            for language in self.languages:
+                update = RepositoryUpdate(
+                    repository=repository,
+                    language=language)
+                self.open_updates[(repository, language)] = update
+                updates.add(update)
+            self.trained_updates.extend(trained)
+            self.example_updates[repository] = trained + [
+                self.open_updates[(repository, repository.language)]]
+        self.finish(updates)
+
+    def create_entities(self):
+        repositories_labels = {}
+        labels = self.writer(RepositoryEntityLabel)
+        for repository in self.repositories:
+            repositories_labels[repository] = [
+                RepositoryEntityLabel(
+                    repository=repository,
+                    value='label_{}'.format(i))
+                for i in range(self.options.get('labels'))]
+            for label in repositories_labels[repository]:
+                labels.add(label)
+        self.finish(labels)
+
+        self.entities = {}
+        entities = self.writer(RepositoryEntity)
+        for repository in self.repositories:
+            self.entities[repository] = []
+            for i in range(self.options.get('entities')):
+                entity = RepositoryEntity(
+                    repository=repository,
+                    value='entity_{}'.format(i))
+                if repositories_labels[repository] and \
+                   self.random.random() < .5:
+                    entity.label = self.random.choice(
+                        repositories_labels[repository])
+                self.entities[repository].append(entity)
+                entities.add(entity)
+        self.finish(entities)
+
+    def create_examples(self):
+        translation_ratio = self.options.get('translation_ratio')
+        examples_entities = self.writer(RepositoryExampleEntity)
+        translations_entities = self.writer(RepositoryTranslatedExampleEntity)
+
+        def add_translations_entities(translations):
+            for translation in translations:
+                if translation.fake_entity:
+                    start, end, entity = translation.fake_entity
+                    translations_entities.add(
+                        RepositoryTranslatedExampleEntity(
+                            repository_translated_example=translation,
+                            start=start,
+                            end=end,
+                            entity=entity))
+
+        translations = self.writer(
+            RepositoryTranslatedExample,
+            add_translations_entities)
+
+        def add_examples_relations(examples):
+            for example in examples:
+                repository = example.fake_repository
+                if example.fake_entity:
+                    start, end, entity = example.fake_entity
+                    examples_entities.add(RepositoryExampleEntity(
+                        repository_example=example,
+                        start=start,
+                        end=end,
+                        entity=entity))
+                other_languages = [
+                    language
+                    for language in self.languages
+                    if language != repository.language]
+                if other_languages and \
+                   self.random.random() < translation_ratio:
+                    language = self.random.choice(other_languages)
+                    translation = RepositoryTranslatedExample(
+                        repository_update=self.open_updates[
+                            (repository, language)],
+                        original_example=example,
+                        language=language,
+                        text=example.text)
+                    translation.fake_entity = example.fake_entity
+                    translations.add(translation)
+
+        examples = self.writer(RepositoryExample, add_examples_relations)
+        intents = self.options.get('intents')
+        for repository in self.repositories:
+            for i in range(self.options.get('examples')):
+                text, entity = self.sentence(self.entities[repository])
+                example = RepositoryExample(
+                    repository_update=self.random.choice(
+                        self.example_updates[repository]),
+                    text=text,
+                    intent='intent_{}'.format(self.random.randrange(intents)))
+                example.fake_repository = repository
+                example.fake_entity = entity
+                examples.add(example)
+        self.finish(
+            examples,
+            examples_entities,
+            translations,
+            translations_entities)
+
+    def create_evaluations(self):
+        evaluations_entities = self.writer(RepositoryEvaluateEntity)
+
+        def add_evaluations_entities(evaluations):
+            for evaluation in evaluations:
+                if evaluation.fake_entity:
+                    start, end, entity = evaluation.fake_entity
+                    evaluations_entities.add(RepositoryEvaluateEntity(
+                        repository_evaluate=evaluation,
+                        start=start,
+                        end=end,
+                        entity=entity))
+
+        evaluations = self.writer(
+            RepositoryEvaluate,
+            add_evaluations_entities)
+        intents = self.options.get('intents')
+        for repository in self.repositories:
+            for i in range(self.options.get('evaluations')):
+                text, entity = self.sentence(self.entities[repository])
+                evaluation = RepositoryEvaluate(
+                    repository_update=self.open_updates[
+                        (repository, repository.language)],
+                    text=text,
+                    intent='intent_{}'.format(self.random.randrange(intents)))
+                evaluation.fake_entity = entity
+                evaluations.add(evaluation)
+        self.finish(evaluations, evaluations_entities)
+
+    def create_results(self):
+        results_intents = self.writer(RepositoryEvaluateResultIntent)
+        results_entities = self.writer(RepositoryEvaluateResultEntity)
+
+        def add_results_relations(results):
+            for result in results:
+                for intent, score in result.fake_intents:
+                    results_intents.add(RepositoryEvaluateResultIntent(
+                        evaluate_result=result,
+                        intent=intent,
+                        score=score))
+                for entity, score in result.fake_entities:
+                    results_entities.add(RepositoryEvaluateResultEntity(
+                        evaluate_result=result,
+                        entity=entity,
+                        score=score))
+
+        results = self.writer(RepositoryEvaluateResult, add_results_relations)
+        pending = []
+
+        def add_results(scores):
+            # A result is only built once all of its scores are saved
+            for update, version, intents, entities in pending:
+                result = RepositoryEvaluateResult(
+                    repository=update.repository,
+                    repository_update=update,
+                    intent_results=intents.pop(0)[1],
+                    entity_results=entities.pop(0)[1],
+                    matrix_chart='https://bothub.it/matrix.png',
+                    confidence_chart='https://bothub.it/confidence.png',
+                    version=version)
+                result.fake_intents = intents
+                result.fake_entities = entities
+                results.add(result)
+            pending.clear()
+
+        scores = self.writer(RepositoryEvaluateResultScore, add_results)
+        versions = {}
+        for update in self.trained_updates:
+            repository = update.repository
+            versions[repository] = versions.get(repository, 0) + 1
+            # The first score of each list is the overall one
+            intents = [(None, self.score())] + [
+                ('intent_{}'.format(i), self.score())
+                for i in range(self.options.get('intents'))]
+            entities = [(None, self.score())] + [
+                (entity, self.score())
+                for entity in self.entities[repository]]
+            pending.append((update, versions[repository], intents, entities))
+            # Add the scores of a result to the same batch
+            scores.objs.extend([score for name, score in intents + entities])
+            if len(scores.objs) >= scores.batch_size:
+                scores.flush()
+        self.finish(scores, results, results_intents, results_entities)
+        for repository, version in versions.items():
+            RepositoryEvaluateResultCounter.objects.update_or_create(
+                repository=repository,
+                defaults={'last_version': version})
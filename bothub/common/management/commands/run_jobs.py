@@ -0,0 +1,178 @@
+import time
+import logging
+
+import requests
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from bothub.common.models import Repository
+from bothub.common.models import RepositoryTrainingJob
+from bothub.common.models import RepositoryEvaluateJob
+from bothub.common.models import RepositoryCloneJob
+
+
+logger = logging.getLogger('bothub.common.jobs')
+
+
+def log_failure(kind, repository, error):
+    if isinstance(error, requests.RequestException):
+        logger.warning('{} of {} failed: {}'.format(kind, repository, error))
+    else:
+        logger.exception('{} of {} failed'.format(kind, repository))
+
+
+def finish(kind, job, success, log=''):
+    """
+    Finish a job, unless its lease expired meanwhile: then it was failed
+    and maybe replaced by a new job, that this worker must not overwrite.
+    """
+    if not job.finish(success, log):
+        logger.warning('{} of {} finished after its lease expired'.format(
+            kind,
+            job.repository))
+
+
+def run_training_job():
+    """
+    Run the oldest queued training and return its jobs, None when there
+    is nothing queued. NLP train/ trains every language of the repository
+    ready for train, so all queued jobs of the repository run together.
+    """
+    with transaction.atomic():
+        job = RepositoryTrainingJob.objects.next_queued()
+        if not job:
+            return None
+        jobs = list(RepositoryTrainingJob.objects.select_for_update(
+            skip_locked=True).filter(
+                repository=job.repository,
+                status=RepositoryTrainingJob.STATUS_QUEUED))
+        for job in jobs:
+            job.start()
+
+    user_authorization = job.repository.get_user_authorization(job.by)
+    try:
+        response = Repository.request_nlp_train(user_authorization)
+    except Exception as e:
+        # Any error fails the jobs, a running job blocks new trainings
+        log_failure('training', job.repository, e)
+        for job in jobs:
+            finish('training', job, False, str(e))
+        return jobs
+
+    for job in jobs:
+        update = job.repository_update
+        update.refresh_from_db()
+        if response.status_code != 200:
+            finish('training', job, False, 'NLP status code {}: {}'.format(
+                response.status_code,
+                response.text))
+        elif update.trained_at:
+            finish('training', job, True, response.text)
+        elif update.failed_at:
+            finish(
+                'training',
+                job,
+                False,
+                update.training_log or response.text)
+        else:
+            finish('training', job, False, 'Update not trained: {}'.format(
+                response.text))
+    return jobs
+
+
+def run_evaluate_job():
+    """
+    Run the oldest queued evaluation, NLP evaluate/ saves the results
+    with the evaluate results report endpoint before answering.
+    """
+    with transaction.atomic():
+        job = RepositoryEvaluateJob.objects.next_queued()
+        if not job:
+            return None
+        job.start()
+
+    user_authorization = job.repository.get_user_authorization(job.by)
+    try:
+        response = Repository.request_nlp_evaluate(
+            user_authorization,
+            {'language': job.language})
+    except Exception as e:
+        # Any error fails the job, a running job blocks new evaluations
+        log_failure('evaluation', job.repository, e)
+        finish('evaluation', job, False, str(e))
+        return [job]
+
+    if response.status_code != 200:
+        finish('evaluation', job, False, 'NLP status code {}: {}'.format(
+            response.status_code,
+            response.text))
+        return [job]
+
+    # The evaluate results report linked its result to the running job
+    job.refresh_from_db(fields=['evaluate_result'])
+    finish('evaluation', job, True, response.text)
+    return [job]
+
+
+def run_clone_job():
+    """
+    Run the oldest queued clone, copying the dataset in the database.
+    """
+    with transaction.atomic():
+        job = RepositoryCloneJob.objects.next_queued()
+        if not job:
+            return None
+        job.start()
+
+    if not job.run():
+        logger.warning('clone of {} finished after its lease expired'.format(
+            job.repository))
+    elif job.status == RepositoryCloneJob.STATUS_FAILED:
+        logger.warning('clone of {} failed: {}'.format(
+            job.repository,
+            job.log))
+    return [job]
+
+
+JOBS = [
+    run_training_job,
+    run_evaluate_job,
+    run_clone_job,
+]
+
+
+class Command(BaseCommand):
+    help = 'Run the queued repository jobs (trainings, evaluations, clones).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            dest='loop',
+            action='store_true',
+            help='Keep running, waiting for new jobs')
+        parser.add_argument(
+            '--interval',
+            dest='interval',
+            type=float,
+            default=2,
+            help='Seconds to wait when there are no jobs, with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            ran = False
+            for run_job in JOBS:
+                jobs = run_job()
+                if jobs:
+                    ran = True
+                    for job in jobs:
+                        self.stdout.write('{} {} {}: {}'.format(
+                            type(job).__name__,
+                            job.pk,
+                            job.repository,
+                            job.get_status_display()))
+            if ran:
+                continue
+            if not options.get('loop'):
+                break
+            time.sleep(options.get('interval'))
@@ -0,0 +1,131 @@
+import time
+import logging
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from bothub.common.models import QueuedEmail
+from bothub.health.metrics import email_sent
+
+
+logger = logging.getLogger('bothub.common.emails')
+
+
+def claim_batch(batch_size, max_attempts):
+    """
+    Mark the next pending emails (and the sending ones with an expired
+    lease) as sending and commit, so the rows aren't locked while the
+    emails are sent. Locked rows are skipped, so many workers can run
+    together (in databases with SELECT ... FOR UPDATE SKIP LOCKED).
+    Claiming counts an attempt, an email that kills its worker fails
+    after max_attempts leases.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # send_after of a sending email is the end of its lease
+        QueuedEmail.objects.filter(
+            status=QueuedEmail.STATUS_SENDING,
+            send_after__lte=now,
+            attempts__gte=max_attempts).update(
+                status=QueuedEmail.STATUS_FAILED,
+                last_error=_('Sending lease expired.'))
+        emails = list(QueuedEmail.objects.select_for_update(
+            skip_locked=True).filter(
+                status__in=[
+                    QueuedEmail.STATUS_PENDING,
+                    QueuedEmail.STATUS_SENDING,
+                ],
+                send_after__lte=now).order_by(
+                    'send_after')[:batch_size])
+        QueuedEmail.objects.filter(pk__in=[e.pk for e in emails]).update(
+            status=QueuedEmail.STATUS_SENDING,
+            send_after=now + QueuedEmail.SENDING_LEASE,
+            attempts=F('attempts') + 1)
+    for email in emails:
+        email.status = QueuedEmail.STATUS_SENDING
+        email.send_after = now + QueuedEmail.SENDING_LEASE
+        email.attempts += 1
+    return emails
+
+
+def send_batch(batch_size=50, max_attempts=5):
+    """
+    Send the next pending emails over one SMTP connection, return how
+    many were processed. Each email is saved as soon as it's sent, a
+    crash only sends again the email being sent.
+    """
+    emails = claim_batch(batch_size, max_attempts)
+    if not emails:
+        return 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning('SMTP connection failed: {}'.format(e))
+        for email in emails:
+            email.failed(e, max_attempts)
+            email.save()
+        return len(emails)
+
+    try:
+        for email in emails:
+            start = time.perf_counter()
+            try:
+                email.render(connection=connection).send()
+            except Exception as e:
+                logger.warning('email {} failed: {}'.format(email.pk, e))
+                email.failed(e, max_attempts)
+                result = 'error'
+            else:
+                email.sent()
+                result = 'sent'
+            email_sent(email.kind, time.perf_counter() - start, result)
+            email.save()
+    finally:
+        connection.close()
+    return len(emails)
+
+
+class Command(BaseCommand):
+    help = 'Render and send the queued emails in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            type=int,
+            default=50)
+        parser.add_argument(
+            '--max-attempts',
+            dest='max_attempts',
+            type=int,
+            default=5,
+            help='Attempts before an email is marked as failed')
+        parser.add_argument(
+            '--loop',
+            dest='loop',
+            action='store_true',
+            help='Keep running, waiting for new emails')
+        parser.add_argument(
+            '--interval',
+            dest='interval',
+            type=float,
+            default=5,
+            help='Seconds to wait when there are no emails, with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = send_batch(
+                batch_size=options.get('batch_size'),
+                max_attempts=options.get('max_attempts'))
+            if processed:
+                self.stdout.write('{} emails processed'.format(processed))
+                continue
+            if not options.get('loop'):
+                break
+            time.sleep(options.get('interval'))
@@ -0,0 +1,21 @@
+# Generated by Django 2.1.5 on 2026-10-18 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0031_auto_20190502_1732'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='repositoryevaluateresult',
+            index=models.Index(fields=['repository_update', '-created_at'], name='common_result_update_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repositoryupdate',
+            index=models.Index(fields=['repository', 'language', '-created_at'], name='common_update_repo_lang_idx'),
+        ),
+    ]
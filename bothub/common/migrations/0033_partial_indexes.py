@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0032_indexes'),
+    ]
+
+    # Partial indexes (PostgreSQL and SQLite syntax), they only hold the
+    # active (not deleted) rows that the listings and training read.
+    operations = [
+        migrations.RunSQL(
+            [
+                'CREATE INDEX common_example_active_idx '
+                'ON common_repositoryexample '
+                '(repository_update_id, created_at DESC) '
+                'WHERE deleted_in_id IS NULL',
+            ],
+            ['DROP INDEX common_example_active_idx']),
+        migrations.RunSQL(
+            [
+                'CREATE INDEX common_example_active_intent_idx '
+                'ON common_repositoryexample '
+                '(repository_update_id, intent) '
+                'WHERE deleted_in_id IS NULL',
+            ],
+            ['DROP INDEX common_example_active_intent_idx']),
+        migrations.RunSQL(
+            [
+                'CREATE INDEX common_evaluate_active_idx '
+                'ON common_repository_evaluate '
+                '(repository_update_id, created_at DESC) '
+                'WHERE deleted_in_id IS NULL',
+            ],
+            ['DROP INDEX common_evaluate_active_idx']),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 2.1.5 on 2026-10-19 00:21
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0033_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='subject')),
+                ('template_name', models.CharField(help_text='Template path without extension, rendered as .txt and .html', max_length=255, verbose_name='template name')),
+                ('context', models.TextField(help_text='Template context as JSON', verbose_name='context')),
+                ('language', models.CharField(max_length=16, verbose_name='language')),
+                ('to', models.EmailField(max_length=254, verbose_name='to')),
+                ('status', models.PositiveIntegerField(choices=[(0, 'pending'), (1, 'sent'), (2, 'failed')], default=0, verbose_name='status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='attempts')),
+                ('last_error', models.TextField(blank=True, verbose_name='last error')),
+                ('send_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='send after')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='sent at')),
+            ],
+            options={
+                'verbose_name': 'queued email',
+                'verbose_name_plural': 'queued emails',
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='queuedemail',
+            index=models.Index(fields=['status', 'send_after'], name='common_email_status_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.1.5 on 2026-10-19 00:24
+
+import bothub.common.languages
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('common', '0034_queued_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepositoryTrainingJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(editable=False, max_length=5, validators=[bothub.common.languages.validate_language], verbose_name='language')),
+                ('status', models.PositiveIntegerField(choices=[(0, 'queued'), (1, 'running'), (2, 'success'), (3, 'failed')], default=0, editable=False, verbose_name='status')),
+                ('log', models.TextField(blank=True, editable=False, verbose_name='log')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('started_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='started at')),
+                ('finished_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='finished at')),
+                ('by', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('repository', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='common.Repository')),
+                ('repository_update', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='training_jobs', to='common.RepositoryUpdate')),
+            ],
+            options={
+                'verbose_name': 'repository training job',
+                'verbose_name_plural': 'repository training jobs',
+                'db_table': 'common_repository_training_job',
+                'ordering': ['-created_at'],
+                'abstract': False,
+            },
+        ),
+        # At most one queued or running training by repository language
+        migrations.RunSQL(
+            [
+                'CREATE UNIQUE INDEX common_training_job_active_uniq '
+                'ON common_repository_training_job '
+                '(repository_id, language) '
+                'WHERE status IN (0, 1)',
+            ],
+            ['DROP INDEX common_training_job_active_uniq']),
+    ]
@@ -0,0 +1,77 @@
+from django.db import migrations, models
+from django.db.models import Max
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def set_versions(apps, schema_editor):
+    Repository = apps.get_model('common', 'Repository')
+    RepositoryUpdate = apps.get_model('common', 'RepositoryUpdate')
+    RepositoryEvaluateResult = apps.get_model(
+        'common',
+        'RepositoryEvaluateResult')
+
+    RepositoryEvaluateResult.objects.update(repository=Subquery(
+        RepositoryUpdate.objects.filter(
+            pk=OuterRef('repository_update')).values('repository')[:1]))
+
+    # Results saved at the same time got the same version, the repeated
+    # ones get new versions after the last of the repository
+    last_version = {}
+    repeated = []
+    seen = set()
+    results = RepositoryEvaluateResult.objects.order_by(
+        'repository',
+        'created_at',
+        'pk').values_list('pk', 'repository', 'version')
+    for pk, repository, version in results.iterator():
+        last_version[repository] = max(
+            last_version.get(repository, 0),
+            version)
+        if (repository, version) in seen:
+            repeated.append((pk, repository))
+        seen.add((repository, version))
+    for pk, repository in repeated:
+        last_version[repository] += 1
+        RepositoryEvaluateResult.objects.filter(pk=pk).update(
+            version=last_version[repository])
+
+    Repository.objects.update(evaluate_result_version=Coalesce(
+        Subquery(
+            RepositoryEvaluateResult.objects.filter(
+                repository=OuterRef('pk')).order_by().values(
+                    'repository').annotate(
+                        last=Max('version')).values('last')[:1]),
+        0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0036_evaluate_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='repository',
+            name='evaluate_result_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='last evaluate result version'),
+        ),
+        migrations.AddField(
+            model_name='repositoryevaluateresult',
+            name='repository',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='evaluate_results', to='common.Repository'),
+        ),
+        migrations.RunPython(set_versions, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='repositoryevaluateresult',
+            name='repository',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='evaluate_results', to='common.Repository'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='repositoryevaluateresult',
+            unique_together={('repository', 'version')},
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def merge_open_updates(apps, schema_editor):
+    RepositoryUpdate = apps.get_model('common', 'RepositoryUpdate')
+    open_updates = RepositoryUpdate.objects.filter(
+        training_started_at__isnull=True)
+    repeated = open_updates.order_by().values(
+        'repository',
+        'language').annotate(
+            total=Count('pk')).filter(total__gt=1)
+    relations = [
+        rel for rel in RepositoryUpdate._meta.related_objects
+        if rel.one_to_many
+    ]
+    # The oldest open update keeps the rows of the repeated ones
+    for group in repeated:
+        updates = list(open_updates.filter(
+            repository=group.get('repository'),
+            language=group.get('language')).order_by('created_at', 'pk'))
+        keep, others = updates[0], updates[1:]
+        for rel in relations:
+            rel.related_model.objects.filter(**{
+                '{}__in'.format(rel.field.name): others,
+            }).update(**{rel.field.name: keep})
+        RepositoryUpdate.objects.filter(
+            pk__in=[update.pk for update in others]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0037_evaluate_result_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_open_updates, migrations.RunPython.noop),
+        # At most one open (not training) update by repository language
+        migrations.RunSQL(
+            [
+                'CREATE UNIQUE INDEX common_update_open_uniq '
+                'ON common_repositoryupdate '
+                '(repository_id, language) '
+                'WHERE training_started_at IS NULL',
+            ],
+            ['DROP INDEX common_update_open_uniq']),
+    ]
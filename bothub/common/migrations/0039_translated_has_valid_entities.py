@@ -0,0 +1,65 @@
+from django.db import migrations, models
+
+
+def entities_values(queryset, example_field):
+    entities = {}
+    for example_id, value in queryset.values_list(
+            example_field,
+            'entity__value'):
+        entities.setdefault(example_id, []).append(value)
+    return entities
+
+
+def set_has_valid_entities(apps, schema_editor):
+    RepositoryTranslatedExample = apps.get_model(
+        'common',
+        'RepositoryTranslatedExample')
+    RepositoryExampleEntity = apps.get_model(
+        'common',
+        'RepositoryExampleEntity')
+    RepositoryTranslatedExampleEntity = apps.get_model(
+        'common',
+        'RepositoryTranslatedExampleEntity')
+
+    translations = list(RepositoryTranslatedExample.objects.values_list(
+        'pk',
+        'original_example_id'))
+    batch_size = 1000
+    for i in range(0, len(translations), batch_size):
+        batch = translations[i:i + batch_size]
+        original_entities = entities_values(
+            RepositoryExampleEntity.objects.filter(
+                repository_example_id__in=set(map(lambda t: t[1], batch))),
+            'repository_example_id')
+        translated_entities = entities_values(
+            RepositoryTranslatedExampleEntity.objects.filter(
+                repository_translated_example_id__in=list(map(
+                    lambda t: t[0],
+                    batch))),
+            'repository_translated_example_id')
+        # Same as RepositoryTranslatedExample.same_entities_validator
+        invalid = [
+            pk
+            for pk, original_example_id in batch
+            if sorted(original_entities.get(original_example_id, [])) !=
+            sorted(translated_entities.get(pk, []))]
+        RepositoryTranslatedExample.objects.filter(pk__in=invalid).update(
+            has_valid_entities=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0038_open_update_uniq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='repositorytranslatedexample',
+            name='has_valid_entities',
+            field=models.BooleanField(db_index=True, default=True, editable=False, help_text='Translation has the entities of the original example, updated when the entities change', verbose_name='has valid entities'),
+        ),
+        migrations.RunPython(
+            set_has_valid_entities,
+            migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.1.5 on 2026-10-19 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0039_translated_has_valid_entities'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='repository',
+            name='changed_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='changed at'),
+        ),
+    ]
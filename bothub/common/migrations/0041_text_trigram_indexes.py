@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from bothub.db.trigram import CreateTrigramIndexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0040_repository_changed_at'),
+    ]
+
+    operations = [
+        CreateTrigramIndexes([
+            ('common_example_text_trgm_idx', 'common_repositoryexample',
+             'text'),
+            ('common_evaluate_text_trgm_idx', 'common_repository_evaluate',
+             'text'),
+        ]),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from bothub.db.trigram import CreateTrigramIndexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0041_text_trigram_indexes'),
+    ]
+
+    operations = [
+        CreateTrigramIndexes([
+            ('common_repository_name_trgm_idx', 'common_repository',
+             'name'),
+            ('common_repository_description_trgm_idx', 'common_repository',
+             'description'),
+        ]),
+    ]
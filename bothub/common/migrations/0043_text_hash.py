@@ -0,0 +1,80 @@
+# Generated by Django 2.1.5 on 2026-10-19 01:57
+
+import bothub.common.fields
+from django.db import migrations, models
+
+
+def set_text_hashes(apps, schema_editor):
+    for model_name in [
+            'RepositoryExample',
+            'RepositoryTranslatedExample',
+            'RepositoryEvaluate']:
+        model = apps.get_model('common', model_name)
+        rows = list(model.objects.values_list('pk', 'text'))
+        batch_size = 1000
+        for i in range(0, len(rows), batch_size):
+            pks_by_hash = {}
+            for pk, text in rows[i:i + batch_size]:
+                pks_by_hash.setdefault(
+                    bothub.common.fields.text_hash(text),
+                    []).append(pk)
+            for text_hash, pks in pks_by_hash.items():
+                model.objects.filter(pk__in=pks).update(text_hash=text_hash)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0042_repository_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='repositoryevaluate',
+            name='text_hash',
+            field=bothub.common.fields.TextHashField(default='', editable=False, help_text='Hash of the text without accents, case or repeated whitespace, finds the duplicated evaluate tests', max_length=40, verbose_name='text hash'),
+        ),
+        migrations.AddField(
+            model_name='repositoryexample',
+            name='text_hash',
+            field=bothub.common.fields.TextHashField(default='', editable=False, help_text='Hash of the text without accents, case or repeated whitespace, finds the duplicated examples', max_length=40, verbose_name='text hash'),
+        ),
+        migrations.AddField(
+            model_name='repositorytranslatedexample',
+            name='text_hash',
+            field=bothub.common.fields.TextHashField(default='', editable=False, help_text='Hash of the text without accents, case or repeated whitespace, finds the duplicated translations', max_length=40, verbose_name='text hash'),
+        ),
+        migrations.RunPython(
+            set_text_hashes,
+            migrations.RunPython.noop),
+        # SQLite rebuilds the tables to add the columns, without the partial
+        # indexes of 0033_partial_indexes (no-op in PostgreSQL)
+        migrations.RunSQL(
+            [
+                'CREATE INDEX IF NOT EXISTS common_example_active_idx '
+                'ON common_repositoryexample '
+                '(repository_update_id, created_at DESC) '
+                'WHERE deleted_in_id IS NULL',
+                'CREATE INDEX IF NOT EXISTS common_example_active_intent_idx '
+                'ON common_repositoryexample '
+                '(repository_update_id, intent) '
+                'WHERE deleted_in_id IS NULL',
+                'CREATE INDEX IF NOT EXISTS common_evaluate_active_idx '
+                'ON common_repository_evaluate '
+                '(repository_update_id, created_at DESC) '
+                'WHERE deleted_in_id IS NULL',
+            ],
+            migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='repositoryevaluate',
+            index=models.Index(fields=['text_hash', 'repository_update'], name='common_evaluate_text_hash_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repositoryexample',
+            index=models.Index(fields=['text_hash', 'repository_update'], name='common_example_text_hash_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repositorytranslatedexample',
+            index=models.Index(fields=['text_hash', 'repository_update'], name='common_translated_hash_idx'),
+        ),
+    ]
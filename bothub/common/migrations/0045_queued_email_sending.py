@@ -0,0 +1,18 @@
+# Generated by Django 2.1.5 on 2026-10-19 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0044_repository_clone_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='queuedemail',
+            name='status',
+            field=models.PositiveIntegerField(choices=[(0, 'pending'), (1, 'sent'), (2, 'failed'), (3, 'sending')], default=0, verbose_name='status'),
+        ),
+    ]
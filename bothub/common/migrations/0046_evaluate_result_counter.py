@@ -0,0 +1,57 @@
+# Generated by Django 2.1.5 on 2026-10-19 02:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_counters(apps, schema_editor):
+    Repository = apps.get_model('common', 'Repository')
+    RepositoryEvaluateResultCounter = apps.get_model(
+        'common',
+        'RepositoryEvaluateResultCounter')
+    RepositoryEvaluateResultCounter.objects.bulk_create([
+        RepositoryEvaluateResultCounter(
+            repository_id=pk,
+            last_version=version)
+        for pk, version in Repository.objects.filter(
+            evaluate_result_version__gt=0).values_list(
+                'pk',
+                'evaluate_result_version').iterator()
+    ], batch_size=1000)
+
+
+def restore_counters(apps, schema_editor):
+    Repository = apps.get_model('common', 'Repository')
+    RepositoryEvaluateResultCounter = apps.get_model(
+        'common',
+        'RepositoryEvaluateResultCounter')
+    for pk, version in RepositoryEvaluateResultCounter.objects.values_list(
+            'repository',
+            'last_version').iterator():
+        Repository.objects.filter(pk=pk).update(
+            evaluate_result_version=version)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0045_queued_email_sending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepositoryEvaluateResultCounter',
+            fields=[
+                ('repository', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='evaluate_result_counter', serialize=False, to='common.Repository')),
+                ('last_version', models.PositiveIntegerField(default=0, verbose_name='last evaluate result version')),
+            ],
+            options={
+                'db_table': 'common_repository_evaluate_result_counter',
+            },
+        ),
+        migrations.RunPython(copy_counters, restore_counters),
+        migrations.RemoveField(
+            model_name='repository',
+            name='evaluate_result_version',
+        ),
+    ]
@@ -1,23 +1,41 @@
+import abc
+import json
 import uuid
 import base64
+import hashlib
 import requests
+import threading
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import timedelta
 
 from functools import reduce
 from django.db import models
+from django.db import transaction
+from django.db import connections
+from django.db import router
+from django.db import IntegrityError
 from django.utils.translation import gettext as _
+from django.utils.translation import get_language
+from django.utils import translation
 from django.utils import timezone
 from django.conf import settings
 from django.core.validators import RegexValidator, _lazy_re_compile
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 
 from bothub.authentication.models import User
+from bothub.health.timing import timed
+from bothub.health.metrics import nlp_request
 
 from . import languages
+from .fields import TextHashField
 from .exceptions import RepositoryUpdateAlreadyStartedTraining
 from .exceptions import RepositoryUpdateAlreadyTrained
+from .exceptions import RepositoryUpdateTrainingFailed
 from .exceptions import TrainingNotAllowed
 from .exceptions import DoesNotHaveTranslation
 
@@ -53,6 +71,23 @@ class RepositoryCategory(models.Model):
         return self.name  # pragma: no cover
 
 
+def duplicate_groups(queryset):
+    """
+    The objects of queryset with a text_hash repeated, one list of
+    {'id', 'text'} by text_hash, in two queries.
+    """
+    counts = dict(queryset.order_by().values_list('text_hash').annotate(
+        count=models.Count('pk')).filter(count__gt=1))
+    groups = {}
+    for pk, text, hash in queryset.filter(
+            text_hash__in=list(counts)).order_by('created_at').values_list(
+                'pk', 'text', 'text_hash'):
+        groups.setdefault(hash, []).append({'id': pk, 'text': text})
+    return sorted(
+        groups.values(),
+        key=lambda group: (-len(group), group[0]['id']))
+
+
 class RepositoryQuerySet(models.QuerySet):
     def publics(self):
         return self.filter(is_private=False)
@@ -174,6 +209,10 @@ class Repository(models.Model):
     created_at = models.DateTimeField(
         _('created at'),
         auto_now_add=True)
+    # Also set when anything in the repository changes, RepositoryChange
+    changed_at = models.DateTimeField(
+        _('changed at'),
+        auto_now=True)
 
     objects = RepositoryManager()
 
@@ -182,6 +221,8 @@ class Repository(models.Model):
     nlp_evaluate_url = '{}evaluate/'.format(settings.BOTHUB_NLP_BASE_URL)
 
     @classmethod
+    @timed('nlp')
+    @nlp_request('train')
     def request_nlp_train(cls, user_authorization):
         r = requests.post(  # pragma: no cover
             cls.nlp_train_url,
@@ -191,6 +232,8 @@ class Repository(models.Model):
         return r  # pragma: no cover
 
     @classmethod
+    @timed('nlp')
+    @nlp_request('parse')
     def request_nlp_analyze(cls, user_authorization, data):
         r = requests.post(  # pragma: no cover
             cls.nlp_analyze_url,
@@ -203,6 +246,8 @@ class Repository(models.Model):
         return r  # pragma: no cover
 
     @classmethod
+    @timed('nlp')
+    @nlp_request('evaluate')
     def request_nlp_evaluate(cls, user_authorization, data):
         r = requests.post(  # pragma: no cover
             cls.nlp_evaluate_url,
@@ -344,7 +389,7 @@ class Repository(models.Model):
             query = query.filter(
                 repository_update__language=language)
         if exclude_deleted:
-            return query.exclude(deleted_in__isnull=False)
+            return query.filter(deleted_in__isnull=True)
         return query
 
     def evaluations(self, language=None, exclude_deleted=True, queryset=None):
@@ -356,14 +401,174 @@ class Repository(models.Model):
             query = query.filter(
                 repository_update__language=language)
         if exclude_deleted:
-            return query.exclude(deleted_in__isnull=False)
+            return query.filter(deleted_in__isnull=True)
         return query
 
+    def translations(self, language=None, exclude_deleted=True,
+                     queryset=None):
+        if queryset is None:
+            queryset = RepositoryTranslatedExample.objects
+        query = queryset.filter(
+            repository_update__repository=self)
+        if language:
+            query = query.filter(language=language)
+        if exclude_deleted:
+            return query.filter(original_example__deleted_in__isnull=True)
+        return query
+
+    def duplicates(self, language=None):
+        """
+        Groups of examples, translations and evaluate tests with the same
+        text (text_hash) in the language, largest groups first.
+        """
+        language = language or self.language
+        return {
+            'examples': duplicate_groups(self.examples(language)),
+            'translations': duplicate_groups(self.translations(language)),
+            'evaluations': duplicate_groups(self.evaluations(language)),
+        }
+
+    def clone_to(self, repository, batch_size=1000):
+        """
+        Copy the current dataset to repository: labels, entities, the
+        examples not deleted with their entities and translations, the
+        evaluate tests and categories. Bulk inserts by table, in batches of
+        examples, with the ids of the copies mapped in memory. Return the
+        number of rows copied by kind.
+        """
+        updates = {}
+
+        def current_update(language):
+            if language not in updates:
+                updates[language] = repository.current_update(language)
+            return updates[language]
+
+        counts = OrderedDict()
+        with transaction.atomic():
+            labels = {
+                label.pk: RepositoryEntityLabel(
+                    repository=repository,
+                    value=label.value)
+                for label in self.labels.all()
+            }
+            bulk_create(RepositoryEntityLabel, list(labels.values()))
+            labels = {pk: label.pk for pk, label in labels.items()}
+            counts['labels'] = len(labels)
+
+            entities = {
+                entity.pk: RepositoryEntity(
+                    repository=repository,
+                    value=entity.value,
+                    label_id=labels.get(entity.label_id))
+                for entity in self.entities.all()
+            }
+            bulk_create(RepositoryEntity, list(entities.values()))
+            entities = {pk: entity.pk for pk, entity in entities.items()}
+            counts['entities'] = len(entities)
+
+            counts['examples'] = 0
+            counts['translations'] = 0
+            example_ids = list(self.examples().order_by('pk').values_list(
+                'pk',
+                flat=True))
+            for i in range(0, len(example_ids), batch_size):
+                examples = {
+                    pk: RepositoryExample(
+                        repository_update=current_update(language),
+                        text=text,
+                        intent=intent)
+                    for pk, text, intent, language in
+                    RepositoryExample.objects.filter(
+                        pk__in=example_ids[i:i + batch_size]).values_list(
+                            'pk',
+                            'text',
+                            'intent',
+                            'repository_update__language')
+                }
+                bulk_create(RepositoryExample, list(examples.values()))
+                examples = {pk: example.pk for pk, example in examples.items()}
+                copy_entities(
+                    RepositoryExampleEntity,
+                    'repository_example',
+                    examples,
+                    entities)
+                counts['examples'] += len(examples)
+
+                translations = {
+                    pk: RepositoryTranslatedExample(
+                        repository_update=current_update(language),
+                        original_example_id=examples[original_example_id],
+                        language=language,
+                        text=text)
+                    for pk, original_example_id, language, text in
+                    RepositoryTranslatedExample.objects.filter(
+                        original_example_id__in=list(examples)).values_list(
+                            'pk',
+                            'original_example_id',
+                            'language',
+                            'text')
+                }
+                bulk_create(
+                    RepositoryTranslatedExample,
+                    list(translations.values()))
+                translations = {
+                    pk: translation.pk
+                    for pk, translation in translations.items()
+                }
+                copy_entities(
+                    RepositoryTranslatedExampleEntity,
+                    'repository_translated_example',
+                    translations,
+                    entities)
+                RepositoryTranslatedExample.objects.filter(
+                    pk__in=list(translations.values()),
+                ).update_has_valid_entities()
+                counts['translations'] += len(translations)
+
+            counts['evaluations'] = 0
+            evaluate_ids = list(self.evaluations().order_by(
+                'pk').values_list('pk', flat=True))
+            for i in range(0, len(evaluate_ids), batch_size):
+                evaluations = {
+                    pk: RepositoryEvaluate(
+                        repository_update=current_update(language),
+                        text=text,
+                        intent=intent)
+                    for pk, text, intent, language in
+                    RepositoryEvaluate.objects.filter(
+                        pk__in=evaluate_ids[i:i + batch_size]).values_list(
+                            'pk',
+                            'text',
+                            'intent',
+                            'repository_update__language')
+                }
+                bulk_create(RepositoryEvaluate, list(evaluations.values()))
+                evaluations = {
+                    pk: evaluate.pk
+                    for pk, evaluate in evaluations.items()
+                }
+                copy_entities(
+                    RepositoryEvaluateEntity,
+                    'repository_evaluate',
+                    evaluations,
+                    entities)
+                counts['evaluations'] += len(evaluations)
+
+            categories = list(self.categories.all())
+            repository.categories.add(*categories)
+            counts['categories'] = len(categories)
+
+            # The bulk inserts send no signals
+            RepositoryChange.on_commit(
+                router.db_for_write(Repository),
+                pk=repository.pk)
+        return counts
+
     def evaluations_results(self, queryset=None):
         if queryset is None:
             queryset = RepositoryEvaluateResult.objects
         query = queryset.filter(
-            repository_update__repository=self)
+            repository=self)
         return query
 
     def language_status(self, language):
@@ -401,9 +606,18 @@ class Repository(models.Model):
 
     def current_update(self, language=None):
         language = language or self.language
-        repository_update, created = self.updates.get_or_create(
-            language=language,
-            training_started_at=None)
+        # common_update_open_uniq keeps one open update by language, when
+        # another worker creates it first get_or_create gets that one
+        try:
+            repository_update, created = self.updates.get_or_create(
+                language=language,
+                training_started_at=None)
+        except IntegrityError:
+            # The conflicting update started training before it could be
+            # read, the next one is free to create
+            repository_update, created = self.updates.get_or_create(
+                language=language,
+                training_started_at=None)
         return repository_update
 
     def last_trained_update(self, language=None):
@@ -421,6 +635,27 @@ class Repository(models.Model):
             repository=self)
         return get
 
+    def next_evaluate_result_version(self):
+        """
+        Allocate the next evaluate result version. The update locks the
+        counter row until the transaction ends, so concurrent evaluations
+        get distinct versions.
+        """
+        with transaction.atomic():
+            counter = RepositoryEvaluateResultCounter.objects.filter(
+                repository=self)
+            if not counter.update(last_version=models.F('last_version') + 1):
+                try:
+                    with transaction.atomic():
+                        return RepositoryEvaluateResultCounter.objects.create(
+                            repository=self,
+                            last_version=1).last_version
+                except IntegrityError:
+                    # Created by a concurrent evaluation meanwhile
+                    counter.update(
+                        last_version=models.F('last_version') + 1)
+            return counter.values_list('last_version', flat=True).get()
+
     def get_absolute_url(self):
         return '{}{}/{}/'.format(
             settings.BOTHUB_WEBAPP_BASE_URL,
@@ -433,6 +668,11 @@ class RepositoryUpdate(models.Model):
         verbose_name = _('repository update')
         verbose_name_plural = _('repository updates')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['repository', 'language', '-created_at'],
+                name='common_update_repo_lang_idx'),
+        ]
 
     MIN_EXAMPLES_PER_INTENT = 2
     MIN_EXAMPLES_PER_ENTITY = 2
@@ -497,7 +737,7 @@ class RepositoryUpdate(models.Model):
                 models.Q(deleted_in=self) |
                 models.Q(deleted_in__training_started_at__lt=t_started_at))
         else:
-            examples = examples.exclude(deleted_in__isnull=False)
+            examples = examples.filter(deleted_in__isnull=True)
         return examples
 
     @property
@@ -566,7 +806,8 @@ class RepositoryUpdate(models.Model):
             if previous_update.use_name_entities is not \
                self.repository.use_name_entities:
                 return True
-            if previous_update.failed_at:
+            if previous_update.failed_at or \
+               previous_update.training_expired:
                 return True
 
         if not self.added.exists() and \
@@ -609,43 +850,336 @@ class RepositoryUpdate(models.Model):
             if not authorization.can_write:
                 raise TrainingNotAllowed()
 
+    @property
+    def training_expired(self):
+        """
+        The training wasn't saved or failed in TRAINING_LEASE seconds,
+        its trainer probably crashed.
+        """
+        if not self.training_started_at or self.trained_at or \
+           self.failed_at:
+            return False
+        return self.training_started_at < timezone.now() - timedelta(
+            seconds=settings.TRAINING_LEASE)
+
+    @contextmanager
+    def training_lock(self):
+        """
+        Serialize the training changes of the repository language between
+        processes, with a transaction advisory lock in PostgreSQL and the
+        update row lock elsewhere. Yields the update read inside the lock.
+        """
+        using = router.db_for_write(RepositoryUpdate)
+        connection = connections[using]
+        with transaction.atomic(using=using):
+            queryset = RepositoryUpdate.objects.using(using)
+            if connection.vendor == 'postgresql':
+                key = hashlib.sha1('training:{}:{}'.format(
+                    self.repository_id,
+                    self.language).encode()).digest()
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SELECT pg_advisory_xact_lock(%s)',
+                        [int.from_bytes(key[:8], 'big', signed=True)])
+            else:
+                queryset = queryset.select_for_update()
+            yield queryset.get(pk=self.pk)
+
+    def expire_trainings(self):
+        """
+        Fail the other trainings of the repository language with an
+        expired lease, so they don't block a new training.
+        """
+        expired = self.repository.updates.filter(
+            language=self.language,
+            training_started_at__lt=timezone.now() - timedelta(
+                seconds=settings.TRAINING_LEASE),
+            trained_at__isnull=True,
+            failed_at__isnull=True).exclude(pk=self.pk).update(
+                failed_at=timezone.now(),
+                training_log=_('Training lease expired.'))
+        if expired:
+            RepositoryChange.on_commit(
+                router.db_for_write(RepositoryUpdate),
+                pk=self.repository_id)
+        return expired
+
     def start_training(self, by):
-        self.validate_init_train(by)
-        self.by = by
-        self.training_started_at = timezone.now()
-        self.algorithm = self.repository.algorithm
-        self.use_competing_intents = self.repository.use_competing_intents
-        self.use_name_entities = self.repository.use_name_entities
-        self.save(
-            update_fields=[
-                'by',
-                'training_started_at',
-                'algorithm',
-                'use_competing_intents',
-                'use_name_entities',
-            ])
+        with self.training_lock() as update:
+            update.validate_init_train(by)
+            self.by = by
+            self.training_started_at = timezone.now()
+            self.algorithm = self.repository.algorithm
+            self.use_competing_intents = \
+                self.repository.use_competing_intents
+            self.use_name_entities = self.repository.use_name_entities
+            self.save(
+                update_fields=[
+                    'by',
+                    'training_started_at',
+                    'algorithm',
+                    'use_competing_intents',
+                    'use_name_entities',
+                ])
+            self.expire_trainings()
 
     def save_training(self, bot_data):
-        if self.trained_at:
-            raise RepositoryUpdateAlreadyTrained()
-
-        self.trained_at = timezone.now()
-        self.bot_data = base64.b64encode(bot_data).decode('utf8')
-        self.save(
-            update_fields=[
-                'trained_at',
-                'bot_data',
-            ])
+        with self.training_lock() as update:
+            if update.trained_at:
+                raise RepositoryUpdateAlreadyTrained()
+            if update.failed_at:
+                raise RepositoryUpdateTrainingFailed()
+
+            self.trained_at = timezone.now()
+            self.bot_data = base64.b64encode(bot_data).decode('utf8')
+            self.save(
+                update_fields=[
+                    'trained_at',
+                    'bot_data',
+                ])
 
     def get_bot_data(self):
         return base64.b64decode(self.bot_data)
 
     def train_fail(self):
-        self.failed_at = timezone.now()
-        self.save(
-            update_fields=[
-                'failed_at',
-            ])
+        with self.training_lock() as update:
+            if update.trained_at:
+                raise RepositoryUpdateAlreadyTrained()
+            if update.failed_at:
+                self.failed_at = update.failed_at
+                return
+            self.failed_at = timezone.now()
+            self.save(
+                update_fields=[
+                    'failed_at',
+                ])
+
+
+class RepositoryJobQuerySet(models.QuerySet):
+    def active(self):
+        """
+        Queued jobs and running jobs within their lease.
+        """
+        return self.filter(
+            models.Q(status=RepositoryJob.STATUS_QUEUED) |
+            models.Q(
+                status=RepositoryJob.STATUS_RUNNING,
+                started_at__gte=timezone.now() - timedelta(
+                    seconds=settings.JOB_LEASE)))
+
+    def expired(self):
+        """
+        Running jobs not finished in JOB_LEASE seconds, their worker
+        probably crashed.
+        """
+        return self.filter(
+            status=RepositoryJob.STATUS_RUNNING,
+            started_at__lt=timezone.now() - timedelta(
+                seconds=settings.JOB_LEASE))
+
+    def expire(self):
+        """
+        Fail the expired jobs, so they don't block new ones.
+        """
+        return self.expired().update(
+            status=RepositoryJob.STATUS_FAILED,
+            finished_at=timezone.now(),
+            log=_('Job lease expired.'))
+
+    def next_queued(self):
+        """
+        Lock and return the oldest queued job, jobs locked by other
+        workers are skipped. Must run inside a transaction.
+        """
+        return self.select_for_update(skip_locked=True).filter(
+            status=RepositoryJob.STATUS_QUEUED).order_by(
+                'created_at').first()
+
+
+class RepositoryJob(models.Model):
+    """
+    Work on a repository update queued by the API and run by the
+    run_jobs command, so requests don't wait for the NLP service.
+    """
+
+    class Meta:
+        abstract = True
+        ordering = ['-created_at']
+
+    STATUS_QUEUED = 0
+    STATUS_RUNNING = 1
+    STATUS_SUCCESS = 2
+    STATUS_FAILED = 3
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, _('queued')),
+        (STATUS_RUNNING, _('running')),
+        (STATUS_SUCCESS, _('success')),
+        (STATUS_FAILED, _('failed')),
+    ]
+    ACTIVE_STATUS = [
+        STATUS_QUEUED,
+        STATUS_RUNNING,
+    ]
+
+    repository = models.ForeignKey(
+        Repository,
+        models.CASCADE,
+        editable=False)
+    language = models.CharField(
+        _('language'),
+        max_length=5,
+        editable=False,
+        validators=[
+            languages.validate_language,
+        ])
+    by = models.ForeignKey(
+        User,
+        models.CASCADE,
+        editable=False)
+    status = models.PositiveIntegerField(
+        _('status'),
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        editable=False)
+    log = models.TextField(
+        _('log'),
+        blank=True,
+        editable=False)
+    created_at = models.DateTimeField(
+        _('created at'),
+        auto_now_add=True)
+    started_at = models.DateTimeField(
+        _('started at'),
+        blank=True,
+        null=True,
+        editable=False)
+    finished_at = models.DateTimeField(
+        _('finished at'),
+        blank=True,
+        null=True,
+        editable=False)
+
+    objects = RepositoryJobQuerySet.as_manager()
+
+    @property
+    def is_active(self):
+        return self.status in RepositoryJob.ACTIVE_STATUS
+
+    def start(self):
+        self.status = RepositoryJob.STATUS_RUNNING
+        self.started_at = timezone.now()
+        self.save(update_fields=['status', 'started_at'])
+
+    def finish(self, success, log=''):
+        """
+        Finish the job while it is still running and return if it did. A
+        job with an expired lease was failed by expire() and keeps it.
+        """
+        fields = {
+            'status': RepositoryJob.STATUS_SUCCESS if success
+            else RepositoryJob.STATUS_FAILED,
+            'finished_at': timezone.now(),
+            'log': log,
+        }
+        finished = type(self).objects.filter(
+            pk=self.pk,
+            status=RepositoryJob.STATUS_RUNNING).update(**fields)
+        if finished:
+            for name, value in fields.items():
+                setattr(self, name, value)
+        else:
+            self.refresh_from_db(fields=list(fields.keys()))
+        return bool(finished)
+
+    @classmethod
+    def enqueue(cls, repository, language, by):
+        """
+        Return the active job of the repository language or a new one,
+        a partial unique index in each job table keeps at most one. An
+        expired job is failed first.
+        """
+        jobs = cls.objects.filter(repository=repository, language=language)
+        jobs.expire()
+        job = jobs.active().first()
+        if job:
+            return job, False
+        try:
+            with transaction.atomic():
+                return cls.objects.create(
+                    repository=repository,
+                    language=language,
+                    repository_update=repository.current_update(language),
+                    by=by), True
+        except IntegrityError:
+            return cls.objects.active().get(
+                repository=repository,
+                language=language), False
+
+
+class RepositoryTrainingJob(RepositoryJob):
+    class Meta(RepositoryJob.Meta):
+        verbose_name = _('repository training job')
+        verbose_name_plural = _('repository training jobs')
+        db_table = 'common_repository_training_job'
+
+    repository_update = models.ForeignKey(
+        RepositoryUpdate,
+        models.CASCADE,
+        related_name='training_jobs',
+        editable=False)
+
+
+class RepositoryEvaluateJob(RepositoryJob):
+    class Meta(RepositoryJob.Meta):
+        verbose_name = _('repository evaluate job')
+        verbose_name_plural = _('repository evaluate jobs')
+        db_table = 'common_repository_evaluate_job'
+
+    repository_update = models.ForeignKey(
+        RepositoryUpdate,
+        models.CASCADE,
+        related_name='evaluate_jobs',
+        editable=False)
+    evaluate_result = models.ForeignKey(
+        'RepositoryEvaluateResult',
+        models.SET_NULL,
+        related_name='jobs',
+        blank=True,
+        null=True,
+        editable=False)
+
+
+class RepositoryCloneJob(RepositoryJob):
+    """
+    Copy of the dataset of repository, every language, to clone, a new
+    repository. language is the base language of repository.
+    """
+
+    class Meta(RepositoryJob.Meta):
+        verbose_name = _('repository clone job')
+        verbose_name_plural = _('repository clone jobs')
+        db_table = 'common_repository_clone_job'
+
+    clone = models.ForeignKey(
+        Repository,
+        models.CASCADE,
+        related_name='clone_jobs',
+        editable=False)
+
+    def run(self):
+        """
+        Copy the dataset of a started job and finish it, return False
+        when the job was not running anymore (see finish).
+        """
+        try:
+            counts = self.repository.clone_to(self.clone)
+        except Exception as e:
+            # clone_to rolled back, any error must finish the job
+            return self.finish(False, '{}: {}'.format(type(e).__name__, e))
+        return self.finish(True, ', '.join([
+            '{} {}'.format(count, kind)
+            for kind, count in counts.items()
+        ]))
 
 
 class RepositoryExample(models.Model):
@@ -653,6 +1187,11 @@ class RepositoryExample(models.Model):
         verbose_name = _('repository example')
         verbose_name_plural = _('repository examples')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['text_hash', 'repository_update'],
+                name='common_example_text_hash_idx'),
+        ]
 
     repository_update = models.ForeignKey(
         RepositoryUpdate,
@@ -668,6 +1207,10 @@ class RepositoryExample(models.Model):
     text = models.TextField(
         _('text'),
         help_text=_('Example text'))
+    text_hash = TextHashField(
+        _('text hash'),
+        help_text=_('Hash of the text without accents, case or repeated ' +
+                    'whitespace, finds the duplicated examples'))
     intent = models.CharField(
         _('intent'),
         max_length=64,
@@ -709,7 +1252,58 @@ class RepositoryExample(models.Model):
         self.save(update_fields=['deleted_in'])
 
 
+class RepositoryTranslatedExampleQueryset(models.QuerySet):
+    def update_has_valid_entities(self, batch_size=1000):
+        """
+        Recompute has_valid_entities of the translations, comparing only the
+        entity values like same_entities_validator. Used after the entities
+        change without signals (bulk_create).
+        """
+        translations = list(self.values_list('pk', 'original_example_id'))
+        for i in range(0, len(translations), batch_size):
+            batch = translations[i:i + batch_size]
+            original_entities = entities_values(
+                RepositoryExampleEntity.objects.filter(
+                    repository_example_id__in=set(map(
+                        lambda t: t[1],
+                        batch))),
+                'repository_example_id')
+            translated_entities = entities_values(
+                RepositoryTranslatedExampleEntity.objects.filter(
+                    repository_translated_example_id__in=list(map(
+                        lambda t: t[0],
+                        batch))),
+                'repository_translated_example_id')
+            valid = []
+            invalid = []
+            for pk, original_example_id in batch:
+                if RepositoryTranslatedExample.same_entities_validator(
+                        original_entities.get(original_example_id, []),
+                        translated_entities.get(pk, [])):
+                    valid.append(pk)
+                else:
+                    invalid.append(pk)
+            RepositoryTranslatedExample.objects.filter(
+                pk__in=valid,
+                has_valid_entities=False).update(has_valid_entities=True)
+            RepositoryTranslatedExample.objects.filter(
+                pk__in=invalid,
+                has_valid_entities=True).update(has_valid_entities=False)
+
+
+def entities_values(queryset, example_field):
+    entities = {}
+    for example_id, value in queryset.values_list(
+            example_field,
+            'entity__value'):
+        entities.setdefault(example_id, []).append({'entity': value})
+    return entities
+
+
 class RepositoryTranslatedExampleManager(models.Manager):
+    def get_queryset(self):
+        return RepositoryTranslatedExampleQueryset(self.model, using=self._db)
+
     def create(self, *args, original_example=None, language=None, **kwargs):
         repository = original_example.repository_update.repository
         return super().create(
@@ -726,6 +1320,11 @@ class RepositoryTranslatedExample(models.Model):
         verbose_name_plural = _('repository translated examples')
         unique_together = ['original_example', 'language']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['text_hash', 'repository_update'],
+                name='common_translated_hash_idx'),
+        ]
 
     repository_update = models.ForeignKey(
         RepositoryUpdate,
@@ -748,9 +1347,20 @@ class RepositoryTranslatedExample(models.Model):
     text = models.TextField(
         _('text'),
         help_text=_('Translation text'))
+    text_hash = TextHashField(
+        _('text hash'),
+        help_text=_('Hash of the text without accents, case or repeated ' +
+                    'whitespace, finds the duplicated translations'))
     created_at = models.DateTimeField(
         _('created at'),
         auto_now_add=True)
+    has_valid_entities = models.BooleanField(
+        _('has valid entities'),
+        default=True,
+        db_index=True,
+        editable=False,
+        help_text=_('Translation has the entities of the original example, ' +
+                    'updated when the entities change'))
 
     objects = RepositoryTranslatedExampleManager()
 
@@ -784,13 +1394,21 @@ class RepositoryTranslatedExample(models.Model):
                 r.items())) if entities_list else 'no entities'
         return r
 
-    @property
-    def has_valid_entities(self):
-        original_entities = self.original_example.entities.all()
-        my_entities = self.entities.all()
-        return RepositoryTranslatedExample.same_entities_validator(
-            list(map(lambda x: x.to_dict, original_entities)),
-            list(map(lambda x: x.to_dict, my_entities)))
+    def update_has_valid_entities(self):
+        original_entities = entities_values(
+            RepositoryExampleEntity.objects.filter(
+                repository_example_id=self.original_example_id),
+            'repository_example_id')
+        my_entities = entities_values(
+            RepositoryTranslatedExampleEntity.objects.filter(
+                repository_translated_example_id=self.pk),
+            'repository_translated_example_id')
+        self.has_valid_entities = \
+            RepositoryTranslatedExample.same_entities_validator(
+                original_entities.get(self.original_example_id, []),
+                my_entities.get(self.pk, []))
+        RepositoryTranslatedExample.objects.filter(pk=self.pk).update(
+            has_valid_entities=self.has_valid_entities)
 
 
 class RepositoryEntityLabelQueryset(models.QuerySet):
@@ -1042,12 +1660,21 @@ class RepositoryAuthorization(models.Model):
 
     @property
     def level(self):
-        try:
-            user = self.user
-        except User.DoesNotExist:
-            user = None
-
-        if user and self.repository.owner == user:
+        # Recomputed only when the role, the user or the repository change
+        key = (
+            self.user_id,
+            self.role,
+            self.repository.owner_id,
+            self.repository.is_private,
+        )
+        cached = getattr(self, '_level', None)
+        if cached is None or cached[0] != key:
+            cached = (key, self.get_level())
+            self._level = cached
+        return cached[1]
+
+    def get_level(self):
+        if self.is_owner:
             return RepositoryAuthorization.LEVEL_ADMIN
 
         if self.role == RepositoryAuthorization.ROLE_NOT_SETTED:
@@ -1093,11 +1720,8 @@ class RepositoryAuthorization(models.Model):
 
     @property
     def is_owner(self):
-        try:
-            user = self.user
-        except User.DoesNotExist:
-            return False
-        return self.repository.owner == user
+        return self.user_id is not None and \
+            self.repository.owner_id == self.user_id
 
     @property
     def role_verbose(self):
@@ -1115,16 +1739,11 @@ class RepositoryAuthorization(models.Model):
             'repository_url': self.repository.get_absolute_url(),
             'new_role': self.role_verbose,
         }
-        send_mail(
+        QueuedEmail.objects.enqueue(
             _('New role in {}').format(self.repository.name),
-            render_to_string(
-                'common/emails/new_role.txt',
-                context),
-            None,
-            [self.user.email],
-            html_message=render_to_string(
-                'common/emails/new_role.html',
-                context))
+            'common/emails/new_role',
+            context,
+            self.user.email)
 
 
 class RepositoryVote(models.Model):
@@ -1193,17 +1812,12 @@ class RequestRepositoryAuthorization(models.Model):
             'repository_url': self.repository.get_absolute_url(),
         }
         for admin in self.repository.admins:
-            send_mail(
+            QueuedEmail.objects.enqueue(
                 _('New authorization request in {}').format(
                     self.repository.name),
-                render_to_string(
-                    'common/emails/new_request.txt',
-                    context),
-                None,
-                [admin.email],
-                html_message=render_to_string(
-                    'common/emails/new_request.html',
-                    context))
+                'common/emails/new_request',
+                context,
+                admin.email)
 
     def send_request_rejected_email(self):
         if not settings.SEND_EMAILS:
@@ -1211,17 +1825,12 @@ class RequestRepositoryAuthorization(models.Model):
         context = {
             'repository_name': self.repository.name,
         }
-        send_mail(
+        QueuedEmail.objects.enqueue(
             _('Access denied to {}').format(
                 self.repository.name),
-            render_to_string(
-                'common/emails/request_rejected.txt',
-                context),
-            None,
-            [self.user.email],
-            html_message=render_to_string(
-                'common/emails/request_rejected.html',
-                context))
+            'common/emails/request_rejected',
+            context,
+            self.user.email)
 
     def send_request_approved_email(self):
         if not settings.SEND_EMAILS:
@@ -1230,17 +1839,12 @@ class RequestRepositoryAuthorization(models.Model):
             'admin_name': self.approved_by.name,
             'repository_name': self.repository.name,
         }
-        send_mail(
+        QueuedEmail.objects.enqueue(
             _('Authorization Request Approved to {}').format(
                 self.repository.name),
-            render_to_string(
-                'common/emails/request_approved.txt',
-                context),
-            None,
-            [self.user.email],
-            html_message=render_to_string(
-                'common/emails/request_approved.html',
-                context))
+            'common/emails/request_approved',
+            context,
+            self.user.email)
 
 
 class RepositoryEvaluate(models.Model):
@@ -1249,6 +1853,11 @@ class RepositoryEvaluate(models.Model):
         verbose_name_plural = _('repository evaluate tests')
         ordering = ['-created_at']
         db_table = 'common_repository_evaluate'
+        indexes = [
+            models.Index(
+                fields=['text_hash', 'repository_update'],
+                name='common_evaluate_text_hash_idx'),
+        ]
 
     repository_update = models.ForeignKey(
         RepositoryUpdate,
@@ -1264,6 +1873,10 @@ class RepositoryEvaluate(models.Model):
     text = models.TextField(
         _('text'),
         help_text=_('Evaluate test text'))
+    text_hash = TextHashField(
+        _('text hash'),
+        help_text=_('Hash of the text without accents, case or repeated ' +
+                    'whitespace, finds the duplicated evaluate tests'))
     intent = models.CharField(
         _('intent'),
         max_length=64,
@@ -1345,12 +1958,143 @@ class RepositoryEvaluateResultScore(models.Model):
         auto_now_add=True)
 
 
+def bulk_create(model, objs):
+    """
+    bulk_create setting the primary keys, saving one by one in databases
+    that don't return them from a bulk insert (SQLite).
+    """
+    connection = connections[router.db_for_write(model)]
+    if connection.features.can_return_ids_from_bulk_insert:
+        return model.objects.bulk_create(objs)
+    for obj in objs:
+        obj.save(force_insert=True)
+    return objs
+
+
+def copy_entities(model, field, copies, entities):
+    """
+    Copy the entities of the objects in field (the keys of copies) to
+    their copies, with the entities of entities (ids of the originals to
+    ids of the copies), in a single bulk insert.
+    """
+    return model.objects.bulk_create([
+        model(**{
+            '{}_id'.format(field): copies[object_id],
+            'entity_id': entities[entity_id],
+            'start': start,
+            'end': end,
+        })
+        for object_id, entity_id, start, end in model.objects.filter(**{
+            '{}_id__in'.format(field): list(copies),
+        }).values_list('{}_id'.format(field), 'entity_id', 'start', 'end')
+    ])
+
+
+class RepositoryEvaluateResultManager(models.Manager):
+    def create_report(self, repository_update, report):
+        """
+        Save a complete evaluation report: the result, its scores and the
+        results by intent and entity, with a bulk insert by table in a
+        single transaction. The running evaluate job of the repository
+        language gets the result, if it has none yet. The bulk inserts
+        don't run the field validators, the intents and entities are
+        validated before.
+        """
+        intents = report.get('intents_list', [])
+        entities = report.get('entities_list', [])
+        for item in intents:
+            if item.get('intent'):
+                validate_item_key(item.get('intent'))
+        entities_by_value = {
+            entity.value: entity
+            for entity in repository_update.repository.entities.filter(
+                value__in=[e.get('entity') for e in entities])
+        }
+        missing = set([e.get('entity') for e in entities]) - \
+            set(entities_by_value)
+        if missing:
+            raise ValidationError(
+                _('Entities MUST match existing entities: {}').format(
+                    ', '.join(sorted(missing))))
+
+        with transaction.atomic():
+            scores = bulk_create(RepositoryEvaluateResultScore, [
+                RepositoryEvaluateResultScore(
+                    **report.get('intent_results', {})),
+                RepositoryEvaluateResultScore(
+                    **report.get('entity_results', {})),
+            ] + [
+                RepositoryEvaluateResultScore(**item.get('score'))
+                for item in intents + entities
+            ])
+            result = self.create(
+                repository_update=repository_update,
+                intent_results=scores[0],
+                entity_results=scores[1],
+                matrix_chart=report.get('matrix_chart'),
+                confidence_chart=report.get('confidence_chart'),
+                log=report.get('log', ''))
+            item_scores = iter(scores[2:])
+            RepositoryEvaluateResultIntent.objects.bulk_create([
+                RepositoryEvaluateResultIntent(
+                    evaluate_result=result,
+                    intent=item.get('intent'),
+                    score=next(item_scores))
+                for item in intents
+            ])
+            RepositoryEvaluateResultEntity.objects.bulk_create([
+                RepositoryEvaluateResultEntity(
+                    evaluate_result=result,
+                    entity=entities_by_value[item.get('entity')],
+                    score=next(item_scores))
+                for item in entities
+            ])
+            RepositoryEvaluateJob.objects.filter(
+                repository=repository_update.repository,
+                language=repository_update.language,
+                status=RepositoryJob.STATUS_RUNNING,
+                evaluate_result__isnull=True).update(
+                    evaluate_result=result)
+        return result
+
+
+class RepositoryEvaluateResultCounter(models.Model):
+    """
+    Last evaluate result version of the repository, a row apart so saving
+    the repository never writes back a stale counter.
+    """
+
+    class Meta:
+        db_table = 'common_repository_evaluate_result_counter'
+
+    repository = models.OneToOneField(
+        Repository,
+        models.CASCADE,
+        primary_key=True,
+        related_name='evaluate_result_counter')
+    last_version = models.PositiveIntegerField(
+        _('last evaluate result version'),
+        default=0)
+
+
 class RepositoryEvaluateResult(models.Model):
     class Meta:
         db_table = 'common_repository_evaluate_result'
         verbose_name = _('evaluate results')
         verbose_name_plural = _('evaluate results')
         ordering = ['-created_at']
+        unique_together = ['repository', 'version']
+        indexes = [
+            models.Index(
+                fields=['repository_update', '-created_at'],
+                name='common_result_update_idx'),
+        ]
+
+    repository = models.ForeignKey(
+        Repository,
+        models.CASCADE,
+        editable=False,
+        related_name='evaluate_results')
 
     repository_update = models.ForeignKey(
         RepositoryUpdate,
@@ -1393,10 +2137,17 @@ class RepositoryEvaluateResult(models.Model):
         _('created at'),
         auto_now_add=True)
 
+    objects = RepositoryEvaluateResultManager()
+
     def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
         repository = self.repository_update.repository
-        self.version = repository.evaluations_results().count() + 1
-        return super().save(*args, **kwargs)
+        self.repository = repository
+        # Keep the repository row locked until the result is inserted
+        with transaction.atomic():
+            self.version = repository.next_evaluate_result_version()
+            return super().save(*args, **kwargs)
 
 
 class RepositoryEvaluateResultIntent(models.Model):
@@ -1447,6 +2198,126 @@ class RepositoryEvaluateResultEntity(models.Model):
     objects = EntityBaseManager()
 
 
+class QueuedEmailManager(models.Manager):
+    def enqueue(self, subject, template_name, context, to):
+        return self.create(
+            subject=subject,
+            template_name=template_name,
+            context=json.dumps(context),
+            language=get_language() or settings.LANGUAGE_CODE,
+            to=to)
+
+
+class QueuedEmail(models.Model):
+    """
+    Email waiting to be rendered and sent by the send_queued_emails
+    command, so requests don't wait for the SMTP server.
+    """
+
+    class Meta:
+        verbose_name = _('queued email')
+        verbose_name_plural = _('queued emails')
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['status', 'send_after'],
+                name='common_email_status_idx'),
+        ]
+
+    STATUS_PENDING = 0
+    STATUS_SENT = 1
+    STATUS_FAILED = 2
+    STATUS_SENDING = 3
+    STATUS_CHOICES = [
+        (STATUS_PENDING, _('pending')),
+        (STATUS_SENT, _('sent')),
+        (STATUS_FAILED, _('failed')),
+        (STATUS_SENDING, _('sending')),
+    ]
+
+    RETRY_DELAY = timedelta(minutes=1)
+    # A sending email not saved in this time is claimed again, its
+    # worker probably crashed
+    SENDING_LEASE = timedelta(minutes=10)
+
+    subject = models.CharField(
+        _('subject'),
+        max_length=255)
+    template_name = models.CharField(
+        _('template name'),
+        max_length=255,
+        help_text=_('Template path without extension, rendered as .txt ' +
+                    'and .html'))
+    context = models.TextField(
+        _('context'),
+        help_text=_('Template context as JSON'))
+    language = models.CharField(
+        _('language'),
+        max_length=16)
+    to = models.EmailField(
+        _('to'))
+    status = models.PositiveIntegerField(
+        _('status'),
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(
+        _('attempts'),
+        default=0)
+    last_error = models.TextField(
+        _('last error'),
+        blank=True)
+    send_after = models.DateTimeField(
+        _('send after'),
+        default=timezone.now)
+    created_at = models.DateTimeField(
+        _('created at'),
+        auto_now_add=True)
+    sent_at = models.DateTimeField(
+        _('sent at'),
+        blank=True,
+        null=True)
+
+    objects = QueuedEmailManager()
+
+    @property
+    def kind(self):
+        return self.template_name.split('/')[-1]
+
+    def render(self, connection=None):
+        context = json.loads(self.context)
+        with translation.override(self.language):
+            message = EmailMultiAlternatives(
+                self.subject,
+                render_to_string(
+                    '{}.txt'.format(self.template_name),
+                    context),
+                None,
+                [self.to],
+                connection=connection)
+            message.attach_alternative(
+                render_to_string(
+                    '{}.html'.format(self.template_name),
+                    context),
+                'text/html')
+        return message
+
+    def sent(self):
+        self.status = QueuedEmail.STATUS_SENT
+        self.sent_at = timezone.now()
+        self.last_error = ''
+
+    def failed(self, error, max_attempts):
+        # attempts was counted when the email was claimed
+        self.last_error = str(error)
+        if self.attempts >= max_attempts:
+            self.status = QueuedEmail.STATUS_FAILED
+        else:
+            self.status = QueuedEmail.STATUS_PENDING
+            # Exponential backoff: 1, 2, 4, 8... minutes
+            self.send_after = timezone.now() + \
+                QueuedEmail.RETRY_DELAY * 2 ** (self.attempts - 1)
+
+
 @receiver(models.signals.pre_save, sender=RequestRepositoryAuthorization)
 def set_user_role_on_approved(instance, **kwargs):
     current = None
@@ -1479,3 +2350,222 @@ def send_new_request_email_to_admins_on_created(instance, created, **kwargs):
 @receiver(models.signals.post_delete, sender=RequestRepositoryAuthorization)
 def send_request_rejected_email(instance, **kwargs):
     instance.send_request_rejected_email()
+
+
+@receiver(models.signals.post_save, sender=RepositoryTranslatedExample)
+def update_has_valid_entities_on_created(instance, created, raw, **kwargs):
+    if created and not raw:
+        instance.update_has_valid_entities()
+
+
+_pending_updates = threading.local()
+
+
+class OnCommitUpdate(abc.ABC):
+    """
+    One update by transaction, run when it commits, collecting what the
+    signals of the transaction ask to update. The pending update is kept
+    by thread and database while it's registered in the on commit
+    callbacks of the connection. Each signal registers it again, so a
+    rolled back savepoint doesn't drop it, and the calls after the first
+    find it empty. A rolled back transaction drops its callbacks, so the
+    next transaction starts a new update.
+    """
+
+    @classmethod
+    def get(cls, using):
+        if not hasattr(_pending_updates, 'updates'):
+            _pending_updates.updates = {}
+        update = _pending_updates.updates.get((cls, using))
+        if update is None or not update.registered(using):
+            update = cls()
+            _pending_updates.updates[(cls, using)] = update
+        return update
+
+    def registered(self, using):
+        return any(
+            func is self
+            for sids, func in connections[using].run_on_commit)
+
+    def __call__(self):
+        updates = getattr(_pending_updates, 'updates', {})
+        for key, update in list(updates.items()):
+            if update is self:
+                del updates[key]
+        if not self.is_empty():
+            self.run()
+            self.__init__()
+
+    @abc.abstractmethod
+    def is_empty(self):
+        pass  # pragma: no cover
+
+    @abc.abstractmethod
+    def run(self):
+        pass  # pragma: no cover
+
+
+class HasValidEntitiesUpdate(OnCommitUpdate):
+    """
+    Recompute has_valid_entities once, when the transaction commits, for
+    the translations whose entities were deleted. Deleting an example or
+    a repository deletes all its entities, one signal for each.
+    """
+
+    def __init__(self):
+        self.translations = set()
+        self.original_examples = set()
+
+    def is_empty(self):
+        return not (self.translations or self.original_examples)
+
+    def run(self):
+        RepositoryTranslatedExample.objects.filter(
+            models.Q(pk__in=self.translations) |
+            models.Q(original_example_id__in=self.original_examples),
+        ).update_has_valid_entities()
+
+    @classmethod
+    def on_commit(cls, using, translation=None, original_example=None):
+        update = cls.get(using)
+        if translation:
+            update.translations.add(translation)
+        if original_example:
+            update.original_examples.add(original_example)
+        transaction.on_commit(update, using=using)
+
+
+@receiver(models.signals.post_save, sender=RepositoryExampleEntity)
+def update_translations_has_valid_entities(instance, raw, **kwargs):
+    if raw:
+        return
+    RepositoryTranslatedExample.objects.filter(
+        original_example_id=instance.repository_example_id,
+    ).update_has_valid_entities()
+
+
+@receiver(models.signals.post_delete, sender=RepositoryExampleEntity)
+def update_translations_has_valid_entities_on_delete(instance, using,
+                                                     **kwargs):
+    HasValidEntitiesUpdate.on_commit(
+        using,
+        original_example=instance.repository_example_id)
+
+
+@receiver(models.signals.post_save, sender=RepositoryTranslatedExampleEntity)
+def update_translation_has_valid_entities(instance, raw, **kwargs):
+    if raw:
+        return
+    field = RepositoryTranslatedExampleEntity._meta.get_field(
+        'repository_translated_example')
+    # The instance of who added the entity, like the translation serializer
+    if field.is_cached(instance):
+        instance.repository_translated_example.update_has_valid_entities()
+    else:
+        RepositoryTranslatedExample.objects.filter(
+            pk=instance.repository_translated_example_id,
+        ).update_has_valid_entities()
+
+
+@receiver(
+    models.signals.post_delete,
+    sender=RepositoryTranslatedExampleEntity)
+def update_translation_has_valid_entities_on_delete(instance, using,
+                                                    **kwargs):
+    HasValidEntitiesUpdate.on_commit(
+        using,
+        translation=instance.repository_translated_example_id)
+
+
+class RepositoryChange(OnCommitUpdate):
+    """
+    Set changed_at of the repositories, once when the transaction
+    commits, after anything in them changes. Each signal gives a lookup
+    from Repository to the changed row, like updates__added__pk=example_id.
+    """
+
+    def __init__(self):
+        self.lookups = {}
+
+    def is_empty(self):
+        return not self.lookups
+
+    def run(self):
+        query = models.Q()
+        for lookup, values in self.lookups.items():
+            query |= models.Q(**{'{}__in'.format(lookup): values})
+        Repository.objects.filter(pk__in=Repository.objects.filter(
+            query).values('pk')).update(changed_at=timezone.now())
+
+    @classmethod
+    def on_commit(cls, using, **lookups):
+        change = cls.get(using)
+        for lookup, value in lookups.items():
+            if value is not None:
+                change.lookups.setdefault(lookup, set()).add(value)
+        if not change.is_empty():
+            transaction.on_commit(change, using=using)
+
+
+REPOSITORY_CHANGE_LOOKUPS = {
+    RepositoryUpdate: ('pk', 'repository_id'),
+    RepositoryExample: ('updates__pk', 'repository_update_id'),
+    RepositoryExampleEntity: (
+        'updates__added__pk',
+        'repository_example_id'),
+    RepositoryTranslatedExample: (
+        'updates__added__pk',
+        'original_example_id'),
+    RepositoryTranslatedExampleEntity: (
+        'updates__added__translations__pk',
+        'repository_translated_example_id'),
+    RepositoryEntity: ('pk', 'repository_id'),
+    RepositoryEntityLabel: ('pk', 'repository_id'),
+    RepositoryEvaluate: ('updates__pk', 'repository_update_id'),
+    RepositoryEvaluateEntity: (
+        'updates__added_evaluate__pk',
+        'repository_evaluate_id'),
+    RepositoryEvaluateResult: ('updates__pk', 'repository_update_id'),
+    RepositoryAuthorization: ('pk', 'repository_id'),
+    RequestRepositoryAuthorization: ('pk', 'repository_id'),
+    RepositoryVote: ('pk', 'repository_id'),
+}
+
+
+def repository_changed(sender, instance, using, raw=False, created=False,
+                       **kwargs):
+    if raw:
+        return
+    if created and sender is RepositoryAuthorization and \
+            instance.role == RepositoryAuthorization.ROLE_NOT_SETTED:
+        # Created by get_user_authorization on the first visit of the user
+        return
+    lookup, field = REPOSITORY_CHANGE_LOOKUPS[sender]
+    RepositoryChange.on_commit(using, **{lookup: getattr(instance, field)})
+
+
+for sender in REPOSITORY_CHANGE_LOOKUPS:
+    models.signals.post_save.connect(repository_changed, sender=sender)
+    models.signals.post_delete.connect(repository_changed, sender=sender)
+
+
+@receiver(models.signals.m2m_changed, sender=Repository.categories.through)
+def repository_categories_changed(instance, action, using, **kwargs):
+    if action.startswith('post_') and isinstance(instance, Repository):
+        RepositoryChange.on_commit(using, pk=instance.pk)
+
+
+@receiver(models.signals.post_save, sender=RepositoryCategory)
+def repository_category_changed(instance, using, raw=False, **kwargs):
+    if raw:
+        return
+    RepositoryChange.on_commit(using, categories__pk=instance.pk)
+
+
+@receiver(models.signals.post_save, sender=User)
+def repository_owner_changed(instance, using, raw=False, created=False,
+                             update_fields=None, **kwargs):
+    # Like the last_login update on every login
+    if raw or created or (update_fields and 'nickname' not in update_fields):
+        return
+    RepositoryChange.on_commit(using, owner__pk=instance.pk)
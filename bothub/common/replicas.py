@@ -0,0 +1,235 @@
+import time
+import random
+import hashlib
+import logging
+import threading
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import connections
+from django.db import DatabaseError
+from django.db import OperationalError
+
+from bothub.health.metrics import registry
+
+
+logger = logging.getLogger('bothub.common.replicas')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+PIN_COOKIE = 'bothub_primary'
+
+POSTGRESQL_LAG_SQL = (
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() '
+    'THEN 0 ELSE COALESCE(EXTRACT(EPOCH FROM now() - '
+    'pg_last_xact_replay_timestamp()), 0) END')
+
+# Caches of a single process, the pins of the API clients must be seen by
+# every worker
+LOCAL_CACHE_BACKENDS = [
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+]
+
+_local = threading.local()
+
+
+def replica_lag(alias):
+    """
+    Seconds the replica is behind the primary, None when it's down.
+    """
+    try:
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(POSTGRESQL_LAG_SQL)
+                return float(cursor.fetchone()[0])
+            cursor.execute('SELECT 1')
+            return 0
+    except DatabaseError as e:
+        logger.warning('replica {} unreachable: {}'.format(alias, e))
+        return None
+
+
+class ReplicaStatus(object):
+    """
+    Replicas up and behind the primary at most REPLICA_MAX_LAG seconds,
+    checked again every REPLICA_CHECK_INTERVAL seconds by one request of
+    the process, the others use the last results meanwhile.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked_at = 0
+        self.healthy = []
+
+    def check(self):
+        healthy = []
+        for alias in settings.DATABASE_REPLICAS:
+            lag = replica_lag(alias)
+            if lag is None:
+                continue
+            if lag > settings.REPLICA_MAX_LAG:
+                logger.warning('replica {} is {:.1f}s behind'.format(
+                    alias,
+                    lag))
+                continue
+            healthy.append(alias)
+        self.healthy = healthy
+        self.checked_at = time.time()
+        return healthy
+
+    def mark_down(self, alias):
+        """
+        Stop reading from the replica until the next check.
+        """
+        with self.lock:
+            self.healthy = [a for a in self.healthy if a != alias]
+
+    def healthy_replicas(self):
+        if time.time() - self.checked_at >= \
+           settings.REPLICA_CHECK_INTERVAL and \
+           self.lock.acquire(blocking=False):
+            try:
+                self.check()
+            finally:
+                self.lock.release()
+        return self.healthy
+
+
+status = ReplicaStatus()
+
+
+def check_pin_cache(app_configs, **kwargs):
+    if not settings.DATABASE_REPLICAS:
+        return []
+    if settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        checks.Error(
+            'DATABASE_REPLICAS needs a cache shared by the processes.',
+            hint='Set CACHE_BACKEND and CACHE_LOCATION to a shared cache, '
+                 'like memcached, the API clients read their own writes '
+                 'from the primary by a pin kept in the cache.',
+            id='common.E001'),
+    ]
+
+
+def pin_key(request):
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    return 'replica-pin:{}'.format(
+        hashlib.sha1(authorization.encode()).hexdigest())
+
+
+def is_pinned(request):
+    if request.COOKIES.get(PIN_COOKIE):
+        return True
+    key = pin_key(request)
+    return bool(key and cache.get(key))
+
+
+def pin(request, response):
+    """
+    Read from the primary for the next REPLICA_PIN_SECONDS, so the client
+    reads its own writes: by cookie for browsers and by Authorization
+    header in the cache for API clients (a shared cache for many hosts).
+    """
+    response.set_cookie(
+        PIN_COOKIE,
+        '1',
+        max_age=settings.REPLICA_PIN_SECONDS,
+        httponly=True)
+    key = pin_key(request)
+    if key:
+        cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+
+
+def read_from(alias):
+    _local.read_db = alias
+
+
+def watch_writes(execute, sql, params, many, context):
+    # Used as execute_wrapper of the primary, once the request writes
+    # it reads its own writes from the primary
+    if sql.lstrip()[:6].upper() != 'SELECT':
+        read_from(None)
+    return execute(sql, params, many, context)
+
+
+class ReplicaRouter(object):
+    """
+    Reads of the request go to the replica chosen by ReplicaMiddleware,
+    everything else to the primary (default).
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = getattr(_local, 'read_db', None)
+        if not alias or connections['default'].in_atomic_block:
+            return 'default'
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaMiddleware(object):
+    """
+    Send the reads of safe method requests to a healthy replica, unless
+    the client wrote in the last REPLICA_PIN_SECONDS.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        alias = None
+        if settings.DATABASE_REPLICAS and request.method in SAFE_METHODS \
+           and not is_pinned(request):
+            replicas = status.healthy_replicas()
+            if replicas:
+                alias = random.choice(replicas)
+        registry.inc('bothub_read_database_requests_total', {
+            'database': alias or 'default',
+        })
+
+        if alias is None:
+            response = self.get_response(request)
+        else:
+            read_from(alias)
+            try:
+                with connections['default'].execute_wrapper(watch_writes):
+                    response = self.get_response(request)
+            finally:
+                read_from(None)
+
+        if settings.DATABASE_REPLICAS and \
+           request.method not in SAFE_METHODS:
+            pin(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        """
+        A replica that fails before the next check is marked down and the
+        view runs again reading from the primary, safe methods only read.
+        """
+        alias = getattr(_local, 'read_db', None)
+        if alias is None or not isinstance(exception, OperationalError):
+            return None
+        logger.warning('replica {} failed: {}'.format(alias, exception))
+        status.mark_down(alias)
+        try:
+            connections[alias].close()
+        except DatabaseError:
+            pass
+        read_from(None)
+        match = request.resolver_match
+        return match.func(request, *match.args, **match.kwargs)
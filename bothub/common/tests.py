@@ -1,7 +1,31 @@
+import time
+import requests
+import threading
+
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
+from unittest import skipUnless
+
 from django.test import TestCase
+from django.test import TransactionTestCase
 from django.utils import timezone
+from django.db import connection
+from django.db import transaction
+from django.db import IntegrityError
+from django.db import OperationalError
+from django.db.models.query import QuerySet
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import ResolverMatch
 from django.core.exceptions import ValidationError
 from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core import mail
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
 from bothub.authentication.models import User
 
@@ -9,14 +33,34 @@ from .models import Repository
 from .models import RepositoryExample
 from .models import RepositoryExampleEntity
 from .models import RepositoryTranslatedExample
+from .models import RepositoryTranslatedExampleQueryset
 from .models import RepositoryTranslatedExampleEntity
 from .models import RepositoryAuthorization
 from .models import RequestRepositoryAuthorization
 from .models import RepositoryEntity
 from .models import RepositoryEntityLabel
+from .models import RepositoryChange
+from .models import RepositoryUpdate
+from .models import RepositoryEvaluate
+from .models import RepositoryEvaluateResult
+from .models import QueuedEmail
+from .models import RepositoryTrainingJob
+from .models import RepositoryEvaluateJob
+from .models import RepositoryCloneJob
+from .models import RepositoryCategory
+from .models import RepositoryEvaluateResultScore
+from .models import RepositoryEvaluateResultCounter
+from .fields import normalize_text
+from .fields import text_hash
+from .management.commands.send_queued_emails import send_batch
+from .management.commands.run_jobs import run_training_job
+from .management.commands.run_jobs import run_evaluate_job
+from .management.commands.run_jobs import run_clone_job
+from . import replicas
 from . import languages
 from .exceptions import RepositoryUpdateAlreadyStartedTraining
 from .exceptions import RepositoryUpdateAlreadyTrained
+from .exceptions import RepositoryUpdateTrainingFailed
 from .exceptions import TrainingNotAllowed
 from .exceptions import DoesNotHaveTranslation
 
@@ -227,6 +271,52 @@ class TranslateTestCase(TestCase):
             translate.has_valid_entities,
             False)
 
+    def test_original_entities_changed(self):
+        translate = RepositoryTranslatedExample.objects.create(
+            original_example=self.example,
+            language=languages.LANGUAGE_PT,
+            text='meu nome é Douglas')
+        translate.refresh_from_db()
+        self.assertTrue(translate.has_valid_entities)
+
+        RepositoryExampleEntity.objects.create(
+            repository_example=self.example,
+            start=12,
+            end=19,
+            entity='name')
+        translate.refresh_from_db()
+        self.assertFalse(translate.has_valid_entities)
+
+    def test_update_has_valid_entities(self):
+        translate = RepositoryTranslatedExample.objects.create(
+            original_example=self.example,
+            language=languages.LANGUAGE_PT,
+            text='meu nome é Douglas')
+        entity = RepositoryEntity.objects.create(
+            repository=self.repository,
+            value='name')
+        # bulk_create doesn't send signals
+        RepositoryExampleEntity.objects.bulk_create([
+            RepositoryExampleEntity(
+                repository_example=self.example,
+                start=12,
+                end=19,
+                entity=entity)])
+        RepositoryTranslatedExample.objects.all().update_has_valid_entities()
+        translate.refresh_from_db()
+        self.assertFalse(translate.has_valid_entities)
+
+        RepositoryTranslatedExampleEntity.objects.bulk_create([
+            RepositoryTranslatedExampleEntity(
+                repository_translated_example=translate,
+                start=11,
+                end=18,
+                entity=entity)])
+        RepositoryTranslatedExample.objects.filter(
+            original_example=self.example).update_has_valid_entities()
+        translate.refresh_from_db()
+        self.assertTrue(translate.has_valid_entities)
+
     def test_does_not_have_translation(self):
         with self.assertRaises(DoesNotHaveTranslation):
             self.example.get_translation(languages.LANGUAGE_NL)
@@ -582,6 +672,48 @@ class RepositoryUpdateTrainingTestCase(TestCase):
         with self.assertRaises(TrainingNotAllowed):
             update.start_training(user)
 
+    def test_stale_instance(self):
+        # Another node started the training after this one read the update
+        update = self.repository.current_update()
+        stale = RepositoryUpdate.objects.get(pk=update.pk)
+        update.start_training(self.owner)
+        with self.assertRaises(RepositoryUpdateAlreadyStartedTraining):
+            stale.start_training(self.owner)
+        update.save_training(b'bot')
+        with self.assertRaises(RepositoryUpdateAlreadyTrained):
+            stale.save_training(b'other bot')
+        with self.assertRaises(RepositoryUpdateAlreadyTrained):
+            stale.train_fail()
+        self.assertEqual(
+            RepositoryUpdate.objects.get(pk=update.pk).get_bot_data(),
+            b'bot')
+
+    def test_save_failed_training(self):
+        update = self.repository.current_update()
+        update.start_training(self.owner)
+        update.train_fail()
+        with self.assertRaises(RepositoryUpdateTrainingFailed):
+            update.save_training(b'bot')
+
+    @override_settings(TRAINING_LEASE=60)
+    def test_lease_expired(self):
+        crashed = self.repository.current_update()
+        crashed.start_training(self.owner)
+        self.assertFalse(crashed.training_expired)
+        RepositoryUpdate.objects.filter(pk=crashed.pk).update(
+            training_started_at=timezone.now() - timedelta(minutes=2))
+        crashed.refresh_from_db()
+        self.assertTrue(crashed.training_expired)
+
+        update = self.repository.current_update()
+        update.start_training(self.owner)
+        crashed.refresh_from_db()
+        self.assertIsNotNone(crashed.failed_at)
+        self.assertEqual(crashed.training_log, 'Training lease expired.')
+        with self.assertRaises(RepositoryUpdateTrainingFailed):
+            crashed.save_training(b'late bot')
+        update.save_training(b'bot')
+
 
 class RepositoryUpdateExamplesTestCase(TestCase):
     def setUp(self):
@@ -1350,3 +1482,1347 @@ class RepositorySupportedLanguageQueryTestCase(TestCase):
             q.count(),
             0,
         )
+
+
+class TextHashTestCase(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user('owner@user.com', 'owner')
+        self.repository = Repository.objects.create(
+            owner=owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+
+    def test_normalize_text(self):
+        self.assertEqual(
+            normalize_text('  Olá,\tMUNDO\n çedilha '),
+            'ola, mundo cedilha')
+        self.assertEqual(text_hash('Straße'), text_hash('STRASSE'))
+
+    def test_set_on_save(self):
+        example = RepositoryExample.objects.create(
+            repository_update=self.repository.current_update(),
+            text='Hi there')
+        self.assertEqual(example.text_hash, text_hash('hi there'))
+        example.text = 'bye'
+        example.save()
+        example.refresh_from_db()
+        self.assertEqual(example.text_hash, text_hash('bye'))
+
+    def test_set_on_bulk_create(self):
+        RepositoryEvaluate.objects.bulk_create([
+            RepositoryEvaluate(
+                repository_update=self.repository.current_update(),
+                text='Hi there'),
+        ])
+        self.assertTrue(RepositoryEvaluate.objects.filter(
+            text_hash=text_hash('hi there')).exists())
+
+    def test_duplicates(self):
+        examples = [
+            RepositoryExample.objects.create(
+                repository_update=self.repository.current_update(),
+                text=text)
+            for text in ['hi', 'HI', 'hello', 'hi']
+        ]
+        examples[3].delete()
+        # The groups, then the rows only when there are duplicates
+        with self.assertNumQueries(4):
+            duplicates = self.repository.duplicates()
+        self.assertEqual(duplicates, {
+            'examples': [[
+                {'id': examples[0].pk, 'text': 'hi'},
+                {'id': examples[1].pk, 'text': 'HI'},
+            ]],
+            'translations': [],
+            'evaluations': [],
+        })
+
+
+class IndexesTestCase(TestCase):
+    EXPECTED_INDEXES = {
+        RepositoryExample._meta.db_table: [
+            ('common_example_active_idx', [
+                'repository_update_id',
+                'created_at',
+            ]),
+            ('common_example_active_intent_idx', [
+                'repository_update_id',
+                'intent',
+            ]),
+            ('common_example_text_hash_idx', [
+                'text_hash',
+                'repository_update_id',
+            ]),
+        ],
+        RepositoryUpdate._meta.db_table: [
+            ('common_update_repo_lang_idx', [
+                'repository_id',
+                'language',
+                'created_at',
+            ]),
+        ],
+        RepositoryEvaluate._meta.db_table: [
+            ('common_evaluate_active_idx', [
+                'repository_update_id',
+                'created_at',
+            ]),
+            ('common_evaluate_text_hash_idx', [
+                'text_hash',
+                'repository_update_id',
+            ]),
+        ],
+        RepositoryEvaluateResult._meta.db_table: [
+            ('common_result_update_idx', [
+                'repository_update_id',
+                'created_at',
+            ]),
+        ],
+    }
+
+    def setUp(self):
+        owner = User.objects.create_user('owner@user.com', 'owner')
+        self.repository = Repository.objects.create(
+            owner=owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+        RepositoryExample.objects.create(
+            repository_update=self.repository.current_update(),
+            text='hi',
+            intent='greet')
+
+    def get_constraints(self, table):
+        with connection.cursor() as cursor:
+            return connection.introspection.get_constraints(cursor, table)
+
+    def test_indexes_exists(self):
+        for table, indexes in self.EXPECTED_INDEXES.items():
+            constraints = self.get_constraints(table)
+            for name, columns in indexes:
+                self.assertIn(name, constraints)
+                self.assertEqual(constraints[name]['columns'], columns)
+
+    def test_unique_indexes_exists(self):
+        for model, columns in [
+                (RepositoryTranslatedExample, [
+                    'original_example_id',
+                    'language',
+                ]),
+                (RepositoryEntity, ['repository_id', 'value']),
+                (RepositoryEntityLabel, ['repository_id', 'value']),
+                (RepositoryAuthorization, ['user_id', 'repository_id'])]:
+            constraints = self.get_constraints(model._meta.db_table)
+            self.assertIn(
+                columns,
+                [c['columns'] for c in constraints.values() if c['unique']])
+
+    @skipUnless(
+        connection.vendor == 'postgresql',
+        'EXPLAIN output checked only in PostgreSQL')
+    def test_explain_use_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        self.assertIn(
+            'common_example_active_idx',
+            self.repository.examples(
+                languages.LANGUAGE_EN).order_by('-created_at').explain())
+        self.assertIn(
+            'common_evaluate_active_idx',
+            self.repository.evaluations(
+                languages.LANGUAGE_EN).order_by('-created_at').explain())
+        self.assertIn(
+            'common_update_repo_lang_idx',
+            self.repository.updates.filter(
+                language=languages.LANGUAGE_EN,
+                training_started_at=None).explain())
+
+
+class GenerateFakeDataTestCase(TestCase):
+    def generate(self, **kwargs):
+        kwargs.setdefault('force', True)
+        call_command(
+            'generate_fake_data',
+            users=2,
+            repositories=3,
+            examples=40,
+            intents=4,
+            entities=3,
+            labels=2,
+            languages=['en', 'pt'],
+            translation_ratio=.5,
+            evaluations=5,
+            trained_updates=2,
+            batch_size=16,
+            stdout=StringIO(),
+            **kwargs)
+
+    def test_counts(self):
+        self.generate()
+        self.assertEqual(
+            Repository.objects.filter(slug__startswith='fake-').count(),
+            3)
+        self.assertEqual(RepositoryExample.objects.count(), 3 * 40)
+        self.assertEqual(RepositoryEvaluate.objects.count(), 3 * 5)
+        self.assertEqual(RepositoryEvaluateResult.objects.count(), 3 * 2)
+        self.assertEqual(
+            RepositoryUpdate.objects.filter(
+                trained_at__isnull=False).count(),
+            3 * 2)
+        for entity in RepositoryExampleEntity.objects.all():
+            self.assertEqual(
+                entity.repository_example.repository_update.repository,
+                entity.entity.repository)
+            self.assertEqual(
+                len(entity.value),
+                entity.end - entity.start)
+        for translation in RepositoryTranslatedExample.objects.all():
+            self.assertNotEqual(
+                translation.language,
+                translation.original_example.repository_update.language)
+            self.assertEqual(
+                translation.repository_update.language,
+                translation.language)
+
+    def test_force_without_debug(self):
+        with self.assertRaises(CommandError):
+            self.generate(force=False)
+        self.assertFalse(Repository.objects.exists())
+
+    @override_settings(DEBUG=True)
+    def test_debug(self):
+        self.generate(force=False)
+        self.assertTrue(Repository.objects.exists())
+
+    def test_deterministic(self):
+        def dataset():
+            return list(RepositoryExample.objects.order_by('id').values_list(
+                'text',
+                'intent',
+                'repository_update__repository__uuid'))
+
+        self.generate(seed=1)
+        first = dataset()
+        RepositoryExample.objects.all().delete()
+        Repository.objects.all().delete()
+        User.objects.all().delete()
+        self.generate(seed=1)
+        self.assertEqual(first, dataset())
+
+
+class QueuedEmailTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner@user.com', 'owner')
+        self.user = User.objects.create_user('fake@user.com', 'user')
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+
+    def test_signals_only_enqueue(self):
+        RequestRepositoryAuthorization.objects.create(
+            user=self.user,
+            repository=self.repository,
+            text='I can contribute')
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            list(QueuedEmail.objects.values_list('template_name', 'to')),
+            [
+                ('authentication/emails/welcome', 'owner@user.com'),
+                ('authentication/emails/welcome', 'fake@user.com'),
+                ('common/emails/new_request', 'owner@user.com'),
+            ])
+
+    @override_settings(SEND_EMAILS=False)
+    def test_send_emails_disabled(self):
+        User.objects.create_user('other@user.com', 'other')
+        self.assertFalse(
+            QueuedEmail.objects.filter(to='other@user.com').exists())
+
+    def test_send_batch(self):
+        self.assertEqual(send_batch(batch_size=1), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['owner@user.com'])
+        self.assertEqual(mail.outbox[0].subject, 'Welcome to Bothub')
+        self.assertIn('Hello, ', mail.outbox[0].body)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertEqual(send_batch(), 1)
+        self.assertEqual(send_batch(), 0)
+        self.assertEqual(
+            QueuedEmail.objects.filter(
+                status=QueuedEmail.STATUS_SENT,
+                attempts=1).count(),
+            2)
+
+    def test_retry(self):
+        with mock.patch.object(
+                mail.EmailMultiAlternatives,
+                'send',
+                side_effect=OSError('SMTP down')):
+            self.assertEqual(send_batch(max_attempts=2), 2)
+            email = QueuedEmail.objects.first()
+            self.assertEqual(email.status, QueuedEmail.STATUS_PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertEqual(email.last_error, 'SMTP down')
+            self.assertGreater(email.send_after, timezone.now())
+            # Waiting the retry delay
+            self.assertEqual(send_batch(max_attempts=2), 0)
+            QueuedEmail.objects.update(send_after=timezone.now())
+            send_batch(max_attempts=2)
+        email.refresh_from_db()
+        self.assertEqual(email.status, QueuedEmail.STATUS_FAILED)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_crash_keeps_sent(self):
+        send = mail.EmailMultiAlternatives.send
+
+        def send_once(message):
+            if mail.outbox:
+                raise SystemExit()  # Worker killed
+            return send(message)
+
+        with mock.patch.object(
+                mail.EmailMultiAlternatives,
+                'send',
+                autospec=True,
+                side_effect=send_once):
+            with self.assertRaises(SystemExit):
+                send_batch()
+        self.assertEqual(len(mail.outbox), 1)
+        sent, sending = QueuedEmail.objects.order_by('pk')
+        self.assertEqual(sent.status, QueuedEmail.STATUS_SENT)
+        self.assertEqual(sending.status, QueuedEmail.STATUS_SENDING)
+        # Claimed until its lease expires
+        self.assertEqual(send_batch(), 0)
+        QueuedEmail.objects.filter(pk=sending.pk).update(
+            send_after=timezone.now())
+        self.assertEqual(send_batch(), 1)
+        self.assertEqual(len(mail.outbox), 2)
+        sending.refresh_from_db()
+        self.assertEqual(sending.status, QueuedEmail.STATUS_SENT)
+        self.assertEqual(sending.attempts, 2)
+
+    def test_crash_every_time(self):
+        email = QueuedEmail.objects.first()
+        QueuedEmail.objects.exclude(pk=email.pk).delete()
+        with mock.patch.object(
+                mail.EmailMultiAlternatives,
+                'send',
+                side_effect=SystemExit()):
+            for i in range(2):
+                with self.assertRaises(SystemExit):
+                    send_batch(batch_size=1, max_attempts=2)
+                # Lease expired
+                QueuedEmail.objects.update(send_after=timezone.now())
+        self.assertEqual(send_batch(max_attempts=2), 0)
+        email.refresh_from_db()
+        self.assertEqual(email.status, QueuedEmail.STATUS_FAILED)
+        self.assertEqual(email.attempts, 2)
+        self.assertEqual(email.last_error, 'Sending lease expired.')
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_command(self):
+        call_command('send_queued_emails', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class RepositoryTrainingJobTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner@user.com', 'owner')
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+        self.update = self.repository.current_update()
+
+    def train(self, success=True):
+        def request_nlp_train(user_authorization):
+            self.update.start_training(self.owner)
+            if success:
+                self.update.save_training(b'bot')
+            else:
+                self.update.train_fail()
+            return mock.Mock(status_code=200, text='{}')
+        return mock.patch.object(
+            Repository,
+            'request_nlp_train',
+            side_effect=request_nlp_train)
+
+    def test_enqueue_once(self):
+        job, created = RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        self.assertTrue(created)
+        self.assertEqual(job.repository_update, self.update)
+        self.assertEqual(job.status, RepositoryTrainingJob.STATUS_QUEUED)
+        same_job, created = RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        self.assertFalse(created)
+        self.assertEqual(same_job, job)
+
+    def test_one_active_per_language(self):
+        RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                RepositoryTrainingJob.objects.create(
+                    repository=self.repository,
+                    language=languages.LANGUAGE_EN,
+                    repository_update=self.update,
+                    by=self.owner)
+
+    def test_run_success(self):
+        RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        with self.train() as request_nlp_train:
+            jobs = run_training_job()
+        self.assertEqual(request_nlp_train.call_count, 1)
+        self.assertEqual(len(jobs), 1)
+        job = RepositoryTrainingJob.objects.get()
+        self.assertEqual(job.status, RepositoryTrainingJob.STATUS_SUCCESS)
+        self.assertIsNotNone(job.started_at)
+        self.assertIsNotNone(job.finished_at)
+        self.assertIsNone(run_training_job())
+        # Finished jobs don't block a new training
+        _, created = RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        self.assertTrue(created)
+
+    def test_run_failed(self):
+        RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        with self.train(success=False):
+            run_training_job()
+        job = RepositoryTrainingJob.objects.get()
+        self.assertEqual(job.status, RepositoryTrainingJob.STATUS_FAILED)
+
+    def test_nlp_unreachable(self):
+        RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        with mock.patch.object(
+                Repository,
+                'request_nlp_train',
+                side_effect=requests.ConnectionError('NLP down')):
+            run_training_job()
+        job = RepositoryTrainingJob.objects.get()
+        self.assertEqual(job.status, RepositoryTrainingJob.STATUS_FAILED)
+        self.assertEqual(job.log, 'NLP down')
+
+    def test_unexpected_error(self):
+        RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        with mock.patch.object(
+                Repository,
+                'request_nlp_train',
+                side_effect=ValueError('bad response')):
+            run_training_job()
+        job = RepositoryTrainingJob.objects.get()
+        self.assertEqual(job.status, RepositoryTrainingJob.STATUS_FAILED)
+        self.assertEqual(job.log, 'bad response')
+
+    @override_settings(JOB_LEASE=60)
+    def test_lease_expired(self):
+        job, created = RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        job.start()
+        # Worker killed during the training
+        RepositoryTrainingJob.objects.filter(pk=job.pk).update(
+            started_at=timezone.now() - timedelta(seconds=120))
+        self.assertFalse(RepositoryTrainingJob.objects.active().exists())
+        new_job, created = RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        self.assertTrue(created)
+        job.refresh_from_db()
+        self.assertEqual(job.status, RepositoryTrainingJob.STATUS_FAILED)
+        self.assertEqual(job.log, 'Job lease expired.')
+
+    @override_settings(JOB_LEASE=60)
+    def test_finished_after_lease_expired(self):
+        RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+
+        def request_nlp_train(user_authorization):
+            # Too slow, a new job replaced this one
+            RepositoryTrainingJob.objects.update(
+                started_at=timezone.now() - timedelta(seconds=120))
+            RepositoryTrainingJob.enqueue(
+                self.repository,
+                languages.LANGUAGE_EN,
+                self.owner)
+            return mock.Mock(status_code=200, text='{}')
+
+        with mock.patch.object(
+                Repository,
+                'request_nlp_train',
+                side_effect=request_nlp_train):
+            job, = run_training_job()
+        self.assertEqual(job.status, RepositoryTrainingJob.STATUS_FAILED)
+        job.refresh_from_db()
+        self.assertEqual(job.status, RepositoryTrainingJob.STATUS_FAILED)
+        self.assertEqual(job.log, 'Job lease expired.')
+        self.assertEqual(
+            RepositoryTrainingJob.objects.active().get().status,
+            RepositoryTrainingJob.STATUS_QUEUED)
+
+    def test_command(self):
+        RepositoryTrainingJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        out = StringIO()
+        with self.train():
+            call_command('run_jobs', stdout=out)
+        self.assertIn('success', out.getvalue())
+
+
+class RepositoryEvaluateJobTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner@user.com', 'owner')
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+        self.update = self.repository.current_update()
+        self.update.start_training(self.owner)
+        self.update.save_training(b'bot')
+        self.job, created = RepositoryEvaluateJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+
+    def evaluate(self, status_code=200):
+        def request_nlp_evaluate(user_authorization, data):
+            if status_code == 200:
+                RepositoryEvaluateResult.objects.create_report(
+                    self.update,
+                    {
+                        'matrix_chart': 'https://example.com/matrix.png',
+                        'confidence_chart': 'https://example.com/c.png',
+                        'log': '[]',
+                        'intent_results': {'precision': 0.5},
+                        'entity_results': {},
+                        'intents_list': [
+                            {'intent': 'greet', 'score': {'support': 2}},
+                        ],
+                    })
+            return mock.Mock(status_code=status_code, text='{}')
+        return mock.patch.object(
+            Repository,
+            'request_nlp_evaluate',
+            side_effect=request_nlp_evaluate)
+
+    def test_run_success(self):
+        with self.evaluate():
+            run_evaluate_job()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, RepositoryEvaluateJob.STATUS_SUCCESS)
+        result = self.job.evaluate_result
+        self.assertEqual(result.repository_update, self.update)
+        self.assertEqual(result.version, 1)
+        self.assertEqual(result.evaluate_result_intent.get().score.support, 2)
+        # intent, entity and greet scores
+        self.assertEqual(RepositoryEvaluateResultScore.objects.count(), 3)
+        self.assertIsNone(run_evaluate_job())
+
+    def test_run_failed(self):
+        with self.evaluate(status_code=500):
+            run_evaluate_job()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, RepositoryEvaluateJob.STATUS_FAILED)
+        self.assertIsNone(self.job.evaluate_result)
+
+    def test_unexpected_error(self):
+        with mock.patch.object(
+                Repository,
+                'request_nlp_evaluate',
+                side_effect=KeyError('language')):
+            run_evaluate_job()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, RepositoryEvaluateJob.STATUS_FAILED)
+
+    @override_settings(JOB_LEASE=60)
+    def test_lease_expired(self):
+        self.job.start()
+        RepositoryEvaluateJob.objects.filter(pk=self.job.pk).update(
+            started_at=timezone.now() - timedelta(seconds=120))
+        job, created = RepositoryEvaluateJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        self.assertTrue(created)
+        self.assertNotEqual(job, self.job)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, RepositoryEvaluateJob.STATUS_FAILED)
+
+    def test_result_not_reported(self):
+        def request_nlp_evaluate(user_authorization, data):
+            # A manual evaluation of the same language
+            RepositoryEvaluateResult.objects.create(
+                repository_update=self.update,
+                intent_results=RepositoryEvaluateResultScore.objects.create(),
+                entity_results=RepositoryEvaluateResultScore.objects.create())
+            return mock.Mock(status_code=200, text='{}')
+
+        with mock.patch.object(
+                Repository,
+                'request_nlp_evaluate',
+                side_effect=request_nlp_evaluate):
+            run_evaluate_job()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, RepositoryEvaluateJob.STATUS_SUCCESS)
+        self.assertIsNone(self.job.evaluate_result)
+
+    @override_settings(JOB_LEASE=60)
+    def test_finished_after_lease_expired(self):
+        self.job.start()
+        RepositoryEvaluateJob.objects.filter(pk=self.job.pk).update(
+            started_at=timezone.now() - timedelta(seconds=120))
+        job, created = RepositoryEvaluateJob.enqueue(
+            self.repository,
+            languages.LANGUAGE_EN,
+            self.owner)
+        self.assertFalse(self.job.finish(True))
+        self.assertEqual(self.job.status, RepositoryEvaluateJob.STATUS_FAILED)
+        self.assertEqual(self.job.log, 'Job lease expired.')
+
+
+class RepositoryCloneTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner@user.com', 'owner')
+        self.user = User.objects.create_user('user@user.com', 'user')
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+        self.repository.categories.add(
+            RepositoryCategory.objects.create(name='ID'))
+        self.example = RepositoryExample.objects.create(
+            repository_update=self.repository.current_update(),
+            text='my name is Douglas',
+            intent='greet')
+        RepositoryExampleEntity.objects.create(
+            repository_example=self.example,
+            start=11,
+            end=18,
+            entity='name')
+        entity = RepositoryEntity.objects.get(
+            repository=self.repository,
+            value='name')
+        entity.set_label('subject')
+        entity.save()
+        RepositoryExample.objects.create(
+            repository_update=self.repository.current_update(),
+            text='bye',
+            intent='bye').delete()
+        translation = RepositoryTranslatedExample.objects.create(
+            original_example=self.example,
+            language=languages.LANGUAGE_PT,
+            text='meu nome é Douglas')
+        RepositoryTranslatedExampleEntity.objects.create(
+            repository_translated_example=translation,
+            start=11,
+            end=18,
+            entity='name')
+        RepositoryTranslatedExample.objects.create(
+            original_example=RepositoryExample.objects.create(
+                repository_update=self.repository.current_update(),
+                text='hi',
+                intent='greet'),
+            language=languages.LANGUAGE_PT,
+            text='oi')
+        evaluate = RepositoryEvaluate.objects.create(
+            repository_update=self.repository.current_update(),
+            text='my name is John',
+            intent='greet')
+        evaluate.entities.create(
+            start=11,
+            end=15,
+            entity='name')
+        self.clone = Repository.objects.create(
+            owner=self.user,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+
+    def test_clone_to(self):
+        counts = self.repository.clone_to(self.clone, batch_size=1)
+        self.assertEqual(dict(counts), {
+            'labels': 1,
+            'entities': 1,
+            'examples': 2,
+            'translations': 2,
+            'evaluations': 1,
+            'categories': 1,
+        })
+        self.assertEqual(
+            list(self.clone.categories.values_list('name', flat=True)),
+            ['ID'])
+
+        entity = RepositoryEntity.objects.get(
+            repository=self.clone,
+            value='name')
+        self.assertEqual(entity.value, 'name')
+        self.assertEqual(entity.label.repository, self.clone)
+        self.assertEqual(entity.label.value, 'subject')
+
+        example = self.clone.examples().get(text='my name is Douglas')
+        self.assertEqual(example.intent, 'greet')
+        self.assertEqual(
+            example.repository_update,
+            self.clone.current_update())
+        self.assertEqual(example.entities.get().entity, entity)
+        self.assertFalse(self.clone.examples().filter(text='bye').exists())
+
+        translation = example.get_translation(languages.LANGUAGE_PT)
+        self.assertEqual(
+            translation.repository_update,
+            self.clone.current_update(languages.LANGUAGE_PT))
+        self.assertEqual(translation.entities.get().entity, entity)
+        self.assertTrue(translation.has_valid_entities)
+        self.assertTrue(
+            self.clone.examples().get(text='hi').get_translation(
+                languages.LANGUAGE_PT).has_valid_entities)
+
+        evaluate = self.clone.evaluations().get()
+        self.assertEqual(evaluate.text, 'my name is John')
+        self.assertEqual(evaluate.entities.get().entity, entity)
+
+        # The source is untouched
+        self.assertEqual(self.repository.examples().count(), 2)
+        self.assertEqual(
+            RepositoryEntity.objects.get(
+                repository=self.repository,
+                value='name').label.repository,
+            self.repository)
+
+    def test_run_job(self):
+        job = RepositoryCloneJob.objects.create(
+            repository=self.repository,
+            language=self.repository.language,
+            by=self.user,
+            clone=self.clone)
+        run_clone_job()
+        job.refresh_from_db()
+        self.assertEqual(job.status, RepositoryCloneJob.STATUS_SUCCESS)
+        self.assertIn('2 examples', job.log)
+        self.assertEqual(self.clone.examples().count(), 2)
+        self.assertIsNone(run_clone_job())
+
+    def test_run_job_error(self):
+        job = RepositoryCloneJob.objects.create(
+            repository=self.repository,
+            language=self.repository.language,
+            by=self.user,
+            clone=self.clone)
+        with mock.patch.object(
+                Repository,
+                'clone_to',
+                side_effect=ValueError('bad data')):
+            run_clone_job()
+        job.refresh_from_db()
+        self.assertEqual(job.status, RepositoryCloneJob.STATUS_FAILED)
+        self.assertEqual(job.log, 'ValueError: bad data')
+
+
+class RepositoryEvaluateResultVersionTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner@user.com', 'owner')
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+
+    def create_result(self, language=languages.LANGUAGE_EN):
+        return RepositoryEvaluateResult.objects.create_report(
+            self.repository.current_update(language),
+            {
+                'matrix_chart': 'https://example.com/matrix.png',
+                'confidence_chart': 'https://example.com/confidence.png',
+                'intent_results': {},
+                'entity_results': {},
+            })
+
+    def test_versions(self):
+        self.assertEqual(self.create_result().version, 1)
+        self.assertEqual(
+            self.create_result(languages.LANGUAGE_PT).version,
+            2)
+        last = self.create_result()
+        self.assertEqual(last.version, 3)
+        last.log = '[]'
+        last.save()
+        last.refresh_from_db()
+        self.assertEqual(last.version, 3)
+        self.assertEqual(
+            RepositoryEvaluateResultCounter.objects.get(
+                repository=self.repository).last_version,
+            3)
+
+    def test_invalid_report(self):
+        for report in [
+                {'intents_list': [{'intent': 'Not Valid', 'score': {}}]},
+                {'entities_list': [{'entity': 'unknown', 'score': {}}]}]:
+            with self.assertRaises(ValidationError):
+                RepositoryEvaluateResult.objects.create_report(
+                    self.repository.current_update(),
+                    report)
+        self.assertFalse(RepositoryEvaluateResult.objects.exists())
+
+    def test_deleted_version_not_reused(self):
+        self.create_result()
+        self.create_result().delete()
+        self.assertEqual(self.create_result().version, 3)
+
+    def test_stale_repository_save(self):
+        repository = Repository.objects.get(pk=self.repository.pk)
+        self.create_result()
+        repository.name = 'Changed'
+        repository.save()
+        self.assertEqual(self.create_result().version, 2)
+
+    def test_repository_save(self):
+        # The counter doesn't change how repositories are saved
+        self.create_result()
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                self.repository.save(force_insert=True)
+        Repository.objects.filter(pk=self.repository.pk).delete()
+        self.repository.save()
+        self.assertTrue(
+            Repository.objects.filter(pk=self.repository.pk).exists())
+
+    def test_unique_version(self):
+        result = self.create_result()
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                RepositoryEvaluateResult.objects.filter(
+                    pk=self.create_result().pk).update(version=result.version)
+
+
+@skipUnless(
+    connection.vendor == 'postgresql',
+    'Concurrent transactions need a database server')
+class RepositoryEvaluateResultConcurrentVersionTestCase(TransactionTestCase):
+    def test_concurrent_versions(self):
+        owner = User.objects.create_user('owner@user.com', 'owner')
+        repository = Repository.objects.create(
+            owner=owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+        update = repository.current_update()
+        errors = []
+
+        def create_result():
+            try:
+                RepositoryEvaluateResult.objects.create_report(update, {
+                    'matrix_chart': 'https://example.com/matrix.png',
+                    'confidence_chart': 'https://example.com/c.png',
+                    'intent_results': {},
+                    'entity_results': {},
+                })
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create_result) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            sorted(repository.evaluations_results().values_list(
+                'version',
+                flat=True)),
+            list(range(1, 9)))
+
+
+class RepositoryCurrentUpdateTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner@user.com', 'owner')
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+
+    def test_one_open_update(self):
+        self.repository.current_update()
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                RepositoryUpdate.objects.create(
+                    repository=self.repository,
+                    language=languages.LANGUAGE_EN)
+        RepositoryUpdate.objects.create(
+            repository=self.repository,
+            language=languages.LANGUAGE_PT)
+
+    def test_created_by_other_worker(self):
+        update = self.repository.current_update()
+        get = QuerySet.get
+        calls = []
+
+        def get_after_other_worker(queryset, *args, **kwargs):
+            # The first read happens before the other worker commits
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise queryset.model.DoesNotExist()
+            return get(queryset, *args, **kwargs)
+
+        with mock.patch.object(
+                QuerySet,
+                'get',
+                autospec=True,
+                side_effect=get_after_other_worker):
+            self.assertEqual(self.repository.current_update(), update)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(
+            self.repository.updates.filter(
+                training_started_at__isnull=True).count(),
+            1)
+
+
+@skipUnless(
+    connection.vendor == 'postgresql',
+    'Concurrent transactions need a database server')
+class RepositoryCurrentUpdateStressTestCase(TransactionTestCase):
+    def test_concurrent_current_update(self):
+        owner = User.objects.create_user('owner@user.com', 'owner')
+        repository = Repository.objects.create(
+            owner=owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+        barrier = threading.Barrier(16)
+        updates = []
+        errors = []
+
+        def current_update():
+            try:
+                barrier.wait()
+                with transaction.atomic():
+                    update = repository.current_update(
+                        languages.LANGUAGE_PT)
+                    RepositoryExample.objects.create(
+                        repository_update=update,
+                        text='hi',
+                        intent='greet')
+                updates.append(update.pk)
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=current_update)
+                   for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(set(updates)), 1)
+        self.assertEqual(
+            repository.current_update(languages.LANGUAGE_PT).added.count(),
+            16)
+
+
+@skipUnless(
+    connection.vendor == 'postgresql',
+    'Concurrent transactions need a database server')
+class RepositoryUpdateTrainingLockTestCase(TransactionTestCase):
+    def test_concurrent_start_training(self):
+        owner = User.objects.create_user('owner@user.com', 'owner')
+        repository = Repository.objects.create(
+            owner=owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+        update = repository.current_update()
+        barrier = threading.Barrier(8)
+        started = []
+        refused = []
+
+        def start_training():
+            stale = RepositoryUpdate.objects.get(pk=update.pk)
+            try:
+                barrier.wait()
+                stale.start_training(owner)
+                started.append(stale)
+            except RepositoryUpdateAlreadyStartedTraining:
+                refused.append(stale)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=start_training)
+                   for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(started), 1)
+        self.assertEqual(len(refused), 7)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class ReplicaRouterTestCase(TransactionTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.read_dbs = []
+        patcher = mock.patch.object(
+            replicas.status,
+            'healthy_replicas',
+            return_value=['replica_2'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def view(self, write=False):
+        def get_response(request):
+            self.read_dbs.append(router.db_for_read(Repository))
+            if write:
+                User.objects.create_user('fake@user.com', 'fake')
+                self.read_dbs.append(router.db_for_read(Repository))
+            return HttpResponse()
+        return replicas.ReplicaMiddleware(get_response)
+
+    def test_read_from_replica(self):
+        self.view()(self.factory.get('/'))
+        self.assertEqual(self.read_dbs, ['replica_2'])
+        self.assertEqual(router.db_for_read(Repository), 'default')
+        self.assertEqual(router.db_for_write(Repository), 'default')
+
+    def test_write_request(self):
+        response = self.view(write=True)(self.factory.post('/'))
+        self.assertEqual(self.read_dbs, ['default', 'default'])
+        self.assertIn(replicas.PIN_COOKIE, response.cookies)
+
+    def test_read_own_writes(self):
+        self.view(write=True)(self.factory.get('/'))
+        self.assertEqual(self.read_dbs, ['replica_2', 'default'])
+
+    def test_pinned_by_cookie(self):
+        request = self.factory.get('/')
+        request.COOKIES[replicas.PIN_COOKIE] = '1'
+        self.view()(request)
+        self.assertEqual(self.read_dbs, ['default'])
+
+    def test_pinned_by_authorization(self):
+        self.view()(self.factory.post('/', HTTP_AUTHORIZATION='Token 1'))
+        self.view()(self.factory.get('/', HTTP_AUTHORIZATION='Token 1'))
+        self.view()(self.factory.get('/', HTTP_AUTHORIZATION='Token 2'))
+        self.assertEqual(self.read_dbs, ['default', 'default', 'replica_2'])
+
+    def test_no_healthy_replica(self):
+        replicas.status.healthy_replicas.return_value = []
+        self.view()(self.factory.get('/'))
+        self.assertEqual(self.read_dbs, ['default'])
+
+    def test_migrate_only_primary(self):
+        self.assertTrue(router.allow_migrate('default', 'common'))
+        self.assertFalse(router.allow_migrate('replica_1', 'common'))
+
+    def test_replica_down(self):
+        def view(request):
+            self.read_dbs.append(router.db_for_read(Repository))
+            if len(self.read_dbs) == 1:
+                raise OperationalError('server closed the connection')
+            return HttpResponse('retried')
+
+        def get_response(request):
+            # Like the Django handler with a view exception
+            try:
+                return view(request)
+            except OperationalError as e:
+                return middleware.process_exception(request, e)
+
+        middleware = replicas.ReplicaMiddleware(get_response)
+        request = self.factory.get('/')
+        request.resolver_match = ResolverMatch(view, (), {})
+        replica = mock.Mock()
+        with mock.patch.object(replicas.status, 'mark_down') as mark_down, \
+                mock.patch.object(replicas, 'connections', {
+                    'default': connection,
+                    'replica_2': replica}):
+            response = middleware(request)
+        mark_down.assert_called_once_with('replica_2')
+        replica.close.assert_called_once_with()
+        self.assertEqual(response.content, b'retried')
+        self.assertEqual(self.read_dbs, ['replica_2', 'default'])
+
+    def test_other_errors_not_retried(self):
+        replicas.read_from('replica_2')
+        self.addCleanup(replicas.read_from, None)
+        self.assertIsNone(replicas.ReplicaMiddleware(None).process_exception(
+            self.factory.get('/'),
+            ValueError()))
+
+
+class ReplicaStatusTestCase(TestCase):
+    @override_settings(
+        DATABASE_REPLICAS=['replica_1', 'replica_2', 'replica_3'],
+        REPLICA_MAX_LAG=5)
+    def test_check(self):
+        lags = {'replica_1': 0.5, 'replica_2': 30, 'replica_3': None}
+        status = replicas.ReplicaStatus()
+        with mock.patch.object(
+                replicas,
+                'replica_lag',
+                side_effect=lags.get) as replica_lag:
+            self.assertEqual(status.healthy_replicas(), ['replica_1'])
+            status.healthy_replicas()
+        # Checked once in REPLICA_CHECK_INTERVAL
+        self.assertEqual(replica_lag.call_count, 3)
+
+    def test_lag(self):
+        self.assertEqual(replicas.replica_lag('default'), 0)
+
+    def test_mark_down(self):
+        status = replicas.ReplicaStatus()
+        status.healthy = ['replica_1', 'replica_2']
+        status.checked_at = time.time()
+        status.mark_down('replica_1')
+        self.assertEqual(status.healthy_replicas(), ['replica_2'])
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_pin_cache_check(self):
+        errors = replicas.check_pin_cache(None)
+        self.assertEqual([e.id for e in errors], ['common.E001'])
+        with override_settings(CACHES={'default': {
+                'BACKEND':
+                'django.core.cache.backends.memcached.MemcachedCache',
+                'LOCATION': '127.0.0.1:11211'}}):
+            self.assertEqual(replicas.check_pin_cache(None), [])
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(replicas.check_pin_cache(None), [])
+
+
+class RepositoryTranslatedExampleEntitiesDeletedTestCase(TransactionTestCase):
+    # Deleted entities update the translations on commit
+    def setUp(self):
+        owner = User.objects.create_user('fake@user.com', 'user', '123456')
+        self.repository = Repository.objects.create(
+            owner=owner,
+            slug='test',
+            language=languages.LANGUAGE_EN)
+        self.example = RepositoryExample.objects.create(
+            repository_update=self.repository.current_update('en'),
+            text='my name is Douglas',
+            intent='greet')
+        self.entity = RepositoryExampleEntity.objects.create(
+            repository_example=self.example,
+            start=12,
+            end=19,
+            entity='name')
+        self.translate = RepositoryTranslatedExample.objects.create(
+            original_example=self.example,
+            language=languages.LANGUAGE_PT,
+            text='meu nome é Douglas')
+
+    def test_original_entity_deleted(self):
+        self.assertFalse(self.translate.has_valid_entities)
+        self.entity.delete()
+        self.translate.refresh_from_db()
+        self.assertTrue(self.translate.has_valid_entities)
+
+    def test_translated_entity_deleted(self):
+        entity = RepositoryTranslatedExampleEntity.objects.create(
+            repository_translated_example=self.translate,
+            start=11,
+            end=18,
+            entity='name')
+        self.assertTrue(self.translate.has_valid_entities)
+
+        with transaction.atomic():
+            RepositoryTranslatedExampleEntity.objects.get(
+                pk=entity.pk).delete()
+            self.translate.refresh_from_db()
+            self.assertTrue(self.translate.has_valid_entities)
+        self.translate.refresh_from_db()
+        self.assertFalse(self.translate.has_valid_entities)
+
+    def test_repository_deleted(self):
+        RepositoryTranslatedExampleEntity.objects.create(
+            repository_translated_example=self.translate,
+            start=11,
+            end=18,
+            entity='name')
+        with mock.patch.object(
+                RepositoryTranslatedExampleQueryset,
+                'update_has_valid_entities') as update_has_valid_entities:
+            self.repository.delete()
+        update_has_valid_entities.assert_called_once_with()
+        self.assertFalse(RepositoryTranslatedExample.objects.exists())
+
+
+class RepositoryChangedAtTestCase(TransactionTestCase):
+    # Changes set changed_at on commit
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            'fake@user.com',
+            'user',
+            '123456')
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            slug='test',
+            language=languages.LANGUAGE_EN)
+        self.example = RepositoryExample.objects.create(
+            repository_update=self.repository.current_update(),
+            text='my name is Douglas',
+            intent='greet')
+
+    def changed_at(self):
+        return Repository.objects.get(pk=self.repository.pk).changed_at
+
+    def assertChanged(self, changed_at):
+        self.assertGreater(self.changed_at(), changed_at)
+
+    def test_example_entity(self):
+        changed_at = self.changed_at()
+        RepositoryExampleEntity.objects.create(
+            repository_example=self.example,
+            start=11,
+            end=18,
+            entity='name')
+        self.assertChanged(changed_at)
+
+    def test_translation_deleted(self):
+        translation = RepositoryTranslatedExample.objects.create(
+            original_example=self.example,
+            language=languages.LANGUAGE_PT,
+            text='meu nome é Douglas')
+        changed_at = self.changed_at()
+        translation.delete()
+        self.assertChanged(changed_at)
+
+    def test_authorization(self):
+        user = User.objects.create_user('user@user.com', 'other')
+        authorization = self.repository.get_user_authorization(user)
+        changed_at = self.changed_at()
+        authorization.role = RepositoryAuthorization.ROLE_CONTRIBUTOR
+        authorization.save()
+        self.assertChanged(changed_at)
+
+    def test_owner_nickname(self):
+        changed_at = self.changed_at()
+        self.owner.last_login = timezone.now()
+        self.owner.save(update_fields=['last_login'])
+        self.assertEqual(self.changed_at(), changed_at)
+        self.owner.nickname = 'owner'
+        self.owner.save()
+        self.assertChanged(changed_at)
+
+    def test_category(self):
+        category = RepositoryCategory.objects.create(name='Category')
+        self.repository.categories.add(category)
+        changed_at = self.changed_at()
+        category.name = 'Renamed'
+        category.save()
+        self.assertChanged(changed_at)
+
+    def test_once_by_transaction(self):
+        changed_at = self.changed_at()
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                for i in range(3):
+                    RepositoryExample.objects.create(
+                        repository_update=self.repository.current_update(),
+                        text='hi {}'.format(i),
+                        intent='greet')
+                self.assertEqual(self.changed_at(), changed_at)
+        self.assertEqual(
+            len([
+                query
+                for query in queries.captured_queries
+                if query['sql'].startswith('UPDATE') and
+                'changed_at' in query['sql']
+            ]),
+            1)
+        self.assertChanged(changed_at)
+
+    def test_savepoint_rolled_back(self):
+        changed_at = self.changed_at()
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    RepositoryExample.objects.create(
+                        repository_update=self.repository.current_update(),
+                        text='hi',
+                        intent='greet')
+                    raise IntegrityError()
+            except IntegrityError:
+                pass
+            RepositoryExample.objects.create(
+                repository_update=self.repository.current_update(),
+                text='hello',
+                intent='greet')
+        self.assertChanged(changed_at)
+
+    def test_transaction_rolled_back(self):
+        changed_at = self.changed_at()
+        try:
+            with transaction.atomic():
+                RepositoryExample.objects.create(
+                    repository_update=self.repository.current_update(),
+                    text='hi',
+                    intent='greet')
+                raise IntegrityError()
+        except IntegrityError:
+            pass
+        self.assertEqual(self.changed_at(), changed_at)
+        RepositoryExample.objects.create(
+            repository_update=self.repository.current_update(),
+            text='hello',
+            intent='greet')
+        self.assertChanged(changed_at)
+
+    def test_rolled_back_update_dropped(self):
+        other = Repository.objects.create(
+            owner=self.owner,
+            slug='other',
+            language=languages.LANGUAGE_EN)
+        changed_at = self.changed_at()
+        try:
+            with transaction.atomic():
+                RepositoryExample.objects.create(
+                    repository_update=self.repository.current_update(),
+                    text='hi',
+                    intent='greet')
+                raise IntegrityError()
+        except IntegrityError:
+            pass
+        with transaction.atomic():
+            RepositoryExample.objects.create(
+                repository_update=other.current_update(),
+                text='hello',
+                intent='greet')
+            self.assertEqual(
+                RepositoryChange.get('default').lookups.get('updates__pk'),
+                {other.current_update().pk})
+        self.assertEqual(self.changed_at(), changed_at)
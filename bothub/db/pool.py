@@ -0,0 +1,134 @@
+import os
+import time
+import logging
+import threading
+
+from collections import deque
+
+from bothub.health.metrics import registry
+
+
+logger = logging.getLogger('bothub.db.pool')
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool(object):
+    """
+    Connections of a process shared by its threads (greenlets in gevent
+    workers), at most size open together. Connections idle for more than
+    check_after seconds are checked before being reused and the ones
+    older than max_age seconds are closed when returned.
+    """
+
+    def __init__(self, connect, check, size, timeout=10, max_age=600,
+                 check_after=30, name='default'):
+        self.connect = connect
+        self.check = check
+        self.size = size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.check_after = check_after
+        self.name = name
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.semaphore = threading.BoundedSemaphore(size)
+        # (connection, created_at, returned_at), the last returned first
+        self.idle = deque()
+        self.in_use = {}
+        self.opened = 0
+
+    def count(self, result):
+        registry.inc('bothub_database_connections_total', {
+            'database': self.name,
+            'result': result,
+        })
+
+    def get(self):
+        start = time.perf_counter()
+        if not self.semaphore.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                'No {} database connection free after {}s ({} in use)'.format(
+                    self.name,
+                    self.timeout,
+                    self.size))
+        registry.observe(
+            'bothub_database_pool_wait_seconds',
+            time.perf_counter() - start,
+            {'database': self.name})
+        try:
+            connection, created_at = self.get_idle()
+            if connection is None:
+                connection = self.connect()
+                created_at = time.time()
+                self.opened += 1
+                self.count('new')
+        except BaseException:
+            self.semaphore.release()
+            raise
+        with self.lock:
+            self.in_use[id(connection)] = created_at
+        return connection
+
+    def get_idle(self):
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None, None
+                connection, created_at, returned_at = self.idle.pop()
+            if time.time() - returned_at < self.check_after or \
+               self.check(connection):
+                self.count('reused')
+                return connection, created_at
+            self.discard(connection)
+
+    def put(self, connection, reusable=True):
+        with self.lock:
+            created_at = self.in_use.pop(id(connection), None)
+        if created_at is None:
+            # Not from this pool (opened before a fork)
+            self.discard(connection)
+            return
+        try:
+            now = time.time()
+            if reusable and now - created_at < self.max_age:
+                with self.lock:
+                    self.idle.append((connection, created_at, now))
+            else:
+                self.discard(connection)
+        finally:
+            self.semaphore.release()
+
+    def discard(self, connection):
+        self.count('discarded')
+        try:
+            connection.close()
+        except Exception as e:
+            logger.warning('closing {} connection failed: {}'.format(
+                self.name,
+                e))
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, deque()
+        for connection, created_at, returned_at in idle:
+            self.discard(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, factory):
+    """
+    Pool of key in this process, created by factory. The pools inherited
+    from the parent process (gunicorn master) aren't used, their
+    connections belong to it.
+    """
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.pid != os.getpid():
+            pool = _pools[key] = factory()
+        return pool
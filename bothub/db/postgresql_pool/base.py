@@ -0,0 +1,80 @@
+from functools import partial
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.base import Database
+from psycopg2 import extensions
+
+from bothub.db.pool import ConnectionPool
+from bothub.db.pool import PoolTimeout
+from bothub.db.pool import get_pool
+
+
+def check_connection(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not connection.autocommit:
+            connection.rollback()
+    except Database.Error:
+        return False
+    return True
+
+
+def is_reusable(connection):
+    if connection.closed:
+        return False
+    try:
+        if connection.get_transaction_status() != \
+           extensions.TRANSACTION_STATUS_IDLE:
+            connection.rollback()
+    except Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend taking its connections from a ConnectionPool of the
+    process, closing a connection returns it to the pool. Use it with
+    CONN_MAX_AGE 0, so connections go back to the pool at the end of
+    each request, and set POOL_SIZE, POOL_TIMEOUT, POOL_MAX_AGE and
+    POOL_CHECK_AFTER in the database settings.
+    """
+
+    def get_pool(self, conn_params):
+        return get_pool(
+            (self.alias, repr(sorted(conn_params.items()))),
+            partial(
+                ConnectionPool,
+                partial(Database.connect, **conn_params),
+                check_connection,
+                self.settings_dict['POOL_SIZE'],
+                timeout=self.settings_dict.get('POOL_TIMEOUT', 10),
+                max_age=self.settings_dict.get('POOL_MAX_AGE', 600),
+                check_after=self.settings_dict.get('POOL_CHECK_AFTER', 30),
+                name=self.alias))
+
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        try:
+            connection = self.pool.get()
+        except PoolTimeout as e:
+            raise Database.OperationalError(str(e))
+
+        # Same as the PostgreSQL backend, for new and reused connections
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.put(
+                    self.connection,
+                    reusable=is_reusable(self.connection))
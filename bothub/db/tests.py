@@ -0,0 +1,89 @@
+import threading
+
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from .pool import ConnectionPool
+from .pool import PoolTimeout
+from .pool import get_pool
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    def setUp(self):
+        self.healthy = True
+        self.pool = ConnectionPool(
+            FakeConnection,
+            lambda connection: self.healthy,
+            2,
+            timeout=0.05,
+            max_age=600,
+            check_after=30)
+
+    def test_reuse(self):
+        connection = self.pool.get()
+        self.pool.put(connection)
+        self.assertIs(self.pool.get(), connection)
+        self.assertEqual(self.pool.opened, 1)
+
+    def test_bounded(self):
+        self.pool.get()
+        self.pool.get()
+        with self.assertRaises(PoolTimeout):
+            self.pool.get()
+
+    def test_wait_for_connection(self):
+        first = self.pool.get()
+        self.pool.get()
+        self.pool.timeout = 5
+        threading.Timer(0.05, self.pool.put, [first]).start()
+        self.assertIs(self.pool.get(), first)
+
+    def test_not_reusable(self):
+        connection = self.pool.get()
+        self.pool.put(connection, reusable=False)
+        self.assertTrue(connection.closed)
+        self.assertIsNot(self.pool.get(), connection)
+        self.assertEqual(self.pool.opened, 2)
+
+    def test_check_idle(self):
+        connection = self.pool.get()
+        self.pool.put(connection)
+        self.healthy = False
+        with mock.patch('bothub.db.pool.time.time', return_value=10 ** 10):
+            reused = self.pool.get()
+        self.assertTrue(connection.closed)
+        self.assertIsNot(reused, connection)
+
+    def test_max_age(self):
+        connection = self.pool.get()
+        with mock.patch('bothub.db.pool.time.time', return_value=10 ** 10):
+            self.pool.put(connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(len(self.pool.idle), 0)
+
+    def test_connect_error(self):
+        self.pool.connect = mock.Mock(side_effect=OSError)
+        for i in range(3):
+            with self.assertRaises(OSError):
+                self.pool.get()
+
+    def test_get_pool(self):
+        pool = get_pool(('test', ''), lambda: self.pool)
+        self.assertIs(pool, self.pool)
+        self.assertIs(get_pool(('test', ''), ConnectionPool), self.pool)
+        with mock.patch('bothub.db.pool.os.getpid', return_value=-1):
+            self.assertIsNot(
+                get_pool(('test', ''), lambda: ConnectionPool(
+                    FakeConnection,
+                    bool,
+                    1)),
+                self.pool)
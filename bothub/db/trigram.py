@@ -0,0 +1,47 @@
+"""
+Trigram indexes of the searches of bothub.api.search. Only PostgreSQL has
+pg_trgm, other databases search without index.
+"""
+
+from django.db.migrations.operations.base import Operation
+
+
+class CreateTrigramIndexes(Operation):
+    """
+    Create the GIN trigram indexes (name, table, column) of UPPER(column),
+    like the icontains and istartswith lookups, in PostgreSQL.
+    """
+
+    reversible = True
+
+    def __init__(self, indexes):
+        self.indexes = indexes
+
+    def deconstruct(self):
+        return (self.__class__.__name__, [self.indexes], {})
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, table, column in self.indexes:
+            schema_editor.execute(
+                'CREATE INDEX {} ON {} USING gin (UPPER({}) gin_trgm_ops)'
+                .format(name, table, column))
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for name, table, column in self.indexes:
+            schema_editor.execute('DROP INDEX IF EXISTS {}'.format(name))
+
+    def describe(self):
+        return 'Create trigram indexes {}'.format(', '.join([
+            name
+            for name, table, column in self.indexes
+        ]))
@@ -0,0 +1 @@
+default_app_config = 'bothub.health.apps.HealthConfig'
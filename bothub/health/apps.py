@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class HealthConfig(AppConfig):
-    name = 'health'
+    name = 'bothub.health'
+
+    def ready(self):
+        if settings.REQUEST_TIMING_SERIALIZERS:
+            from .timing import instrument_serializers
+            instrument_serializers()
@@ -1,7 +1,14 @@
+import os
+import time
 import logging
+import threading
+
+from collections import OrderedDict
 
 from decouple import config
-from rest_framework import status
+from django.conf import settings
+
+from . import metrics
 
 
 logger = logging.getLogger('bothub.health.checks')
@@ -14,12 +21,19 @@ CHECK_ACCESSIBLE_API_URL = config(
 def check_database_connection(**kwargs):
     from django.db import connections
     from django.db.utils import OperationalError
-    if len(connections.all()) == 0:
+    # A replica down doesn't make the app unavailable, reads fall back to
+    # the primary
+    primary = [
+        conn
+        for conn in connections.all()
+        if conn.alias not in settings.DATABASE_REPLICAS]
+    if len(primary) == 0:
         return False
-    logger.info('found {} database connection'.format(len(connections.all())))
-    for i, conn in enumerate(connections.all(), 1):
+    logger.info('found {} database connection'.format(len(primary)))
+    for i, conn in enumerate(primary, 1):
         try:
-            conn.cursor()
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
             logger.info('#{} db connection OKAY'.format(i))
         except OperationalError:
             logger.warning('#{} db connection ERROR'.format(i))
@@ -27,19 +41,120 @@ def check_database_connection(**kwargs):
     return True
 
 
-def check_accessible_api(request, **kwargs):
+def check_nlp_service(**kwargs):
     import requests
-    if CHECK_ACCESSIBLE_API_URL:
-        logger.info('requesting {}'.format(CHECK_ACCESSIBLE_API_URL))
-        response = requests.get(CHECK_ACCESSIBLE_API_URL)
-    else:
-        url = 'http://{}/200/'.format(
-            request.META.get('HTTP_HOST'))
-        logger.info('requesting to {}'.format(url))
-        response = requests.get(url)
+    try:
+        response = requests.get(
+            settings.BOTHUB_NLP_BASE_URL,
+            timeout=settings.HEALTH_CHECK_TIMEOUT)
+    except requests.RequestException as e:
+        logger.warning('NLP service unreachable: {}'.format(e))
+        return False
+    logger.info('NLP service response status code {}'.format(
+        response.status_code))
+    return response.status_code < 500
+
+
+def check_accessible_api(**kwargs):
+    import requests
+    from rest_framework import status
+    logger.info('requesting {}'.format(CHECK_ACCESSIBLE_API_URL))
+    try:
+        response = requests.get(
+            CHECK_ACCESSIBLE_API_URL,
+            timeout=settings.HEALTH_CHECK_TIMEOUT)
+    except requests.RequestException as e:
+        logger.warning('{} unreachable: {}'.format(
+            CHECK_ACCESSIBLE_API_URL,
+            e))
+        return False
     logger.info('{} response status code {}'.format(
         CHECK_ACCESSIBLE_API_URL,
         response.status_code))
-    if response.status_code is status.HTTP_200_OK:
-        return True
-    return False
+    return response.status_code == status.HTTP_200_OK
+
+
+def readiness_checks():
+    checks = [
+        check_database_connection,
+        check_nlp_service,
+    ]
+    # Only an external URL, requesting this same server would hold a
+    # second worker while the probe waits
+    if CHECK_ACCESSIBLE_API_URL:
+        checks.append(check_accessible_api)
+    return checks
+
+
+class Readiness(object):
+    """
+    Run the readiness checks in a background thread every
+    HEALTH_CHECK_INTERVAL seconds, probes only read the last results.
+    """
+
+    def __init__(self, checks=readiness_checks):
+        self.checks = checks
+        self.lock = threading.Lock()
+        self.results = None
+        self.checked_at = None
+        self.pid = None
+
+    def run_checks(self):
+        results = OrderedDict()
+        for check in self.checks():
+            try:
+                results[check.__name__] = bool(check())
+            except Exception:
+                logger.exception('{} failed'.format(check.__name__))
+                results[check.__name__] = False
+        self.results = results
+        self.checked_at = time.time()
+        return results
+
+    def refresh(self):
+        """
+        Run the checks from the background thread. Any error is logged,
+        a dead thread would leave the results stale.
+        """
+        from django.db import connections
+        try:
+            self.run_checks()
+            # Don't keep a connection open in the checks thread
+            for conn in connections.all():
+                conn.close()
+        except Exception:
+            logger.exception('readiness checks failed')
+
+    def loop(self):
+        while True:
+            time.sleep(settings.HEALTH_CHECK_INTERVAL)
+            self.refresh()
+
+    def start(self):
+        # Once per process, a thread doesn't survive the gunicorn fork
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            thread = threading.Thread(
+                target=self.loop,
+                name='bothub-readiness')
+            thread.daemon = True
+            thread.start()
+
+    def get_results(self):
+        """
+        Return the checks results and their age in seconds, running them
+        only when there are none yet.
+        """
+        if settings.HEALTH_CHECK_INTERVAL > 0:
+            self.start()
+        if self.results is None or settings.HEALTH_CHECK_INTERVAL <= 0:
+            metrics.cache_miss('readiness')
+            self.run_checks()
+        else:
+            metrics.cache_hit('readiness')
+        return self.results, time.time() - self.checked_at
+
+
+readiness = Readiness()
@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import socket
+import threading
+
+from functools import wraps
+
+from django.conf import settings
+
+
+DEFAULT_BUCKETS = (
+    .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+
+COUNTER = 'counter'
+HISTOGRAM = 'histogram'
+GAUGE = 'gauge'
+
+
+def state_path(directory, hostname, pid):
+    """
+    File of the metrics of a worker in METRICS_DIR.
+    """
+    return os.path.join(directory, '{}-{}.json'.format(hostname, pid))
+
+
+def labels_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{{{}}}'.format(','.join([
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', '\\\\').replace('"', '\\"').replace(
+                '\n',
+                '\\n'))
+        for name, value in labels]))
+
+
+class Registry(object):
+    """
+    Counters and histograms of this process. When METRICS_DIR is set each
+    process (gunicorn worker) saves its values to its own file there, at
+    most every METRICS_FLUSH_INTERVAL seconds, and the metrics endpoint
+    sums the files of all workers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.hostname = socket.gethostname()
+        self.started_at = time.time()
+        self.flushed_at = 0
+        self.types = {}
+        self.counters = {}
+        self.histograms = {}
+
+    def check_fork(self):
+        # Values inherited from the master process belong to it
+        if self.pid != os.getpid():
+            self.reset()
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, labels_key(labels))
+        with self.lock:
+            self.check_fork()
+            self.types[name] = COUNTER
+            self.counters[key] = self.counters.get(key, 0) + value
+        self.maybe_flush()
+
+    def observe(self, name, value, labels=None):
+        key = (name, labels_key(labels))
+        with self.lock:
+            self.check_fork()
+            self.types[name] = HISTOGRAM
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'buckets': [0] * len(DEFAULT_BUCKETS),
+                    'sum': 0,
+                    'count': 0,
+                }
+            for i, bound in enumerate(DEFAULT_BUCKETS):
+                if value <= bound:
+                    histogram['buckets'][i] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+        self.maybe_flush()
+
+    def state(self):
+        with self.lock:
+            self.check_fork()
+            return {
+                'pid': self.pid,
+                'hostname': self.hostname,
+                'started_at': self.started_at,
+                'updated_at': time.time(),
+                'types': dict(self.types),
+                'counters': [
+                    [name, labels, value]
+                    for (name, labels), value in self.counters.items()],
+                'histograms': [
+                    [name, labels, dict(histogram, buckets=list(
+                        histogram['buckets']))]
+                    for (name, labels), histogram in
+                    self.histograms.items()],
+            }
+
+    def maybe_flush(self):
+        if settings.METRICS_DIR and time.time() - self.flushed_at >= \
+           settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        self.flushed_at = time.time()
+        state = self.state()
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = state_path(
+            settings.METRICS_DIR,
+            state['hostname'],
+            state['pid'])
+        tmp_path = '{}.tmp'.format(path)
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def collect(self):
+        """
+        States of all workers, this one always up to date.
+        """
+        if not settings.METRICS_DIR:
+            return [self.state()]
+        self.flush()
+        states = []
+        for filename in sorted(os.listdir(settings.METRICS_DIR)):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(
+                        settings.METRICS_DIR,
+                        filename)) as f:
+                    states.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return states
+
+
+registry = Registry()
+
+
+def render(states):
+    types = {}
+    counters = {}
+    histograms = {}
+    for state in states:
+        types.update(state['types'])
+        for name, labels, value in state['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, histogram in state['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, {
+                'buckets': [0] * len(DEFAULT_BUCKETS),
+                'sum': 0,
+                'count': 0,
+            })
+            for i, count in enumerate(histogram['buckets']):
+                total['buckets'][i] += count
+            total['sum'] += histogram['sum']
+            total['count'] += histogram['count']
+
+    lines = []
+    for name in sorted(types.keys()):
+        lines.append('# TYPE {} {}'.format(name, types[name]))
+        if types[name] == COUNTER:
+            for (key_name, labels), value in sorted(counters.items()):
+                if key_name == name:
+                    lines.append('{}{} {}'.format(
+                        name,
+                        format_labels(labels),
+                        value))
+        else:
+            for (key_name, labels), histogram in sorted(histograms.items()):
+                if key_name != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(
+                        DEFAULT_BUCKETS,
+                        histogram['buckets']):
+                    cumulative += count
+                    lines.append('{}_bucket{} {}'.format(
+                        name,
+                        format_labels(labels + (('le', str(bound)),)),
+                        cumulative))
+                lines.append('{}_bucket{} {}'.format(
+                    name,
+                    format_labels(labels + (('le', '+Inf'),)),
+                    histogram['count']))
+                lines.append('{}_sum{} {}'.format(
+                    name,
+                    format_labels(labels),
+                    histogram['sum']))
+                lines.append('{}_count{} {}'.format(
+                    name,
+                    format_labels(labels),
+                    histogram['count']))
+
+    lines.append('# TYPE bothub_worker_info {}'.format(GAUGE))
+    for state in states:
+        lines.append('bothub_worker_info{} 1'.format(format_labels([
+            ('hostname', state['hostname']),
+            ('pid', state['pid']),
+        ])))
+    lines.append('# TYPE bothub_worker_updated_timestamp_seconds {}'.format(
+        GAUGE))
+    for state in states:
+        lines.append('bothub_worker_updated_timestamp_seconds{} {}'.format(
+            format_labels([
+                ('hostname', state['hostname']),
+                ('pid', state['pid']),
+            ]),
+            state['updated_at']))
+    lines.append('# TYPE bothub_metrics_served_by_info {}'.format(GAUGE))
+    lines.append('bothub_metrics_served_by_info{} 1'.format(format_labels([
+        ('hostname', registry.hostname),
+        ('pid', registry.pid),
+    ])))
+    return '\n'.join(lines) + '\n'
+
+
+def cache_hit(cache):
+    registry.inc('bothub_cache_requests_total', {
+        'cache': cache,
+        'result': 'hit',
+    })
+
+
+def cache_miss(cache):
+    registry.inc('bothub_cache_requests_total', {
+        'cache': cache,
+        'result': 'miss',
+    })
+
+
+def nlp_request(operation):
+    """
+    Record latency and status code of a request_nlp_* call.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            status_code = 'error'
+            try:
+                response = func(*args, **kwargs)
+                status_code = response.status_code
+                return response
+            finally:
+                registry.observe(
+                    'bothub_nlp_request_duration_seconds',
+                    time.perf_counter() - start,
+                    {'operation': operation})
+                registry.inc('bothub_nlp_requests_total', {
+                    'operation': operation,
+                    'status': status_code,
+                })
+        return wrapper
+    return decorator
+
+
+def email_sent(kind, duration, result):
+    """
+    Record the time spent sending an email and its result (sent, error).
+    """
+    registry.observe(
+        'bothub_email_send_duration_seconds',
+        duration,
+        {'kind': kind})
+    registry.inc('bothub_emails_total', {
+        'kind': kind,
+        'result': result,
+    })
+
+
+def response_compressed(encoding, size, compressed_size):
+    """
+    Record a compressed response and the bytes it saved.
+    """
+    registry.inc('bothub_compressed_responses_total', {
+        'encoding': encoding,
+    })
+    registry.inc(
+        'bothub_compression_saved_bytes_total',
+        {'encoding': encoding},
+        value=size - compressed_size)
@@ -0,0 +1,134 @@
+import json
+import time
+import random
+import logging
+
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import timing
+from .metrics import registry
+
+
+logger = logging.getLogger('bothub.health.timing')
+
+
+class RequestTimingMiddleware(object):
+    """
+    Measure queries, database, NLP, serializer and total time of a sample
+    of requests, send them as Server-Timing header and log a JSON line.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        self.slow_threshold = settings.REQUEST_TIMING_SLOW_THRESHOLD
+        self.header = settings.REQUEST_TIMING_HEADER
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            start = time.perf_counter()
+            response = self.get_response(request)
+            total = time.perf_counter() - start
+            if self.slow_threshold and total * 1000 >= self.slow_threshold:
+                self.log(request, response, {'total': total})
+            return response
+
+        timings = timing.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            timing.stop()
+
+        metrics = self.metrics(timings)
+        if self.header:
+            response['Server-Timing'] = ', '.join([
+                '{};dur={:.1f}'.format(name, value * 1000)
+                for name, value in metrics.items()
+                if name in ['db', 'nlp', 'serializer', 'total']])
+        self.log(request, response, metrics)
+        return response
+
+    def metrics(self, timings):
+        return {
+            'db': timings.durations.get('db', 0),
+            'db_queries': timings.counts.get('db', 0),
+            'nlp': timings.durations.get('nlp', 0),
+            'nlp_calls': timings.counts.get('nlp', 0),
+            'serializer': timings.durations.get('serializer', 0),
+            'total': timings.total,
+        }
+
+    def log(self, request, response, metrics):
+        resolver_match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': resolver_match.view_name if resolver_match else None,
+            'status': response.status_code,
+        }
+        for name, value in metrics.items():
+            if isinstance(value, float):
+                record['{}_ms'.format(name)] = round(value * 1000, 1)
+            else:
+                record[name] = value
+        logger.info(json.dumps(record, sort_keys=True))
+
+
+class QueryCounter(object):
+    def __init__(self):
+        self.count = 0
+        self.time = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.time += time.perf_counter() - start
+
+
+class MetricsMiddleware(object):
+    """
+    Record latency, status and database queries of every request by route
+    in the metrics registry.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        route = resolver_match.view_name if resolver_match else 'unresolved'
+        registry.observe(
+            'bothub_request_duration_seconds',
+            duration,
+            {'method': request.method, 'route': route})
+        registry.inc('bothub_requests_total', {
+            'method': request.method,
+            'route': route,
+            'status': response.status_code,
+        })
+        registry.inc(
+            'bothub_db_queries_total',
+            {'route': route},
+            queries.count)
+        registry.inc(
+            'bothub_db_query_duration_seconds_total',
+            {'route': route},
+            queries.time)
+        return response
@@ -0,0 +1,334 @@
+import os
+import json
+import tempfile
+
+from unittest import mock
+
+import requests
+
+from django.test import TestCase
+from django.test import Client
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+
+from bothub.authentication.models import User
+from bothub.common.models import Repository
+from bothub.common import languages
+
+from . import timing
+from . import metrics
+from . import checks
+from . import views
+
+
+class NLPResponse(object):
+    status_code = 200
+
+    def json(self):
+        return {}
+
+
+@override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0)
+class RequestTimingMiddlewareTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        timing.instrument_serializers()
+
+    @classmethod
+    def tearDownClass(cls):
+        timing.uninstrument_serializers()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.owner = User.objects.create_user('owner@user.com', 'owner')
+        self.token = Token.objects.create(user=self.owner)
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name='Testing',
+            slug='test',
+            language=languages.LANGUAGE_EN)
+
+    def request(self, path, method='get', **data):
+        client = Client()
+        with self.assertLogs('bothub.health.timing') as logs:
+            response = getattr(client, method)(
+                path,
+                data,
+                HTTP_AUTHORIZATION='Token {}'.format(self.token.key))
+        return response, json.loads(logs.records[-1].getMessage())
+
+    def test_server_timing_header(self):
+        response, record = self.request('/api/repositories/')
+        self.assertEqual(response.status_code, 200)
+        server_timing = response['Server-Timing']
+        for name in ['db', 'nlp', 'serializer', 'total']:
+            self.assertIn('{};dur='.format(name), server_timing)
+        self.assertEqual(record.get('method'), 'GET')
+        self.assertEqual(record.get('path'), '/api/repositories/')
+        self.assertEqual(record.get('status'), 200)
+        self.assertGreater(record.get('db_queries'), 0)
+        self.assertGreater(record.get('serializer_ms'), 0)
+        self.assertGreaterEqual(
+            record.get('total_ms'),
+            record.get('serializer_ms'))
+
+    def test_nlp_time(self):
+        with mock.patch(
+                'bothub.common.models.requests.post',
+                return_value=NLPResponse()):
+            response, record = self.request(
+                '/api/repository/owner/test/analyze/',
+                method='post',
+                text='hi',
+                language=languages.LANGUAGE_EN)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(record.get('nlp_calls'), 1)
+
+    @override_settings(REQUEST_TIMING_HEADER=False)
+    def test_without_header(self):
+        response, record = self.request('/api/repositories/')
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(
+        REQUEST_TIMING_SAMPLE_RATE=0.0,
+        REQUEST_TIMING_SLOW_THRESHOLD=0)
+    def test_not_sampled(self):
+        response = Client().get('/api/repositories/')
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(
+        REQUEST_TIMING_SAMPLE_RATE=0.0,
+        REQUEST_TIMING_SLOW_THRESHOLD=1)
+    def test_slow_request_logged(self):
+        response, record = self.request('/api/repositories/')
+        self.assertNotIn('Server-Timing', response)
+        self.assertGreaterEqual(record.get('total_ms'), 1)
+        self.assertNotIn('db_queries', record)
+
+
+class TimingTestCase(TestCase):
+    def test_nested_timers(self):
+        timings = timing.start()
+        try:
+            with timing.timer('serializer'):
+                with timing.timer('serializer'):
+                    pass
+        finally:
+            self.assertIs(timing.stop(), timings)
+        self.assertEqual(timings.counts.get('serializer'), 1)
+
+    def test_timer_without_request(self):
+        self.assertIsNone(timing.current())
+        with timing.timer('nlp'):
+            pass
+
+    def test_serializers_not_instrumented(self):
+        from rest_framework.serializers import BaseSerializer
+        self.assertFalse(getattr(BaseSerializer.data.fget, 'timed', False))
+        timing.instrument_serializers()
+        self.assertTrue(BaseSerializer.data.fget.timed)
+        timing.uninstrument_serializers()
+        self.assertFalse(getattr(BaseSerializer.data.fget, 'timed', False))
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        metrics.registry.reset()
+
+    def test_requests_metrics(self):
+        client = Client()
+        client.get('/api/repositories/')
+        response = client.get('/metrics/')
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn(
+            'bothub_requests_total{method="GET",route="repository-list",' +
+            'status="200"} 1',
+            content)
+        self.assertIn(
+            'bothub_request_duration_seconds_count{method="GET",' +
+            'route="repository-list"} 1',
+            content)
+        self.assertIn(
+            'bothub_db_queries_total{route="repository-list"}',
+            content)
+        self.assertIn(
+            'bothub_metrics_served_by_info{{hostname="{}",pid="{}"}} 1'.format(
+                metrics.registry.hostname,
+                os.getpid()),
+            content)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_access(self):
+        client = Client(REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(client.get('/metrics/').status_code, 403)
+        response = client.get(
+            '/metrics/',
+            HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 403)
+        response = client.get(
+            '/metrics/',
+            HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        with override_settings(METRICS_ALLOWED_IPS=['10.0.0.1']):
+            self.assertEqual(client.get('/metrics/').status_code, 200)
+        with override_settings(METRICS_TOKEN=None):
+            response = client.get(
+                '/metrics/',
+                HTTP_AUTHORIZATION='Bearer None')
+            self.assertEqual(response.status_code, 403)
+
+    def test_nlp_metrics(self):
+        user_authorization = mock.Mock(uuid='123')
+        with mock.patch(
+                'bothub.common.models.requests.post',
+                return_value=NLPResponse()):
+            Repository.request_nlp_analyze(user_authorization, {})
+        with mock.patch(
+                'bothub.common.models.requests.post',
+                side_effect=ConnectionError()):
+            with self.assertRaises(ConnectionError):
+                Repository.request_nlp_train(user_authorization)
+        content = metrics.render(metrics.registry.collect())
+        self.assertIn(
+            'bothub_nlp_requests_total{operation="parse",status="200"} 1',
+            content)
+        self.assertIn(
+            'bothub_nlp_requests_total{operation="train",status="error"} 1',
+            content)
+        self.assertIn(
+            'bothub_nlp_request_duration_seconds_bucket{operation="parse",' +
+            'le="+Inf"} 1',
+            content)
+
+    def test_email_metrics(self):
+        metrics.email_sent('welcome', .1, 'sent')
+        content = metrics.render(metrics.registry.collect())
+        self.assertIn(
+            'bothub_emails_total{kind="welcome",result="sent"} 1',
+            content)
+        self.assertIn(
+            'bothub_email_send_duration_seconds_count{kind="welcome"} 1',
+            content)
+
+    def test_cache_metrics(self):
+        metrics.cache_hit('token')
+        metrics.cache_hit('token')
+        metrics.cache_miss('token')
+        content = metrics.render(metrics.registry.collect())
+        self.assertIn(
+            'bothub_cache_requests_total{cache="token",result="hit"} 2',
+            content)
+        self.assertIn(
+            'bothub_cache_requests_total{cache="token",result="miss"} 1',
+            content)
+
+    def test_aggregate_workers(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_DIR=directory):
+            metrics.registry.inc('bothub_test_total', {'a': 'b'}, 2)
+            metrics.registry.observe('bothub_test_seconds', .2)
+            state = metrics.registry.state()
+            state.update({'pid': 1, 'hostname': 'other'})
+            with open(os.path.join(directory, 'other-1.json'), 'w') as f:
+                json.dump(state, f)
+            content = metrics.render(metrics.registry.collect())
+        self.assertIn('bothub_test_total{a="b"} 4', content)
+        self.assertIn('bothub_test_seconds_bucket{le="0.25"} 2', content)
+        self.assertIn('bothub_test_seconds_bucket{le="0.1"} 0', content)
+        self.assertIn(
+            'bothub_worker_info{hostname="other",pid="1"} 1',
+            content)
+
+
+def check_ok(**kwargs):
+    return True
+
+
+def check_fail(**kwargs):
+    return False
+
+
+class HealthChecksTestCase(TestCase):
+    def setUp(self):
+        self.readiness = checks.Readiness(lambda: [check_ok])
+        patcher = mock.patch.object(views, 'readiness', self.readiness)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_live(self):
+        with mock.patch.object(self.readiness, 'run_checks') as run_checks:
+            response = Client().get('/health/live/')
+        self.assertEqual(response.status_code, 200)
+        run_checks.assert_not_called()
+
+    @override_settings(HEALTH_CHECK_INTERVAL=0)
+    def test_ready(self):
+        response = Client().get('/health/ready/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('check_ok: True', response.content.decode())
+        self.readiness.checks = lambda: [check_ok, check_fail]
+        response = Client().get('/ping/')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('check_fail: False', response.content.decode())
+
+    @override_settings(HEALTH_CHECK_INTERVAL=10)
+    def test_ready_cached(self):
+        with mock.patch.object(self.readiness, 'start') as start:
+            Client().get('/health/ready/')
+            self.readiness.checks = lambda: [check_fail]
+            response = Client().get('/health/ready/')
+        start.assert_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('check_ok: True', response.content.decode())
+
+    @override_settings(HEALTH_CHECK_INTERVAL=10, HEALTH_CHECK_MAX_AGE=30)
+    def test_ready_stale(self):
+        self.readiness.run_checks()
+        self.readiness.checked_at -= 31
+        with mock.patch.object(self.readiness, 'start'):
+            response = Client().get('/health/ready/')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('stale', response.content.decode())
+
+    def test_check_exception(self):
+        def check_error(**kwargs):
+            raise Exception()
+
+        self.readiness.checks = lambda: [check_error]
+        with self.assertLogs('bothub.health.checks'):
+            results = self.readiness.run_checks()
+        self.assertFalse(results.get('check_error'))
+
+    def test_refresh_exception(self):
+        def checks_error():
+            raise Exception()
+
+        self.readiness.checks = checks_error
+        with self.assertLogs('bothub.health.checks', 'ERROR'):
+            self.readiness.refresh()
+        self.readiness.checks = lambda: [check_ok]
+        connection = mock.Mock(**{'close.side_effect': Exception()})
+        with mock.patch('django.db.connections.all', return_value=[
+                connection]):
+            with self.assertLogs('bothub.health.checks', 'ERROR'):
+                self.readiness.refresh()
+        self.assertTrue(self.readiness.results.get('check_ok'))
+
+    def test_check_nlp_service(self):
+        with mock.patch(
+                'requests.get',
+                return_value=mock.Mock(status_code=404)):
+            self.assertTrue(checks.check_nlp_service())
+        with mock.patch(
+                'requests.get',
+                return_value=mock.Mock(status_code=502)):
+            self.assertFalse(checks.check_nlp_service())
+        with mock.patch(
+                'requests.get',
+                side_effect=requests.ConnectionError()):
+            self.assertFalse(checks.check_nlp_service())
+
+    def test_check_database_connection(self):
+        self.assertTrue(checks.check_database_connection())
@@ -0,0 +1,103 @@
+import time
+import threading
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+
+
+_local = threading.local()
+
+
+class RequestTimings(object):
+    """
+    Time spent by a request in each kind of work (db, nlp, serializer...),
+    nested timers of the same kind are counted only once.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.durations = OrderedDict()
+        self.counts = OrderedDict()
+        self.depth = {}
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.start
+
+    def add(self, name, duration):
+        self.durations[name] = self.durations.get(name, 0) + duration
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    @contextmanager
+    def timer(self, name):
+        if self.depth.get(name):
+            yield
+            return
+        self.depth[name] = 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.depth[name] = 0
+            self.add(name, time.perf_counter() - start)
+
+    def __call__(self, execute, sql, params, many, context):
+        # Used as connection.execute_wrapper
+        with self.timer('db'):
+            return execute(sql, params, many, context)
+
+
+def start():
+    _local.timings = RequestTimings()
+    return _local.timings
+
+
+def stop():
+    timings = current()
+    _local.timings = None
+    return timings
+
+
+def current():
+    return getattr(_local, 'timings', None)
+
+
+@contextmanager
+def timer(name):
+    timings = current()
+    if timings is None:
+        yield
+        return
+    with timings.timer(name):
+        yield
+
+
+def timed(name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_serializers():
+    """
+    Time the representation of DRF serializers, Serializer.data and
+    ListSerializer.data both call BaseSerializer.data.
+    """
+    from rest_framework.serializers import BaseSerializer
+    if getattr(BaseSerializer.data.fget, 'timed', False):
+        return
+    fget = timed('serializer')(BaseSerializer.data.fget)
+    fget.timed = True
+    BaseSerializer.data = property(fget)
+
+
+def uninstrument_serializers():
+    from rest_framework.serializers import BaseSerializer
+    fget = BaseSerializer.data.fget
+    if getattr(fget, 'timed', False):
+        BaseSerializer.data = property(fget.__wrapped__)
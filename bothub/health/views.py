@@ -1,38 +1,69 @@
-from collections import OrderedDict
 from functools import reduce
 
+from django.conf import settings
 from django.http import HttpResponse
+from django.http import HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
 from rest_framework import status
 
-from .checks import check_database_connection
-from .checks import check_accessible_api
+from .checks import readiness
+from .metrics import registry
+from .metrics import render
 
-CHECKS = [
-    check_database_connection,
-    check_accessible_api,
-]
 
+def live(request):
+    return HttpResponse(
+        content='OK',
+        content_type='text/plain')
 
-def ping(request):
-    checks_status = OrderedDict(map(
-        lambda check: (check.__name__, check(request=request)),
-        CHECKS))
+
+def ready(request):
+    checks_status, age = readiness.get_results()
     healthy = reduce(
         lambda current, status: current and status,
         checks_status.values(),
         True)
-    content = '{}\n{}'.format(
-        'OK' if healthy else 'something wrong happened',
+    stale = age > settings.HEALTH_CHECK_MAX_AGE
+    if stale:
+        title = 'checks are stale'
+    elif healthy:
+        title = 'OK'
+    else:
+        title = 'something wrong happened'
+    content = '{}\n{}\nchecked {:.1f}s ago'.format(
+        title,
         '\n'.join(map(
             lambda x: '{}: {}'.format(*x),
-            checks_status.items())))
+            checks_status.items())),
+        age)
     status_code = status.HTTP_200_OK \
-        if healthy else status.HTTP_503_SERVICE_UNAVAILABLE
+        if healthy and not stale else status.HTTP_503_SERVICE_UNAVAILABLE
     return HttpResponse(
         content=content,
         content_type='text/plain',
         status=status_code)
 
 
+def ping(request):
+    return ready(request)
+
+
 def r200(request):
     return HttpResponse()
+
+
+def metrics_allowed(request):
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    return bool(settings.METRICS_TOKEN) and constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''),
+        'Bearer {}'.format(settings.METRICS_TOKEN))
+
+
+def metrics(request):
+    # Routes, latencies and queries are internal, only for the scraper
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        content=render(registry.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8')
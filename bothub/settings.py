@@ -40,9 +40,14 @@ INSTALLED_APPS = [
     'bothub.authentication',
     'bothub.common',
     'bothub.api',
+    'bothub.health',
 ]
 
 MIDDLEWARE = [
+    'bothub.health.middleware.MetricsMiddleware',
+    'bothub.health.middleware.RequestTimingMiddleware',
+    'bothub.common.replicas.ReplicaMiddleware',
+    'bothub.api.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -83,11 +88,114 @@ DATABASES['default'] = dj_database_url.parse(
         'DEFAULT_DATABASE',
         default='sqlite:///db.sqlite3'))
 
+REPLICA_DATABASES = config(
+    'REPLICA_DATABASES',
+    default='',
+    cast=lambda v: [s.strip() for s in v.split('|') if s.strip()])
+
+for i, url in enumerate(REPLICA_DATABASES, 1):
+    DATABASES['replica_{}'.format(i)] = dict(
+        dj_database_url.parse(url),
+        TEST={'MIRROR': 'default'})
+
+DATABASE_REPLICAS = [
+    alias for alias in DATABASES.keys() if alias != 'default']
+
+DATABASE_CONN_MAX_AGE = config(
+    'DATABASE_CONN_MAX_AGE',
+    default=0,
+    cast=int)
+
+DATABASE_POOL_SIZE = config(
+    'DATABASE_POOL_SIZE',
+    default=0,
+    cast=int)
+
+DATABASE_POOL_TIMEOUT = config(
+    'DATABASE_POOL_TIMEOUT',
+    default=10,
+    cast=float)
+
+DATABASE_POOL_MAX_AGE = config(
+    'DATABASE_POOL_MAX_AGE',
+    default=600,
+    cast=int)
+
+DATABASE_POOL_CHECK_AFTER = config(
+    'DATABASE_POOL_CHECK_AFTER',
+    default=30,
+    cast=int)
+
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = DATABASE_CONN_MAX_AGE
+    # Pooled connections go back to the pool at the end of each request
+    if DATABASE_POOL_SIZE and database['ENGINE'] in [
+            'django.db.backends.postgresql',
+            'django.db.backends.postgresql_psycopg2']:
+        database.update({
+            'ENGINE': 'bothub.db.postgresql_pool',
+            'CONN_MAX_AGE': 0,
+            'POOL_SIZE': DATABASE_POOL_SIZE,
+            'POOL_TIMEOUT': DATABASE_POOL_TIMEOUT,
+            'POOL_MAX_AGE': DATABASE_POOL_MAX_AGE,
+            'POOL_CHECK_AFTER': DATABASE_POOL_CHECK_AFTER,
+        })
+
+DATABASE_ROUTERS = [
+    'bothub.common.replicas.ReplicaRouter',
+]
+
+REPLICA_MAX_LAG = config(
+    'REPLICA_MAX_LAG',
+    default=5,
+    cast=float)
+
+REPLICA_CHECK_INTERVAL = config(
+    'REPLICA_CHECK_INTERVAL',
+    default=5,
+    cast=int)
+
+REPLICA_PIN_SECONDS = config(
+    'REPLICA_PIN_SECONDS',
+    default=10,
+    cast=int)
+
 
 # Auth
 
 AUTH_USER_MODEL = 'authentication.User'
 
+TOKEN_CACHE_SIZE = config(
+    'TOKEN_CACHE_SIZE',
+    default=10000,
+    cast=int)
+
+TOKEN_CACHE_LOCAL_TTL = config(
+    'TOKEN_CACHE_LOCAL_TTL',
+    default=10,
+    cast=int)
+
+TOKEN_CACHE_SHARED = config(
+    'TOKEN_CACHE_SHARED',
+    default='')
+
+TOKEN_CACHE_TTL = config(
+    'TOKEN_CACHE_TTL',
+    default=300,
+    cast=int)
+
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    },
+}
+
 
 # Password validation
 
@@ -137,7 +245,11 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'bothub.authentication.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'bothub.api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.' +
     'LimitOffsetPagination',
@@ -149,6 +261,37 @@ REST_FRAMEWORK = {
 }
 
 
+# Search
+
+SEARCH_DOCUMENT = config('SEARCH_DOCUMENT', default=False, cast=bool)
+
+
+# Duplicates
+
+REJECT_DUPLICATE_TEXT = config(
+    'REJECT_DUPLICATE_TEXT',
+    default=False,
+    cast=bool)
+
+
+# Compression
+
+COMPRESSION_MIN_SIZE = config(
+    'COMPRESSION_MIN_SIZE',
+    default=1024,
+    cast=int)
+
+COMPRESSION_GZIP_LEVEL = config(
+    'COMPRESSION_GZIP_LEVEL',
+    default=6,
+    cast=int)
+
+COMPRESSION_BROTLI_QUALITY = config(
+    'COMPRESSION_BROTLI_QUALITY',
+    default=4,
+    cast=int)
+
+
 # cors headers
 
 CORS_ORIGIN_ALLOW_ALL = True
@@ -231,6 +374,105 @@ LOGGING['loggers']['bothub.health.checks'] = {
     'handlers': ['bothub.health'],
     'level': 'DEBUG',
 }
+LOGGING['formatters']['bothub.health.timing'] = {
+    'format': '{message}',
+    'style': '{',
+}
+LOGGING['handlers']['bothub.health.timing'] = {
+    'level': 'INFO',
+    'class': 'logging.StreamHandler',
+    'formatter': 'bothub.health.timing',
+}
+LOGGING['loggers']['bothub.health.timing'] = {
+    'handlers': ['bothub.health.timing'],
+    'level': 'INFO',
+    'propagate': False,
+}
+
+
+# Request timing
+
+REQUEST_TIMING_SAMPLE_RATE = config(
+    'REQUEST_TIMING_SAMPLE_RATE',
+    default=0.0,
+    cast=float)
+
+REQUEST_TIMING_SLOW_THRESHOLD = config(
+    'REQUEST_TIMING_SLOW_THRESHOLD',
+    default=0,
+    cast=int)
+
+REQUEST_TIMING_HEADER = config(
+    'REQUEST_TIMING_HEADER',
+    default=True,
+    cast=bool)
+
+REQUEST_TIMING_SERIALIZERS = config(
+    'REQUEST_TIMING_SERIALIZERS',
+    default=False,
+    cast=bool)
+
+
+# Health checks
+
+HEALTH_CHECK_INTERVAL = config(
+    'HEALTH_CHECK_INTERVAL',
+    default=10,
+    cast=int)
+
+HEALTH_CHECK_MAX_AGE = config(
+    'HEALTH_CHECK_MAX_AGE',
+    default=30,
+    cast=int)
+
+HEALTH_CHECK_TIMEOUT = config(
+    'HEALTH_CHECK_TIMEOUT',
+    default=2,
+    cast=float)
+
+
+# Metrics
+
+METRICS_DIR = config(
+    'METRICS_DIR',
+    default=None,
+    cast=cast_empty_str_to_none)
+
+METRICS_FLUSH_INTERVAL = config(
+    'METRICS_FLUSH_INTERVAL',
+    default=10,
+    cast=int)
+
+METRICS_TOKEN = config(
+    'METRICS_TOKEN',
+    default=None,
+    cast=cast_empty_str_to_none)
+
+METRICS_ALLOWED_IPS = config(
+    'METRICS_ALLOWED_IPS',
+    default='127.0.0.1,::1',
+    cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+
+
+# Training
+
+TRAINING_LEASE = config(
+    'TRAINING_LEASE',
+    default=7200,
+    cast=int)
+
+JOB_LEASE = config(
+    'JOB_LEASE',
+    default=7200,
+    cast=int)
+
+
+# Clone
+
+CLONE_SYNC_MAX_EXAMPLES = config(
+    'CLONE_SYNC_MAX_EXAMPLES',
+    default=1000,
+    cast=int)
 
 
 # Supported Languages
@@ -6,7 +6,10 @@ from rest_framework.documentation import include_docs_urls
 from bothub.api.v1.routers import router as bothub_api_routers
 from bothub.api.v2 import urls as bothub_api_v2_urls
 from bothub.health.views import ping
+from bothub.health.views import live
+from bothub.health.views import ready
 from bothub.health.views import r200
+from bothub.health.views import metrics
 from bothub.common.views import download_bot_data
 
 
@@ -18,7 +21,10 @@ urlpatterns = [
     path('docs/', include_docs_urls(title='API Documentation')),
     path('admin/', admin.site.urls),
     path('ping/', ping, name='ping'),
+    path('health/live/', live, name='live'),
+    path('health/ready/', ready, name='ready'),
     path('200/', r200, name='200'),
+    path('metrics/', metrics, name='metrics'),
     path(
         'downloadbotdata/<int:update_id>/',
         download_bot_data,
@@ -1,4 +1,5 @@
 #!/bin/sh
+set -e
 cd $WORKDIR
 python manage.py migrate
 python manage.py collectstatic --noinput
@@ -1,6 +1,52 @@
+import os
+import glob
+import socket
 import multiprocessing
 
+from decouple import config
+
 bind = '0.0.0.0:80'
 workers = multiprocessing.cpu_count() * 2 + 1
 worker_class = 'gevent'
+worker_connections = config(
+    'GUNICORN_WORKER_CONNECTIONS',
+    default=1000,
+    cast=int)
 raw_env = ['DJANGO_SETTINGS_MODULE=bothub.settings']
+
+
+def on_starting(server):
+    # Metrics of the workers of a previous run
+    metrics_dir = config('METRICS_DIR', default='')
+    if metrics_dir:
+        for path in glob.glob(os.path.join(metrics_dir, '*.json')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    # Metrics of a worker that exited (like one recycled by max_requests)
+    # are no longer summed
+    metrics_dir = config('METRICS_DIR', default='')
+    if metrics_dir:
+        from bothub.health.metrics import state_path
+        try:
+            os.remove(state_path(
+                metrics_dir,
+                socket.gethostname(),
+                worker.pid))
+        except FileNotFoundError:
+            pass
+
+
+def post_fork(server, worker):
+    # psycopg2 waits for PostgreSQL in C, blocking every greenlet of the
+    # worker, psycogreen makes it wait in the gevent hub
+    if server.cfg.worker_class_str != 'gevent':
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        server.log.warning(
+            'psycogreen not installed, database queries block the worker')
+        return
+    patch_psycopg()
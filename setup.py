@@ -17,6 +17,9 @@ setup(
         'coreapi==2.3.3',
         'whitenoise==4.1.2',
         'pytz==2018.7',
+        'orjson==3.3.1',
+        'brotli==1.0.9',
+        'psycogreen==1.0.2',
     ],
-    python_requires='>=3.4',
+    python_requires='>=3.6',
 )